@@ -0,0 +1,28 @@
+"""Generated SQL scripts of a given size, shared by the benchmarks"""
+
+from typing import List
+
+
+def small_statements(count: int) -> List[str]:
+    """Single-row INSERTs, which cost about one round trip each"""
+    return [
+        f"INSERT INTO bench (id, name) VALUES ({i}, 'name {i}')" for i in range(count)
+    ]
+
+
+def mixed_script(count: int, dialect: str = "postgres") -> str:
+    """A script of `count` statements, mixing DDL, DML and queries"""
+    text_type = "STRING" if dialect == "bigquery" else "VARCHAR"
+    statements = [f"CREATE TABLE bench (id INTEGER, name {text_type})"]
+    for i in range(count - 1):
+        if i % 4 == 0:
+            statements.append(f"INSERT INTO bench (id, name) VALUES ({i}, 'name {i}')")
+        elif i % 4 == 1:
+            statements.append(f"UPDATE bench SET name = 'renamed {i}' WHERE id = {i}")
+        elif i % 4 == 2:
+            statements.append(
+                f"SELECT id, count(*) AS n FROM bench WHERE id > {i} GROUP BY id"
+            )
+        else:
+            statements.append(f"DELETE FROM bench WHERE id = {i - 3}")
+    return ";\n".join(statements) + ";\n"
@@ -0,0 +1,52 @@
+import os
+import pathlib as plb
+import subprocess
+import sys
+
+import _scripts
+import pytest
+
+
+def _manuel(*args: str, env_cache: plb.Path):
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from manuel.cli import entrypoint; "
+            "sys.argv[0] = 'manuel'; entrypoint()",
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+        env={**os.environ, "MANUEL_CACHE_DIR": str(env_cache)},
+    )
+
+
+@pytest.fixture
+def script(tmp_path: plb.Path) -> plb.Path:
+    path = tmp_path / "script.sql"
+    path.write_text(_scripts.mixed_script(10))
+    return path
+
+
+def test_import(benchmark):
+    benchmark(subprocess.run, [sys.executable, "-c", "import manuel.cli"], check=True)
+
+
+def test_help(benchmark, tmp_path: plb.Path):
+    benchmark(_manuel, "--help", env_cache=tmp_path)
+
+
+def test_validate_uncached(benchmark, tmp_path: plb.Path, script: plb.Path):
+    # Includes loading the sqlfluff dialect, which dominates a single short call
+    benchmark(
+        _manuel,
+        "validate",
+        str(script),
+        "--no-cache",
+        env_cache=tmp_path / "cache",
+    )
+
+
+def test_validate_cached(benchmark, tmp_path: plb.Path, script: plb.Path):
+    benchmark(_manuel, "validate", str(script), env_cache=tmp_path / "cache")
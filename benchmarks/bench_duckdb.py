@@ -0,0 +1,78 @@
+import asyncio
+import pathlib as plb
+
+import _scripts
+import duckdb
+import pytest
+
+from manuel._config import DuckdbSqlConfig
+from manuel._executors import (
+    DuckdbAsyncExecutor,
+    DuckdbNativeExecutor,
+    DuckdbSqlAlchemyExecutor,
+)
+
+SMALL_STATEMENTS = 2_000
+BULK_ROWS = 1_000_000
+
+
+@pytest.fixture
+def config(tmp_path: plb.Path) -> DuckdbSqlConfig:
+    return DuckdbSqlConfig(database=str(tmp_path / "bench.db"))
+
+
+@pytest.fixture
+def reset(config: DuckdbSqlConfig):
+    def reset():
+        with duckdb.connect(config.database) as con:
+            con.execute("CREATE OR REPLACE TABLE bench (id INTEGER, name VARCHAR)")
+
+    return reset
+
+
+@pytest.mark.parametrize(
+    "executor_class", [DuckdbNativeExecutor, DuckdbSqlAlchemyExecutor]
+)
+def test_small_statements(benchmark, config: DuckdbSqlConfig, reset, executor_class):
+    statements = _scripts.small_statements(SMALL_STATEMENTS)
+    benchmark(
+        executor_class().run,
+        statements,
+        items=SMALL_STATEMENTS,
+        setup=reset,
+        **config.model_dump(),
+    )
+
+
+@pytest.mark.parametrize(
+    "executor_class", [DuckdbNativeExecutor, DuckdbSqlAlchemyExecutor]
+)
+def test_bulk_statement(benchmark, config: DuckdbSqlConfig, reset, executor_class):
+    statement = (
+        f"INSERT INTO bench SELECT range, 'name ' || range FROM range({BULK_ROWS})"
+    )
+    benchmark(
+        executor_class().run,
+        [statement],
+        items=BULK_ROWS,
+        setup=reset,
+        **config.model_dump(),
+    )
+
+
+def test_async_concurrent_scripts(benchmark, config: DuckdbSqlConfig):
+    scripts = {
+        f"{i:03}.sql": [
+            f"CREATE OR REPLACE TABLE bench_{i} AS SELECT range AS id FROM range(10000)"
+        ]
+        for i in range(100)
+    }
+
+    def run():
+        asyncio.run(
+            DuckdbAsyncExecutor().run_concurrently(
+                scripts, max_concurrency=8, **config.model_dump()
+            )
+        )
+
+    benchmark(run, items=len(scripts))
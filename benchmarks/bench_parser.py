@@ -0,0 +1,52 @@
+import pathlib as plb
+
+import _scripts
+import pytest
+
+from manuel import _cache, _parser, _splitter
+
+DIALECTS = ["postgres", "duckdb", "bigquery"]
+SIZES = [10, 50, 200]
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_validate(benchmark, dialect: str, size: int):
+    sql = _scripts.mixed_script(size, dialect)
+
+    def validate():
+        _parser.SqlParser(sql=sql, dialect=dialect).validate(cache=None)
+
+    benchmark(validate, items=size, rounds=3)
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_validate_cached(benchmark, dialect: str, tmp_path: plb.Path):
+    sql = _scripts.mixed_script(SIZES[-1], dialect)
+    cache = _cache.ValidationCache(directory=tmp_path)
+    _parser.SqlParser(sql=sql, dialect=dialect).validate(cache=cache)
+
+    def validate():
+        _parser.SqlParser(sql=sql, dialect=dialect).validate(cache=cache)
+
+    benchmark(validate, items=SIZES[-1])
+
+
+@pytest.mark.parametrize("size", [1_000, 100_000])
+def test_split_statements(benchmark, size: int):
+    sql = _scripts.mixed_script(size)
+    # Files are read in chunks of 1 MiB
+    chunks = [sql[start : start + 1024 * 1024] for start in range(0, len(sql), 2**20)]
+
+    def split():
+        return sum(1 for _ in _splitter.split_statements(chunks, "postgres"))
+
+    assert benchmark(split, items=size) == size
+
+
+def test_split_parse_tree(benchmark):
+    parser = _parser.SqlParser(sql=_scripts.mixed_script(SIZES[-1]), dialect="postgres")
+    parser.validate(cache=None)
+    tree = _parser._get_linter("postgres").parse_string(parser.sql).tree
+
+    benchmark(parser._split, tree, items=SIZES[-1])
@@ -0,0 +1,120 @@
+from typing import Iterator
+
+import _scripts
+import pytest
+
+# Postgres runs in a container, like in the tests of the Postgres executor
+devtools = pytest.importorskip("devtools")
+janitor = pytest.importorskip("pytest_postgresql.janitor")
+
+from sqlalchemy import Engine, NullPool, create_engine, text  # noqa: E402
+
+from manuel import _core  # noqa: E402
+from manuel._config import PostgresSqlConfig  # noqa: E402
+from manuel._executors import PostgresSqlAlchemyExecutor  # noqa: E402
+from manuel._utils import is_installed  # noqa: E402
+
+IMAGE = "postgres:15.1"
+POSTGRES_PASSWORD = "postgres"
+POSTGRES_USER = "postgres"
+POSTGRES_PORT = 65433
+POSTGRES_HOST = "127.0.0.1"
+POSTGRES_DATABASE = "bench_db"
+
+SMALL_STATEMENTS = 2_000
+BULK_ROWS = 1_000_000
+
+
+@pytest.fixture(scope="module")
+def config() -> PostgresSqlConfig:
+    return PostgresSqlConfig(
+        host=POSTGRES_HOST,
+        port=POSTGRES_PORT,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        database=POSTGRES_DATABASE,
+    )
+
+
+@pytest.fixture(scope="module")
+def engine(config: PostgresSqlConfig) -> Iterator[Engine]:
+    with (
+        devtools.run_container(
+            image=IMAGE,
+            image_name_prefix="manuel-postgres-bench",
+            environment=[f"POSTGRES_PASSWORD={POSTGRES_PASSWORD}"],
+            ports={"5432/tcp": (POSTGRES_HOST, POSTGRES_PORT)},
+            wait_seconds=1,
+        ),
+        janitor.DatabaseJanitor(
+            user=POSTGRES_USER,
+            password=POSTGRES_PASSWORD,
+            host=POSTGRES_HOST,
+            port=POSTGRES_PORT,
+            dbname=POSTGRES_DATABASE,
+            version=15,
+        ),
+    ):
+        engine = create_engine(
+            PostgresSqlAlchemyExecutor.format_connection_string(**config.model_dump()),
+            poolclass=NullPool,
+        )
+        yield engine
+        engine.dispose()
+
+
+@pytest.fixture
+def reset(engine: Engine):
+    def reset():
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS bench"))
+            connection.execute(text("CREATE TABLE bench (id INTEGER, name VARCHAR)"))
+
+    return reset
+
+
+@pytest.mark.parametrize("insert_batch_size", [1, 1000])
+def test_small_statements(
+    benchmark, config: PostgresSqlConfig, reset, insert_batch_size: int
+):
+    statements = _scripts.small_statements(SMALL_STATEMENTS)
+    executor = PostgresSqlAlchemyExecutor(insert_batch_size=insert_batch_size)
+    benchmark(
+        executor.run,
+        statements,
+        items=SMALL_STATEMENTS,
+        setup=reset,
+        **config.model_dump(),
+    )
+
+
+@pytest.mark.skipif(not is_installed("psycopg"), reason="requires psycopg 3")
+@pytest.mark.parametrize("pipeline_depth", [10, 100])
+def test_small_statements_pipelined(
+    benchmark, config: PostgresSqlConfig, reset, pipeline_depth: int
+):
+    statements = _scripts.mixed_script(SMALL_STATEMENTS).split(";\n")[1:-1]
+    executor = _core.get_executor(_core.SqlDialect.POSTGRES, pipelined=True)(
+        pipeline_depth=pipeline_depth
+    )
+    benchmark(
+        executor.run,
+        statements,
+        items=len(statements),
+        setup=reset,
+        **config.model_dump(),
+    )
+
+
+def test_bulk_statement(benchmark, config: PostgresSqlConfig, reset):
+    statement = (
+        "INSERT INTO bench SELECT i, 'name ' || i "
+        f"FROM generate_series(1, {BULK_ROWS}) AS i"
+    )
+    benchmark(
+        PostgresSqlAlchemyExecutor().run,
+        [statement],
+        items=BULK_ROWS,
+        setup=reset,
+        **config.model_dump(),
+    )
@@ -0,0 +1,53 @@
+"""Compare two benchmark results and report regressions
+
+Usage: python benchmarks/compare.py BASELINE.json CANDIDATE.json [--threshold 0.1]
+
+Benchmarks are matched by group and name, and compared by their median wall time.
+Exits with 1 if any benchmark is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import pathlib as plb
+import sys
+from typing import Dict, Tuple
+
+
+def _load(path: plb.Path) -> Dict[Tuple[str, str], float]:
+    report = json.loads(path.read_text())
+    return {
+        (result["group"], result["name"]): result["median"]
+        for result in report["benchmarks"]
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=plb.Path)
+    parser.add_argument("candidate", type=plb.Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown of the median that counts as a regression",
+    )
+    args = parser.parse_args()
+    baseline, candidate = _load(args.baseline), _load(args.candidate)
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        change = candidate[key] / baseline[key] - 1 if baseline[key] else 0.0
+        regressed = change > args.threshold
+        regressions += regressed
+        print(
+            f"{key[0]:<10} {key[1]:<60} {baseline[key] * 1000:>10.2f} ms "
+            f"{candidate[key] * 1000:>10.2f} ms {change:>+8.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key[0]:<10} {key[1]:<60} only in one of the results")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
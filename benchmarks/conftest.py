@@ -0,0 +1,155 @@
+import datetime
+import json
+import pathlib as plb
+import platform
+import statistics
+import subprocess
+import time
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+_RESULTS = pytest.StashKey[List[Dict[str, Any]]]()
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-json",
+        type=plb.Path,
+        default=None,
+        help="File to write the results to. Defaults to .benchmarks/<timestamp>.json",
+    )
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=5,
+        help="Number of timed rounds per benchmark, unless a benchmark sets fewer",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    config.stash[_RESULTS] = []
+
+
+class Benchmark:
+    """Times a function over a number of rounds, after one untimed warm-up round"""
+
+    def __init__(self, name: str, group: str, rounds: int, results: List[Dict]):
+        self.name = name
+        self.group = group
+        self.rounds = rounds
+        self._results = results
+
+    def __call__(
+        self,
+        function: Callable[..., Any],
+        *args,
+        items: Optional[int] = None,
+        rounds: Optional[int] = None,
+        setup: Optional[Callable[[], Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """Run `function(*args, **kwargs)` and record its wall time
+
+        Args:
+            items (Optional[int], optional): Number of items, e.g. statements, that a
+              call processes, to report the throughput
+            rounds (Optional[int], optional): Upper bound on the number of rounds, for
+              benchmarks that are slow
+            setup (Optional[Callable[[], Any]], optional): Called before every round,
+              outside of the timing
+
+        Returns:
+            Any: The result of the last call
+        """
+        rounds = min(self.rounds, rounds) if rounds is not None else self.rounds
+        timings = []
+        for round in range(rounds + 1):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            # The first round warms up caches and imports
+            if round > 0:
+                timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        self._results.append(
+            {
+                "name": self.name,
+                "group": self.group,
+                "rounds": rounds,
+                "min": min(timings),
+                "max": max(timings),
+                "mean": statistics.mean(timings),
+                "median": median,
+                "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "items": items,
+                "items_per_second": items / median if items and median else None,
+            }
+        )
+        return result
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Benchmark:
+    return Benchmark(
+        name=request.node.nodeid.split("::", 1)[-1],
+        group=plb.Path(request.node.fspath).stem.removeprefix("bench_"),
+        rounds=request.config.getoption("--benchmark-rounds"),
+        results=request.config.stash[_RESULTS],
+    )
+
+
+def _version(distribution: str) -> Optional[str]:
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config):
+    results = config.stash[_RESULTS]
+    if not results:
+        return
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+    path = config.getoption("--benchmark-json") or plb.Path(
+        ".benchmarks", f"{created_at:%Y%m%dT%H%M%S}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "metadata": {
+            "created_at": created_at.isoformat(),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "versions": {
+                name: _version(name)
+                for name in ("manuel", "sqlfluff", "sqlalchemy", "duckdb", "psycopg2")
+            },
+        },
+        "benchmarks": results,
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    terminalreporter.section("benchmarks")
+    for result in results:
+        throughput = (
+            f" ({result['items_per_second']:,.0f} items/s)"
+            if result["items_per_second"]
+            else ""
+        )
+        terminalreporter.write_line(
+            f"{result['group']:<10} {result['name']:<60} "
+            f"{result['median'] * 1000:>10.2f} ms{throughput}"
+        )
+    terminalreporter.write_line(f"Results written to {path}")
@@ -1 +1,7 @@
+import time as _time
+
 __version__ = "0.0.0"
+
+# Taken before the CLI and its dependencies are imported, so that --timings can
+#  report the startup time of a command
+_IMPORTED_AT = _time.perf_counter()
@@ -0,0 +1,138 @@
+import logging
+import re
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger("manuel._batching")
+
+DEFAULT_INSERT_BATCH_SIZE = 1000
+
+_NAME = r'(?:"[^"]*"|`[^`]*`|[A-Za-z_][\w$]*)'
+_INSERT = re.compile(
+    rf"\s*INSERT\s+INTO\s+(?P<table>{_NAME}(?:\s*\.\s*{_NAME})*)\s*"
+    r'(?P<columns>\((?:"[^"]*"|[^()"])*\))?\s*VALUES\s*(?P<row>\(.*)',
+    re.IGNORECASE | re.DOTALL,
+)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_CAST = re.compile(
+    r"::\s*[A-Za-z_]\w*(?:\s+[A-Za-z_]\w*)*(?:\s*\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(?:\s*\[\])?"
+)
+_NUMBER = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_WORD = re.compile(r"[A-Za-z_]\w*")
+_KEYWORDS = {"NULL", "TRUE", "FALSE", "DEFAULT"}
+# Characters that may remain once strings, casts, numbers and keywords are removed
+_PUNCTUATION = re.compile(r"[\s(),+\-\x00]*")
+
+
+class _Insert(NamedTuple):
+    # Everything up to and including VALUES, and the single row of values
+    prefix: str
+    row: str
+    # Statements with equal keys insert into the same columns of the same table
+    key: str
+
+
+def _is_literal_row(row: str) -> bool:
+    """Whether `row` is a single parenthesized row of literal values
+
+    This is deliberately conservative. Rows with subqueries, function calls, operators
+    or strings with backslashes are rejected, since their meaning could change when
+    they are evaluated as part of a multi-row VALUES list.
+    """
+    if "\\" in row:
+        return False
+    # Replace strings with a marker, so that their content is not mistaken for code
+    code = _STRING.sub("\x00", row)
+    if "'" in code:
+        return False
+    depth = 0
+    for position, char in enumerate(code):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            # The row must close at the very end, e.g. not before ON CONFLICT
+            if depth == 0 and code[position + 1 :].strip():
+                return False
+    if depth != 0 or not code.startswith("("):
+        return False
+    code = _NUMBER.sub("", _CAST.sub("", code))
+    for word in _WORD.finditer(code):
+        # Typed literals, e.g. DATE '2024-01-01' or E'...'
+        prefixes_string = code[word.end() :].lstrip().startswith("\x00")
+        if word.group().upper() not in _KEYWORDS and not prefixes_string:
+            return False
+    return _PUNCTUATION.fullmatch(_WORD.sub("", code)) is not None
+
+
+def _parse_insert(statement: str) -> Optional[_Insert]:
+    match = _INSERT.match(statement)
+    if match is None:
+        return None
+    row = match.group("row").rstrip().rstrip(";").rstrip()
+    if not _is_literal_row(row):
+        return None
+    key = " ".join(f"{match.group('table')} {match.group('columns') or ''}".split())
+    return _Insert(prefix=statement[: match.start("row")], row=row, key=key)
+
+
+def merge_inserts(statements: List[str]) -> str:
+    """Merge single-row INSERTs into the same table and columns into one statement
+
+    The statements must have been grouped by `group_inserts`.
+    """
+    inserts = [_parse_insert(statement) for statement in statements]
+    return inserts[0].prefix.strip() + " " + ", ".join(i.row for i in inserts)
+
+
+def group_inserts(statements: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    """Group consecutive single-row INSERTs into the same table and columns
+
+    Statements are consumed lazily. Each group holds at most `batch_size` statements,
+    and every statement that is not a single-row INSERT of literal values is yielded
+    as a group of its own.
+
+    Args:
+        statements (Iterable[str]): The statements of a script
+        batch_size (int): Maximum number of statements per group
+
+    Yields:
+        List[str]: Consecutive statements that can be merged with `merge_inserts`
+    """
+    group: List[str] = []
+    key: Optional[str] = None
+    for statement in statements:
+        insert = _parse_insert(statement) if batch_size > 1 else None
+        if group and (insert is None or insert.key != key or len(group) >= batch_size):
+            yield group
+            group = []
+        if insert is None:
+            yield [statement]
+            continue
+        group.append(statement)
+        key = insert.key
+    if group:
+        yield group
+
+
+def group_consecutive(
+    statements: Iterable[str], group_size: int, isolate: Callable[[str], bool]
+) -> Iterator[List[str]]:
+    """Group consecutive statements, e.g. to send them to the database at once
+
+    Statements are consumed lazily. Each group holds at most `group_size` statements,
+    and every statement for which `isolate` is true is yielded as a group of its own.
+    """
+    group: List[str] = []
+    for statement in statements:
+        if isolate(statement):
+            if group:
+                yield group
+                group = []
+            yield [statement]
+            continue
+        group.append(statement)
+        if len(group) >= group_size:
+            yield group
+            group = []
+    if group:
+        yield group
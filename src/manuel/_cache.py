@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib as plb
+import tempfile
+import threading
+from importlib import metadata
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("manuel._cache")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Part of every key, looked up once since it cannot change while Manuel runs
+_SQLFLUFF_VERSION = metadata.version("sqlfluff")
+# Version of what an entry holds. Bump it whenever the statement spans or the table
+#  access that the parser stores change for the same SQL (see `SqlParser._split` and
+#  `_analyze_tables`), so that entries of earlier versions are no longer served.
+CACHE_FORMAT_VERSION = "3"
+
+# Approximate size of each cache directory: scanned on the first write of this
+#  process, then increased by every entry written. Entries written by other
+#  processes are not counted, so the cache may exceed its limit for a while until
+#  their own estimates catch up.
+_estimated_bytes: Dict[plb.Path, int] = {}
+_estimate_lock = threading.Lock()
+
+
+def _default_cache_dir() -> plb.Path:
+    if "MANUEL_CACHE_DIR" in os.environ:
+        return plb.Path(os.environ["MANUEL_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME", plb.Path.home() / ".cache")
+    return plb.Path(cache_home) / "manuel" / "validation"
+
+
+class ValidationCache:
+    """On-disk cache of SQL scripts that passed validation
+
+    Entries are keyed by the SHA-256 of the SQL content, the dialect, the validation
+    mode, the installed sqlfluff version and the format of the entries, so upgrading
+    sqlfluff or Manuel, or changing a single character in a script invalidates the
+    entry. Only successful validations are stored.
+    When the cache grows beyond `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self, directory: Optional[plb.Path] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.directory = directory if directory else _default_cache_dir()
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else int(os.environ.get("MANUEL_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        )
+
+    @staticmethod
+    def key(sql: str, dialect: str, mode: str) -> str:
+        digest = hashlib.sha256()
+        for part in (CACHE_FORMAT_VERSION, _SQLFLUFF_VERSION, dialect, mode, sql):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> plb.Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, sql: str, dialect: str, mode: str) -> Optional[Dict[str, Any]]:
+        path = self._entry_path(self.key(sql, dialect, mode))
+        try:
+            entry = json.loads(path.read_text())
+            # Bump the modification time so that eviction is least-recently-used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        logger.debug("Validation cache hit: %s", path.name)
+        return entry
+
+    def put(self, sql: str, dialect: str, mode: str, **data: Any) -> None:
+        path = self._entry_path(self.key(sql, dialect, mode))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that concurrent readers never see
+            #  a partially written entry
+            with tempfile.NamedTemporaryFile(
+                "w", dir=path.parent, suffix=".tmp", delete=False
+            ) as f:
+                json.dump({"dialect": dialect, "mode": mode, **data}, f)
+                size = f.tell()
+            os.replace(f.name, path)
+        except OSError as e:
+            logger.debug("Could not write validation cache entry: %s", e)
+            return
+        # Scanning the directory costs a stat per entry, so it is only done once the
+        #  estimated size exceeds the limit, rather than on every write
+        with _estimate_lock:
+            if self.directory in _estimated_bytes:
+                _estimated_bytes[self.directory] += size
+            else:
+                _estimated_bytes[self.directory] = sum(
+                    stat.st_size for _, stat in self._entries()
+                )
+            over_limit = _estimated_bytes[self.directory] > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[plb.Path, os.stat_result]]:
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                # Evicted by another process in the meantime
+                continue
+        return entries
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in `max_bytes`"""
+        entries = self._entries()
+        total = sum(stat.st_size for _, stat in entries)
+        if total > self.max_bytes:
+            for path, stat in sorted(entries, key=lambda e: e[1].st_mtime):
+                logger.debug("Evicting validation cache entry: %s", path.name)
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+                if total <= self.max_bytes:
+                    break
+        with _estimate_lock:
+            _estimated_bytes[self.directory] = total
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+        with _estimate_lock:
+            _estimated_bytes[self.directory] = 0
@@ -1,9 +1,42 @@
 import enum
+import itertools
+import logging
 import pathlib as plb
+import time
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-import pydantic
+from manuel import _batching, _timings, _utils
 
-from manuel import _config, _executors, _parser
+if TYPE_CHECKING:
+    import pydantic
+
+    from manuel._executors.async_runner import BaseAsyncStatementExecutor
+    from manuel._executors.base import (
+        BaseSqlExecutor,
+        BaseStatementExecutor,
+        LoadResult,
+        QueryResult,
+        ScriptResult,
+        StatementResult,
+    )
+    from manuel._fanout import Target, TargetResult
+    from manuel._journal import Journal
+    from manuel._ledger import Ledger
+    from manuel._parser import SqlParser
+
+logger = logging.getLogger("manuel._core")
 
 
 class SqlDialect(enum.Enum):
@@ -11,32 +44,575 @@ class SqlDialect(enum.Enum):
     BIGQUERY = "bigquery"
     DATABRICKS = "databricks"
     DUCKDB = "duckdb"
-    MOTHERDUCK = "duckdb"
+    MOTHERDUCK = "motherduck"
+
+    @property
+    def sqlfluff_dialect(self) -> str:
+        # MotherDuck runs DuckDB, and shares its SQL dialect
+        return "duckdb" if self == SqlDialect.MOTHERDUCK else self.value
+
+
+class TransactionScope(enum.Enum):
+    # Commit (or roll back) after every script
+    SCRIPT = "script"
+    # Commit (or roll back) once, after all scripts
+    SINGLE = "single"
+
+
+class TransactionStrategy(enum.Enum):
+    # Execute each session (see TransactionScope) in a single transaction
+    SINGLE = "single"
+    # Commit every statement on its own, on a connection in autocommit mode
+    AUTOCOMMIT = "autocommit"
+    # Commit after every N statements, or every N seconds
+    BATCHED = "batched"
+
+
+class CopyFormat(enum.Enum):
+    # Comma-separated values, quoted with double quotes
+    CSV = "csv"
+    # Tab-separated values, with backslash escapes
+    TEXT = "text"
+
+
+class OutputFormat(enum.Enum):
+    # Comma-separated values, with a header of column names
+    CSV = "csv"
+    # One JSON object per line
+    JSONL = "jsonl"
+    # Columnar formats, which are written from Arrow record batches
+    PARQUET = "parquet"
+    ARROW = "arrow"
 
+    @property
+    def is_binary(self) -> bool:
+        return self in (OutputFormat.PARQUET, OutputFormat.ARROW)
 
+
+class DryRunMode(enum.Enum):
+    # Execute every statement, then roll back
+    FULL = "full"
+    # Only ask the database to plan each statement (e.g. with EXPLAIN)
+    PLAN = "plan"
+
+
+class ReadMode(enum.Enum):
+    # Read and validate each script as a whole before anything is executed
+    PARSE = "parse"
+    # Read, validate and execute one statement at a time
+    STREAM = "stream"
+    # Like STREAM, but read and validate in a background thread
+    PIPELINE = "pipeline"
+
+
+# A comment with this annotation right before a statement makes the executor run the
+#  statement outside of a transaction block
+NO_TRANSACTION_ANNOTATION = "manuel:no-transaction"
+
+
+# Executors and configs are referenced by import path so that only the modules (and
+#  database drivers) of the selected dialect are imported
 executor_map = {
-    SqlDialect.POSTGRES: _executors.PostgresSqlAlchemyExecutor,
-    SqlDialect.BIGQUERY: _executors.BigQuerySqlAlchemyExecutor,
-    SqlDialect.DATABRICKS: _executors.DatabricksSqlAlchemyExecutor,
-    SqlDialect.DUCKDB: _executors.DuckdbSqlAlchemyExecutor,
-    SqlDialect.MOTHERDUCK: _executors.MotherduckSqlAlchemyExecutor,
+    SqlDialect.POSTGRES: "manuel._executors.postgres:PostgresSqlAlchemyExecutor",
+    SqlDialect.BIGQUERY: "manuel._executors.bigquery:BigQuerySqlAlchemyExecutor",
+    SqlDialect.DATABRICKS: "manuel._executors.databricks:DatabricksSqlAlchemyExecutor",
+    SqlDialect.DUCKDB: "manuel._executors.duckdb_native:DuckdbNativeExecutor",
+    SqlDialect.MOTHERDUCK: "manuel._executors.motherduck:MotherduckSqlAlchemyExecutor",
+}
+
+# Executors that send statements in pipelines, without waiting for each result
+pipeline_executor_map = {
+    SqlDialect.POSTGRES: "manuel._executors.postgres_pipeline:PostgresPipelineExecutor",
+}
+
+# Executors with an asyncio API, for use as a library
+async_executor_map = {
+    SqlDialect.POSTGRES: "manuel._executors.postgres_async:PostgresAsyncExecutor",
+    SqlDialect.DUCKDB: "manuel._executors.duckdb_async:DuckdbAsyncExecutor",
 }
 
 
 config_map = {
-    SqlDialect.POSTGRES: _config.PostgresSqlConfig,
-    SqlDialect.BIGQUERY: _config.BigQuerySqlConfig,
-    SqlDialect.DATABRICKS: _config.DatabricksSqlConfig,
-    SqlDialect.DUCKDB: _config.DuckdbSqlConfig,
-    SqlDialect.MOTHERDUCK: _config.MotherduckSqlConfig,
+    SqlDialect.POSTGRES: "manuel._config:PostgresSqlConfig",
+    SqlDialect.BIGQUERY: "manuel._config:BigQuerySqlConfig",
+    SqlDialect.DATABRICKS: "manuel._config:DatabricksSqlConfig",
+    SqlDialect.DUCKDB: "manuel._config:DuckdbSqlConfig",
+    SqlDialect.MOTHERDUCK: "manuel._config:MotherduckSqlConfig",
 }
 
 
-def parse_sql(path: plb.Path, dialect: SqlDialect):
-    return _parser.SqlParser.from_file(path=path, dialect=dialect.value).validate()
+def get_executor(
+    dialect: SqlDialect, pipelined: bool = False
+) -> Type["BaseSqlExecutor"]:
+    if not pipelined:
+        return _utils.import_object(executor_map[dialect])
+    if dialect not in pipeline_executor_map:
+        raise ValueError(f"Dialect {dialect.value} does not support pipelining")
+    return _utils.import_object(pipeline_executor_map[dialect])
 
 
-def run_sql(
-    sql: str, dialect: SqlDialect, engine_config: pydantic.BaseModel, dry_run: bool
+def _build_executor(
+    dialect: SqlDialect,
+    dry_run: bool,
+    insert_batch_size: int = _batching.DEFAULT_INSERT_BATCH_SIZE,
+    dry_run_mode: DryRunMode = DryRunMode.FULL,
+    journal: Optional["Journal"] = None,
+    resume: bool = False,
+    transaction_strategy: TransactionStrategy = TransactionStrategy.SINGLE,
+    commit_every: Optional[int] = None,
+    commit_interval: Optional[float] = None,
+    ledger: Optional["Ledger"] = None,
+    force: bool = False,
+    pipeline_depth: Optional[int] = None,
+) -> "BaseStatementExecutor":
+    """Create the executor that runs scripts, with the options shared by every mode"""
+    return get_executor(dialect, pipelined=pipeline_depth is not None)(
+        dry_run=dry_run,
+        insert_batch_size=insert_batch_size,
+        dry_run_mode=dry_run_mode,
+        journal=journal,
+        resume=resume,
+        transaction_strategy=transaction_strategy,
+        commit_every=commit_every,
+        commit_interval=commit_interval,
+        ledger=ledger,
+        force=force,
+        pipeline_depth=pipeline_depth,
+    )
+
+
+def get_async_executor(dialect: SqlDialect) -> Type["BaseAsyncStatementExecutor"]:
+    if dialect not in async_executor_map:
+        raise ValueError(f"Dialect {dialect.value} has no asyncio executor")
+    return _utils.import_object(async_executor_map[dialect])
+
+
+def get_config(dialect: SqlDialect) -> Type["pydantic.BaseModel"]:
+    return _utils.import_object(config_map[dialect])
+
+
+def _parse_file(
+    path: plb.Path, dialect: SqlDialect, use_cache: bool = True, lint: bool = False
+) -> "SqlParser":
+    from manuel import _cache, _parser
+
+    with _timings.phase("read"):
+        sql = _utils.read_sql_file(plb.Path(path).resolve())
+    parser = _parser.SqlParser(sql=sql, dialect=dialect.sqlfluff_dialect)
+    with _timings.phase("validate"):
+        parser.validate(
+            cache=_cache.ValidationCache() if use_cache else None,
+            mode=_parser.ValidationMode.LINT if lint else _parser.ValidationMode.PARSE,
+        )
+    return parser
+
+
+def parse_sql(
+    path: plb.Path, dialect: SqlDialect, use_cache: bool = True, lint: bool = False
 ):
-    executor_map[dialect](dry_run=dry_run).run(sql, **engine_config.model_dump())
+    """Validate a SQL file and split it into statements
+
+    Returns:
+        List[str]: The statements in the SQL file
+    """
+    return _parse_file(
+        path=path, dialect=dialect, use_cache=use_cache, lint=lint
+    ).statements
+
+
+def stream_sql(
+    path: plb.Path, dialect: SqlDialect, lint: bool = False
+) -> Iterator[str]:
+    """Lazily read, split and validate a SQL file one statement at a time
+
+    Unlike `parse_sql`, the file is never held in memory as a whole, and no parse tree
+    is built for the entire file. A statement that is not valid raises a ValueError
+    once it is reached.
+    """
+    from manuel import _parser, _splitter
+
+    # Fail early, rather than when the first statement is consumed
+    path = _utils._path_valid(plb.Path(path).resolve())
+    return _parser.validate_statements(
+        _splitter.split_statements(
+            _utils.iter_sql_file(path), dialect.sqlfluff_dialect
+        ),
+        dialect=dialect.sqlfluff_dialect,
+        mode=_parser.ValidationMode.LINT if lint else _parser.ValidationMode.PARSE,
+    )
+
+
+def pipeline_sql(
+    path: plb.Path, dialect: SqlDialect, lint: bool = False, buffer_size: int = 64
+) -> Iterator[str]:
+    """Like `stream_sql`, but read and validate statements in a background thread
+
+    This lets the next statements be validated while the current one is executed. If
+    a statement is not valid, the ValueError is raised when the consumer reaches it.
+    """
+    return _utils.iterate_in_thread(
+        stream_sql(path=path, dialect=dialect, lint=lint), buffer_size=buffer_size
+    )
+
+
+class ValidationResult(NamedTuple):
+    path: plb.Path
+    error: Optional[str] = None
+
+
+def _init_validation_worker(dialect: SqlDialect):
+    # Load the sqlfluff dialect and linter once per worker process, not once per file
+    from manuel import _parser
+
+    _parser.SqlParser(sql="", dialect=dialect.sqlfluff_dialect)
+    _parser._get_linter(dialect.sqlfluff_dialect)
+
+
+def _validate_file(
+    path: plb.Path, dialect: SqlDialect, use_cache: bool, lint: bool
+) -> ValidationResult:
+    try:
+        parse_sql(path=path, dialect=dialect, use_cache=use_cache, lint=lint)
+    # A file that cannot be read is reported like an invalid one, rather than
+    #  aborting the validation of the other files
+    except (ValueError, OSError, UnicodeDecodeError) as e:
+        return ValidationResult(path=path, error=str(e))
+    return ValidationResult(path=path)
+
+
+def validate_files(
+    paths: Iterable[Union[str, plb.Path]],
+    dialect: SqlDialect,
+    use_cache: bool = True,
+    lint: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[ValidationResult]:
+    """Validate SQL files, directories and glob patterns in parallel
+
+    Files are validated in a process pool that is sized to the number of available
+    CPUs. Each worker process creates one sqlfluff linter that is reused for all
+    files that it validates.
+
+    Returns:
+        List[ValidationResult]: One result per file, in the order in which the files
+          were collected.
+    """
+    files = _utils.collect_sql_files(paths)
+    max_workers = min(len(files), max_workers or _utils.available_cpus())
+    args = (
+        files,
+        itertools.repeat(dialect),
+        itertools.repeat(use_cache),
+        itertools.repeat(lint),
+    )
+    if max_workers <= 1:
+        return list(map(_validate_file, *args))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_validation_worker,
+        initargs=(dialect,),
+    ) as pool:
+        return list(
+            pool.map(
+                _validate_file,
+                *args,
+                chunksize=max(1, len(files) // (max_workers * 4)),
+            )
+        )
+
+
+def run_sql(
+    sql: Union[str, Iterable[str]],
+    dialect: SqlDialect,
+    engine_config: "pydantic.BaseModel",
+    dry_run: bool,
+    dry_run_mode: DryRunMode = DryRunMode.FULL,
+) -> List["StatementResult"]:
+    executor = get_executor(dialect)(dry_run=dry_run, dry_run_mode=dry_run_mode)
+    with _timings.phase("execute"):
+        return executor.run(sql, **engine_config.model_dump())
+
+
+def read_scripts(
+    paths: Iterable[Union[str, plb.Path]],
+    dialect: SqlDialect,
+    read_mode: ReadMode = ReadMode.PARSE,
+    use_cache: bool = True,
+) -> Iterable[Tuple[str, Iterable[str]]]:
+    """Collect SQL files and pair each file name with its statements
+
+    In PARSE mode all files are validated before this function returns, so that no
+    script is executed if any of them is not valid. In the other modes, files are
+    opened once the executor reaches them.
+    """
+    files = _utils.collect_sql_files(paths)
+    if read_mode == ReadMode.PARSE:
+        return [
+            (str(path), parse_sql(path=path, dialect=dialect, use_cache=use_cache))
+            for path in files
+        ]
+    read = pipeline_sql if read_mode == ReadMode.PIPELINE else stream_sql
+    return ((str(path), read(path=path, dialect=dialect)) for path in files)
+
+
+def run_scripts(
+    scripts: Iterable[Tuple[str, Iterable[str]]],
+    dialect: SqlDialect,
+    engine_config: "pydantic.BaseModel",
+    dry_run: bool,
+    transaction_scope: TransactionScope = TransactionScope.SCRIPT,
+    insert_batch_size: int = _batching.DEFAULT_INSERT_BATCH_SIZE,
+    dry_run_mode: DryRunMode = DryRunMode.FULL,
+    journal: Optional["Journal"] = None,
+    resume: bool = False,
+    transaction_strategy: TransactionStrategy = TransactionStrategy.SINGLE,
+    commit_every: Optional[int] = None,
+    commit_interval: Optional[float] = None,
+    ledger: Optional["Ledger"] = None,
+    force: bool = False,
+    pipeline_depth: Optional[int] = None,
+    engine: Optional[Any] = None,
+) -> List["ScriptResult"]:
+    """Execute scripts in order through a single engine
+
+    If a journal is given, every committed statement is recorded in it. With
+    `resume`, statements that the journal records as committed are skipped, so that
+    a failed run continues from the statement that failed.
+
+    The transaction strategy controls when statements are committed: once per script
+    (or once overall with a single transaction scope), every statement on its own, or
+    in batches of `commit_every` statements or `commit_interval` seconds. Committing
+    more often bounds the locks, undo and WAL that a large script holds on the
+    server, and the work that is lost when a statement fails. Dry runs require the
+    single transaction strategy.
+
+    If a ledger is given, scripts that it records as applied are skipped unless
+    `force` is set, and every script that is applied is recorded in it.
+
+    If `pipeline_depth` is given, up to that many consecutive statements are sent to
+    the database before their results are read, which saves a network round trip per
+    statement. Only supported for Postgres.
+
+    If `engine` is given, it must have been opened by `connect` of the executor of
+    the dialect, and is reused instead of opening a new engine.
+    """
+    return _build_executor(
+        dialect,
+        dry_run=dry_run,
+        insert_batch_size=insert_batch_size,
+        dry_run_mode=dry_run_mode,
+        journal=journal,
+        resume=resume,
+        transaction_strategy=transaction_strategy,
+        commit_every=commit_every,
+        commit_interval=commit_interval,
+        ledger=ledger,
+        force=force,
+        pipeline_depth=pipeline_depth,
+    ).run_scripts(
+        scripts,
+        transaction_scope=transaction_scope,
+        engine=engine,
+        **engine_config.model_dump(),
+    )
+
+
+def run_graph(
+    paths: Iterable[Union[str, plb.Path]],
+    dialect: SqlDialect,
+    engine_config: "pydantic.BaseModel",
+    dry_run: bool,
+    max_workers: int,
+    manifest: Optional[plb.Path] = None,
+    use_cache: bool = True,
+    insert_batch_size: int = _batching.DEFAULT_INSERT_BATCH_SIZE,
+    dry_run_mode: DryRunMode = DryRunMode.FULL,
+    journal: Optional["Journal"] = None,
+    resume: bool = False,
+    transaction_strategy: TransactionStrategy = TransactionStrategy.SINGLE,
+    commit_every: Optional[int] = None,
+    commit_interval: Optional[float] = None,
+    ledger: Optional["Ledger"] = None,
+    force: bool = False,
+    pipeline_depth: Optional[int] = None,
+) -> List["ScriptResult"]:
+    """Execute SQL files concurrently, respecting the dependencies between them
+
+    Dependencies are read from `manifest` if given. Otherwise a file depends on every
+    earlier file (in collection order) that writes to a table which it reads or writes,
+    or that reads a table which it writes. All files are validated before any of them
+    is executed. The journal, `resume`, the transaction strategy, the ledger, `force`
+    and `pipeline_depth` work as in `run_scripts`.
+
+    Returns:
+        List[ScriptResult]: The statement results of each file, in collection order
+    """
+    from manuel import _scheduler
+
+    files = _utils.collect_sql_files(paths)
+    parsers = {
+        str(path): _parse_file(path=path, dialect=dialect, use_cache=use_cache)
+        for path in files
+    }
+    names = list(parsers)
+    if manifest is not None:
+        dependencies = _scheduler.load_manifest(manifest, names)
+    else:
+        dependencies = _scheduler.infer_dependencies(
+            names,
+            reads=[set(parser.tables.reads) for parser in parsers.values()],
+            writes=[set(parser.tables.writes) for parser in parsers.values()],
+            barriers=[parser.tables.barrier for parser in parsers.values()],
+        )
+    logger.debug("Script dependencies: %s", dependencies)
+    executor = _build_executor(
+        dialect,
+        dry_run=dry_run,
+        insert_batch_size=insert_batch_size,
+        dry_run_mode=dry_run_mode,
+        journal=journal,
+        resume=resume,
+        transaction_strategy=transaction_strategy,
+        commit_every=commit_every,
+        commit_interval=commit_interval,
+        ledger=ledger,
+        force=force,
+        pipeline_depth=pipeline_depth,
+    )
+    results, graph = executor.run_graph(
+        {name: parser.statements for name, parser in parsers.items()},
+        dependencies=dependencies,
+        max_workers=max_workers,
+        **engine_config.model_dump(),
+    )
+    logger.info(
+        "Executed %s script(s) in %.3fs. Critical path (%.3fs): %s",
+        len(results),
+        graph.duration,
+        graph.critical_duration,
+        " -> ".join(graph.critical_path),
+    )
+    return results
+
+
+def run_targets(
+    paths: Iterable[Union[str, plb.Path]],
+    dialect: SqlDialect,
+    targets: List["Target"],
+    dry_run: bool,
+    max_workers: int,
+    use_cache: bool = True,
+    transaction_scope: TransactionScope = TransactionScope.SCRIPT,
+    insert_batch_size: int = _batching.DEFAULT_INSERT_BATCH_SIZE,
+    dry_run_mode: DryRunMode = DryRunMode.FULL,
+    transaction_strategy: TransactionStrategy = TransactionStrategy.SINGLE,
+    commit_every: Optional[int] = None,
+    commit_interval: Optional[float] = None,
+    ledger_table: Optional[str] = None,
+    force: bool = False,
+    report: Optional[plb.Path] = None,
+    pipeline_depth: Optional[int] = None,
+) -> List["TargetResult"]:
+    """Execute the same SQL files on many databases concurrently
+
+    The files are validated once, before anything is executed. Every target then
+    runs the files as in `run_scripts`, with its own executor and engine, on a pool of
+    up to `max_workers` threads. A failure on one target does not stop the others.
+    If `ledger_table` is given, every target keeps its own ledger in that table. The
+    results of all targets are logged, and written to `report` as JSON if given.
+
+    Returns:
+        List[TargetResult]: The result of each target, in the order of `targets`
+    """
+    from manuel import _fanout, _ledger
+
+    scripts = read_scripts(paths=paths, dialect=dialect, use_cache=use_cache)
+
+    def run(target: "Target") -> List["ScriptResult"]:
+        executor = _build_executor(
+            dialect,
+            dry_run=dry_run,
+            insert_batch_size=insert_batch_size,
+            dry_run_mode=dry_run_mode,
+            transaction_strategy=transaction_strategy,
+            commit_every=commit_every,
+            commit_interval=commit_interval,
+            ledger=(
+                _ledger.Ledger(dialect=dialect.value, table=ledger_table)
+                if ledger_table is not None
+                else None
+            ),
+            force=force,
+            pipeline_depth=pipeline_depth,
+        )
+        return executor.run_scripts(
+            scripts, transaction_scope=transaction_scope, **target.config.model_dump()
+        )
+
+    start = time.perf_counter()
+    results = _fanout.run_targets(targets, run, max_workers=max_workers)
+    duration = time.perf_counter() - start
+    _fanout.log_report(results, duration=duration)
+    if report is not None:
+        _fanout.write_report(report, results, duration=duration)
+    return results
+
+
+def load_file(
+    file: IO[bytes],
+    table: str,
+    dialect: SqlDialect,
+    engine_config: "pydantic.BaseModel",
+    dry_run: bool,
+    copy_format: CopyFormat = CopyFormat.CSV,
+    header: bool = False,
+    delimiter: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> "LoadResult":
+    """Bulk load a CSV or text file into a table
+
+    The file is streamed to the database in chunks, so it is never held in memory as
+    a whole. Only dialects whose executor implements `copy_from` are supported.
+    """
+    return get_executor(dialect)(dry_run=dry_run).load(
+        file,
+        table=table,
+        copy_format=copy_format,
+        header=header,
+        delimiter=delimiter,
+        columns=columns,
+        **engine_config.model_dump(),
+    )
+
+
+def query_sql(
+    path: plb.Path,
+    output: IO,
+    dialect: SqlDialect,
+    engine_config: "pydantic.BaseModel",
+    dry_run: bool,
+    output_format: OutputFormat = OutputFormat.CSV,
+    batch_size: int = 10_000,
+    use_cache: bool = True,
+) -> "QueryResult":
+    """Execute a SQL file and stream the rows of its last statement to `output`
+
+    All statements but the last are executed as in `run_scripts`, in the same
+    transaction as the query. The rows of the last statement are fetched from a
+    server-side cursor in batches of `batch_size`, so that memory usage does not depend
+    on the size of the result. Parquet and Arrow output, which must be written to a
+    binary file, is only supported for DuckDB and MotherDuck.
+    """
+    statements = parse_sql(path=path, dialect=dialect, use_cache=use_cache)
+    if not statements:
+        raise ValueError(f"SQL file '{path}' does not contain a query")
+    return get_executor(dialect)(dry_run=dry_run).query(
+        statements,
+        output=output,
+        output_format=output_format,
+        batch_size=batch_size,
+        **engine_config.model_dump(),
+    )
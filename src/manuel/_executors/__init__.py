@@ -1,5 +1,23 @@
-from .bigquery import BigQuerySqlAlchemyExecutor  # noqa
-from .databricks import DatabricksSqlAlchemyExecutor  # noqa
-from .duckdb import DuckdbSqlAlchemyExecutor  # noqa
-from .motherduck import MotherduckSqlAlchemyExecutor  # noqa
-from .postgres import PostgresSqlAlchemyExecutor  # noqa
+import importlib
+
+# Executors are imported on first access, so that importing this package does not
+#  import SQLAlchemy or any of the (optional) database drivers
+_executor_modules = {
+    "BigQuerySqlAlchemyExecutor": ".bigquery",
+    "DatabricksSqlAlchemyExecutor": ".databricks",
+    "DuckdbAsyncExecutor": ".duckdb_async",
+    "DuckdbNativeExecutor": ".duckdb_native",
+    "DuckdbSqlAlchemyExecutor": ".duckdb",
+    "MotherduckSqlAlchemyExecutor": ".motherduck",
+    "PostgresAsyncExecutor": ".postgres_async",
+    "PostgresPipelineExecutor": ".postgres_pipeline",
+    "PostgresSqlAlchemyExecutor": ".postgres",
+}
+
+__all__ = list(_executor_modules)
+
+
+def __getattr__(name: str):
+    if name not in _executor_modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_executor_modules[name], __name__), name)
@@ -0,0 +1,193 @@
+import abc
+import asyncio
+import logging
+import time
+from typing import (
+    Any,
+    AsyncContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from manuel._core import TransactionScope
+from manuel._executors.runner import (
+    ScriptResult,
+    StatementResult,
+    _preview,
+    log_statement_results,
+)
+
+logger = logging.getLogger("manuel._executors.async_runner")
+
+
+class BaseAsyncStatementExecutor(abc.ABC):
+    """Executes scripts statement by statement on an asyncio event loop
+
+    The asynchronous counterpart of `BaseStatementExecutor`, for use as a library when
+    many scripts or databases are driven concurrently from a single event loop.
+    Subclasses provide the connection handling through `connect`, `session` and
+    `execute_sql`. A session is an object with awaitable `commit` and `rollback`
+    methods, such as a SQLAlchemy `AsyncConnection`.
+
+    Statements run in a single transaction per session, like with the single
+    transaction strategy of the synchronous executors. Journals, ledgers, batched
+    INSERTs and plan-only dry runs are only supported by the synchronous executors.
+    """
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+
+    @abc.abstractmethod
+    def connect(
+        self, pool_size: Optional[int] = None, **engine_kwargs
+    ) -> AsyncContextManager[Any]:
+        """Open an engine, i.e. anything from which sessions can be created
+
+        Args:
+            pool_size (Optional[int], optional): Number of sessions that may be used
+              concurrently, if more than one
+        """
+
+    @abc.abstractmethod
+    def session(self, engine: Any) -> AsyncContextManager[Any]:
+        """Open a session, in which statements are executed in a transaction"""
+
+    @abc.abstractmethod
+    async def execute_sql(self, sql: str, session: Any) -> Any: ...
+
+    async def commit(self, session: Any):
+        await session.commit()
+
+    async def rollback(self, session: Any):
+        await session.rollback()
+
+    async def execute_statement(
+        self, index: int, sql: str, session: Any
+    ) -> StatementResult:
+        """Execute a single statement and record its wall time and rowcount"""
+        start = time.perf_counter()
+        try:
+            result = await self.execute_sql(sql, session)
+        except Exception:
+            logger.error(
+                "Statement %s failed after %.3fs", index, time.perf_counter() - start
+            )
+            raise
+        duration = time.perf_counter() - start
+        rowcount = getattr(result, "rowcount", None)
+        # DBAPI drivers report -1 if the rowcount is not known
+        rowcount = rowcount if isinstance(rowcount, int) and rowcount >= 0 else None
+        logger.debug(
+            "Statement %s finished in %.3fs (rowcount: %s)", index, duration, rowcount
+        )
+        return StatementResult(
+            index=index, preview=_preview(sql), duration=duration, rowcount=rowcount
+        )
+
+    async def run(
+        self, sql: Union[str, Iterable[str]], **engine_kwargs
+    ) -> List[StatementResult]:
+        """Execute SQL statements one by one in a single transaction
+
+        Args:
+            sql (Union[str, Iterable[str]]): Either a single SQL string, which is sent
+              to the database as-is, or the individual statements of a script
+
+        Returns:
+            List[StatementResult]: Wall time and rowcount of each statement
+        """
+        (result,) = await self.run_scripts([("<sql>", sql)], **engine_kwargs)
+        return result.statements
+
+    async def run_scripts(
+        self,
+        scripts: Iterable[Tuple[str, Union[str, Iterable[str]]]],
+        transaction_scope: TransactionScope = TransactionScope.SCRIPT,
+        **engine_kwargs,
+    ) -> List[ScriptResult]:
+        """Execute scripts in order through a single engine
+
+        Args:
+            scripts (Iterable[Tuple[str, Union[str, Iterable[str]]]]): Pairs of a script
+              name and its SQL, see `run`
+            transaction_scope (TransactionScope, optional): Whether to use one
+              transaction per script, or one transaction across all scripts.
+
+        Returns:
+            List[ScriptResult]: The statement results of each script
+        """
+        results = []
+        async with self.connect(**engine_kwargs) as engine:
+            if transaction_scope == TransactionScope.SINGLE:
+                async with self.session(engine) as session:
+                    for name, sql in scripts:
+                        results.append(await self.run_script(name, sql, session))
+                    await self.end_transaction(session)
+            else:
+                for name, sql in scripts:
+                    async with self.session(engine) as session:
+                        results.append(await self.run_script(name, sql, session))
+                        await self.end_transaction(session)
+        return results
+
+    async def run_concurrently(
+        self,
+        scripts: Dict[str, Union[str, Iterable[str]]],
+        max_concurrency: int,
+        **engine_kwargs,
+    ) -> List[ScriptResult]:
+        """Execute independent scripts concurrently, each in its own transaction
+
+        At most `max_concurrency` scripts run at a time, each on its own session of
+        a single engine. If a script fails, the scripts that are still running are
+        cancelled and rolled back, and the error is raised. Scripts that completed
+        before stay committed.
+
+        Returns:
+            List[ScriptResult]: The statement results of each script in the order of
+              `scripts`
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with self.connect(pool_size=max_concurrency, **engine_kwargs) as engine:
+
+            async def run(name: str, sql: Union[str, Iterable[str]]) -> ScriptResult:
+                async with semaphore, self.session(engine) as session:
+                    result = await self.run_script(name, sql, session)
+                    await self.end_transaction(session)
+                    return result
+
+            tasks = [asyncio.ensure_future(run(*script)) for script in scripts.items()]
+            try:
+                return list(await asyncio.gather(*tasks))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                # Wait for the sessions to close before the engine is closed
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+    async def run_script(
+        self, name: str, sql: Union[str, Iterable[str]], session: Any
+    ) -> ScriptResult:
+        logger.debug("Executing script: %s", name)
+        statements = [sql] if isinstance(sql, str) else sql
+        start = time.perf_counter()
+        results: List[StatementResult] = []
+        for statement in statements:
+            results.append(
+                await self.execute_statement(len(results), statement, session)
+            )
+        log_statement_results(results)
+        return ScriptResult(
+            name=name, statements=results, duration=time.perf_counter() - start
+        )
+
+    async def end_transaction(self, session: Any):
+        if self.dry_run:
+            await self.rollback(session)
+        else:
+            await self.commit(session)
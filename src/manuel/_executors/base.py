@@ -3,52 +3,122 @@ import contextlib
 import logging
 from typing import Any, Dict, Iterator, Optional
 
-from sqlalchemy import Engine, create_engine, text
-from sqlalchemy.orm import Session
+from sqlalchemy import Connection, Engine, create_engine, text
 
-logger = logging.getLogger("manuel._executors.base")
-
-
-class BaseSqlExecutor(abc.ABC):
+from manuel import _batching, _journal, _ledger, _timings
+from manuel._core import DryRunMode, TransactionStrategy
+from manuel._executors.runner import (  # noqa: F401
+    BaseSqlExecutor,
+    BaseStatementExecutor,
+    LoadResult,
+    Plan,
+    QueryResult,
+    ScriptResult,
+    StatementResult,
+    _preview,
+    log_statement_results,
+)
 
-    @abc.abstractmethod
-    def run(self, sql: str, **engine_kwargs): ...
+logger = logging.getLogger("manuel._executors.base")
 
 
-class BaseSqlAlchemyExecutor(BaseSqlExecutor):
+class BaseSqlAlchemyExecutor(BaseStatementExecutor):
 
     def __init__(
         self,
         engine_connect_args: Optional[Dict[str, Any]] = None,
         dry_run: bool = False,
+        engine_options: Optional[Dict[str, Any]] = None,
+        insert_batch_size: int = _batching.DEFAULT_INSERT_BATCH_SIZE,
+        dry_run_mode: DryRunMode = DryRunMode.FULL,
+        journal: Optional[_journal.Journal] = None,
+        resume: bool = False,
+        transaction_strategy: TransactionStrategy = TransactionStrategy.SINGLE,
+        commit_every: Optional[int] = None,
+        commit_interval: Optional[float] = None,
+        ledger: Optional[_ledger.Ledger] = None,
+        force: bool = False,
+        pipeline_depth: Optional[int] = None,
     ):
+        super().__init__(
+            dry_run=dry_run,
+            insert_batch_size=insert_batch_size,
+            dry_run_mode=dry_run_mode,
+            journal=journal,
+            resume=resume,
+            transaction_strategy=transaction_strategy,
+            commit_every=commit_every,
+            commit_interval=commit_interval,
+            ledger=ledger,
+            force=force,
+            pipeline_depth=pipeline_depth,
+        )
         self.engine_connect_args = engine_connect_args if engine_connect_args else {}
-        self.dry_run = dry_run
+        # Connections are checked before use, since a single engine may be used for
+        #  many scripts and connections can go stale between them
+        self.engine_options = {"pool_pre_ping": True, **(engine_options or {})}
 
     @staticmethod
     @abc.abstractmethod
     def format_connection_string(**kwargs) -> str: ...
 
+    def get_connect_args(self) -> Dict[str, Any]:
+        return dict(self.engine_connect_args)
+
     @contextlib.contextmanager
     def get_engine(self, connection_string: str) -> Iterator[Engine]:
-        try:
+        with _timings.phase("engine"):
             engine = create_engine(
-                connection_string, connect_args=self.engine_connect_args
+                connection_string,
+                connect_args=self.get_connect_args(),
+                **self.engine_options,
             )
+        try:
             yield engine
+        finally:
+            # Also release connections if the run is aborted
             engine.dispose()
+
+    def connect(self, pool_size: Optional[int] = None, **engine_kwargs):
+        if pool_size is not None:
+            # Every concurrent session needs its own connection
+            self.engine_options = {**self.engine_options, "pool_size": pool_size}
+        return self.get_engine(self.format_connection_string(**engine_kwargs))
+
+    @contextlib.contextmanager
+    def session(self, engine: Engine, autocommit: bool = False) -> Iterator[Connection]:
+        # Statements are executed on a Core connection, which begins a transaction
+        #  with the first statement and rolls it back on close unless it was committed
+        with _timings.phase("connect"):
+            pending = engine.connect()
+        with pending as connection:
+            if autocommit:
+                connection.execution_options(isolation_level="AUTOCOMMIT")
+            yield connection
+
+    @contextlib.contextmanager
+    def autocommit_mode(self, session: Connection) -> Iterator[Connection]:
+        if not self.supports_autocommit:
+            yield session
+            return
+        session.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            yield session
         finally:
-            ...
+            session.execution_options(isolation_level=session.default_isolation_level)
+
+    def savepoint(self, session: Connection):
+        return session.begin_nested()
+
+    def stream_rows(self, sql: str, session: Connection, batch_size: int):
+        # Rows are fetched from a server-side cursor where the driver supports one,
+        #  instead of being buffered on the client
+        result = session.execute(
+            text(sql),
+            execution_options={"stream_results": True, "yield_per": batch_size},
+        )
+        return list(result.keys()), result.partitions(batch_size)
 
-    def execute_sql(self, sql: str, session: Session):
+    def execute_sql(self, sql: str, session: Connection):
         logger.debug("Executing statement: \n\n%s", sql)
-        session.execute(text(sql))
-
-    def run(self, sql: str, **engine_kwargs):
-        with self.get_engine(self.format_connection_string(**engine_kwargs)) as engine:
-            with Session(engine) as session:
-                self.execute_sql(sql, session)
-                if self.dry_run:
-                    session.rollback()
-                else:
-                    session.commit()
+        return session.execute(text(sql))
@@ -1,14 +1,9 @@
 import logging
 
 from manuel._executors.base import BaseSqlAlchemyExecutor
-from manuel._utils import requires_extra
+from manuel._utils import is_installed, requires_extra
 
-try:
-    import sqlalchemy_bigquery  # noqa
-except ImportError:
-    _has_bigquery = False
-else:
-    _has_bigquery = True
+_has_bigquery = is_installed("sqlalchemy_bigquery")
 
 
 logger = logging.getLogger("manuel._executors.bigquery")
@@ -3,14 +3,9 @@ import logging
 import pydantic
 
 from manuel._executors.base import BaseSqlAlchemyExecutor
-from manuel._utils import requires_extra
-
-try:
-    from databricks import sql  # noqa
-except ImportError:
-    _has_databricks_sql_connector = False
-else:
-    _has_databricks_sql_connector = True
+from manuel._utils import is_installed, requires_extra
+
+_has_databricks_sql_connector = is_installed("databricks.sql")
 
 
 logger = logging.getLogger("manuel._executors.databricks")
@@ -1,18 +1,19 @@
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import pydantic
+from sqlalchemy import Connection
 
 from manuel._config import DuckdbAccessMode
-from manuel._executors.base import BaseSqlAlchemyExecutor
-from manuel._utils import requires_extra
+from manuel._executors.base import BaseSqlAlchemyExecutor, Plan
+from manuel._executors.duckdb_native import (
+    _without_unset_settings,
+    explain,
+    fetch_record_batches,
+)
+from manuel._utils import is_installed, requires_extra
 
-try:
-    import duckdb_engine  # noqa
-except ImportError:
-    _has_duckdb_engine = False
-else:
-    _has_duckdb_engine = True
+_has_duckdb_engine = is_installed("duckdb_engine")
 
 
 logger = logging.getLogger("manuel._executors.duckdb")
@@ -20,6 +21,12 @@ logger = logging.getLogger("manuel._executors.duckdb")
 
 class DuckdbSqlAlchemyExecutor(BaseSqlAlchemyExecutor):
 
+    def get_connect_args(self) -> Dict[str, Any]:
+        connect_args = super().get_connect_args()
+        if "config" in connect_args:
+            connect_args["config"] = _without_unset_settings(connect_args["config"])
+        return connect_args
+
     @requires_extra(
         library_name="duckdb",
         extra_name="duckdb_engine",
@@ -56,3 +63,11 @@ class DuckdbSqlAlchemyExecutor(BaseSqlAlchemyExecutor):
         }
         self.engine_connect_args = connect_args
         return connection_string
+
+    def stream_record_batches(self, sql: str, session: Connection, batch_size: int):
+        # The duckdb connection that underlies the session, in the same transaction
+        connection = session.connection.dbapi_connection
+        return fetch_record_batches(connection, sql, batch_size)
+
+    def explain(self, sql: str, session: Connection) -> Plan:
+        return explain(session.connection.dbapi_connection, sql)
@@ -0,0 +1,68 @@
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from manuel._executors.async_runner import BaseAsyncStatementExecutor
+from manuel._executors.duckdb_native import DuckdbNativeExecutor
+from manuel._utils import is_installed, requires_extra
+
+if TYPE_CHECKING:
+    import duckdb
+
+_has_duckdb = is_installed("duckdb")
+
+
+logger = logging.getLogger("manuel._executors.duckdb_async")
+
+
+class DuckdbAsyncExecutor(BaseAsyncStatementExecutor):
+    """Executes SQL through the duckdb client in worker threads
+
+    The duckdb client is synchronous, so every call is run in the default executor of
+    the event loop. DuckDB releases the GIL while it executes a statement, so
+    statements of different sessions run in parallel. As for `DuckdbNativeExecutor`,
+    each session is a cursor on a database that is opened once per run, in an
+    explicit transaction that is rolled back if it is not committed.
+    """
+
+    @requires_extra(
+        library_name="duckdb",
+        extra_name="duckdb",
+        extra_installed=_has_duckdb,
+    )
+    @contextlib.asynccontextmanager
+    async def connect(
+        self, pool_size: Optional[int] = None, *, database: str, **settings
+    ) -> AsyncIterator["duckdb.DuckDBPyConnection"]:
+        import duckdb
+
+        connection = await asyncio.to_thread(
+            duckdb.connect, database, config=DuckdbNativeExecutor.get_config(**settings)
+        )
+        try:
+            yield connection
+        finally:
+            await asyncio.to_thread(connection.close)
+
+    @contextlib.asynccontextmanager
+    async def session(
+        self, engine: "duckdb.DuckDBPyConnection"
+    ) -> AsyncIterator["duckdb.DuckDBPyConnection"]:
+        cursor = await asyncio.to_thread(engine.cursor)
+        try:
+            await asyncio.to_thread(cursor.begin)
+            yield cursor
+        finally:
+            # Rolls back the transaction, unless it was committed
+            await asyncio.to_thread(cursor.close)
+
+    async def execute_sql(self, sql: str, session: "duckdb.DuckDBPyConnection"):
+        logger.debug("Executing statement: \n\n%s", sql)
+        return await asyncio.to_thread(session.execute, sql)
+
+    async def commit(self, session: "duckdb.DuckDBPyConnection"):
+        await asyncio.to_thread(session.commit)
+
+    async def rollback(self, session: "duckdb.DuckDBPyConnection"):
+        await asyncio.to_thread(session.rollback)
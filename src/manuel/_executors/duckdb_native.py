@@ -0,0 +1,182 @@
+import contextlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+import pydantic
+
+from manuel import _timings
+from manuel._config import DuckdbAccessMode
+from manuel._executors.runner import BaseStatementExecutor, Plan
+from manuel._utils import is_installed, requires_extra
+
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow
+
+_has_duckdb = is_installed("duckdb")
+_has_pyarrow = is_installed("pyarrow")
+
+
+logger = logging.getLogger("manuel._executors.duckdb_native")
+
+
+def _without_unset_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    # DuckDB rejects settings with a None value. The S3 settings additionally require
+    #  the httpfs extension, so they are only passed on if S3 is actually configured.
+    config = {k: v for k, v in config.items() if v is not None}
+    if set(config) & {"s3_access_key_id", "s3_secret_access_key", "s3_endpoint"}:
+        return config
+    return {k: v for k, v in config.items() if not k.startswith("s3_")}
+
+
+@requires_extra(
+    library_name="pyarrow", extra_name="arrow", extra_installed=_has_pyarrow
+)
+def fetch_record_batches(
+    connection: "duckdb.DuckDBPyConnection", sql: str, batch_size: int
+) -> "pyarrow.RecordBatchReader":
+    """Execute a query on a duckdb connection and stream its result as Arrow batches
+
+    DuckDB produces the batches from its own columnar vectors, so no Python object is
+    created per value.
+    """
+    result = connection.execute(sql)
+    # Newer duckdb versions deprecate fetch_record_batch in favour of to_arrow_reader
+    if hasattr(result, "to_arrow_reader"):
+        return result.to_arrow_reader(batch_size)
+    return result.fetch_record_batch(batch_size)
+
+
+def explain(connection: "duckdb.DuckDBPyConnection", sql: str) -> Plan:
+    """Plan a statement on a duckdb connection without executing it
+
+    DuckDB does not estimate costs, so only the estimated number of rows of the
+    top-most operator that has an estimate is reported.
+    """
+    rows = dict(connection.execute(f"EXPLAIN (FORMAT JSON) {sql}").fetchall())
+    nodes = list(json.loads(rows["physical_plan"]))
+    while nodes:
+        node = nodes.pop(0)
+        estimate = node.get("extra_info", {}).get("Estimated Cardinality")
+        if estimate is not None:
+            return Plan(rows=int(estimate))
+        nodes.extend(node.get("children", []))
+    return Plan()
+
+
+class DuckdbNativeExecutor(BaseStatementExecutor):
+    """Executes SQL through the duckdb client directly, without SQLAlchemy
+
+    The database is opened once per run. Each session is a cursor on it, which is a
+    separate connection to the same database, so sessions can be used from different
+    threads and share in-memory databases. Unless it is in autocommit mode, every
+    session runs in an explicit transaction that is rolled back if it is not committed.
+    """
+
+    supports_autocommit = True
+
+    @staticmethod
+    def get_config(
+        access_mode: DuckdbAccessMode,
+        allow_community_extensions: bool,
+        s3_access_key_id: Optional[pydantic.SecretStr] = None,
+        s3_secret_access_key: Optional[pydantic.SecretStr] = None,
+        s3_endpoint: Optional[str] = None,
+        s3_region: Optional[str] = None,
+        s3_use_ssl: bool = True,
+    ) -> Dict[str, Any]:
+        return _without_unset_settings(
+            {
+                "access_mode": access_mode.value,
+                "allow_community_extensions": allow_community_extensions,
+                "s3_access_key_id": (
+                    s3_access_key_id.get_secret_value() if s3_access_key_id else None
+                ),
+                "s3_secret_access_key": (
+                    s3_secret_access_key.get_secret_value()
+                    if s3_secret_access_key
+                    else None
+                ),
+                "s3_endpoint": s3_endpoint,
+                "s3_region": s3_region,
+                "s3_use_ssl": s3_use_ssl,
+            }
+        )
+
+    @requires_extra(
+        library_name="duckdb",
+        extra_name="duckdb",
+        extra_installed=_has_duckdb,
+    )
+    @contextlib.contextmanager
+    def connect(
+        self, pool_size: Optional[int] = None, *, database: str, **settings
+    ) -> Iterator["duckdb.DuckDBPyConnection"]:
+        import duckdb
+
+        with _timings.phase("connect"):
+            connection = duckdb.connect(database, config=self.get_config(**settings))
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextlib.contextmanager
+    def session(
+        self, engine: "duckdb.DuckDBPyConnection", autocommit: bool = False
+    ) -> Iterator["duckdb.DuckDBPyConnection"]:
+        cursor = engine.cursor()
+        try:
+            # Without an explicit transaction, duckdb commits every statement
+            if not autocommit:
+                cursor.begin()
+            yield cursor
+        finally:
+            # Rolls back the transaction, unless it was committed
+            cursor.close()
+
+    def execute_sql(self, sql: str, session: "duckdb.DuckDBPyConnection"):
+        logger.debug("Executing statement: \n\n%s", sql)
+        # Scripts that are passed as a single string may hold many statements, which
+        #  duckdb executes one after the other
+        return session.execute(sql)
+
+    def stream_rows(
+        self, sql: str, session: "duckdb.DuckDBPyConnection", batch_size: int
+    ):
+        session.execute(sql)
+        columns = [column[0] for column in session.description or []]
+
+        def batches():
+            while batch := session.fetchmany(batch_size):
+                yield batch
+
+        return columns, batches()
+
+    def stream_record_batches(
+        self, sql: str, session: "duckdb.DuckDBPyConnection", batch_size: int
+    ) -> "pyarrow.RecordBatchReader":
+        return fetch_record_batches(session, sql, batch_size)
+
+    def explain(self, sql: str, session: "duckdb.DuckDBPyConnection") -> Plan:
+        return explain(session, sql)
+
+    def commit(self, session: "duckdb.DuckDBPyConnection"):
+        session.commit()
+        session.begin()
+
+    @contextlib.contextmanager
+    def autocommit_mode(
+        self, session: "duckdb.DuckDBPyConnection"
+    ) -> Iterator["duckdb.DuckDBPyConnection"]:
+        # `commit` began a new transaction, which is still empty
+        session.rollback()
+        try:
+            yield session
+        finally:
+            session.begin()
+
+    def restart_transaction(self, session: "duckdb.DuckDBPyConnection"):
+        session.rollback()
+        session.begin()
@@ -1,17 +1,14 @@
 import logging
 
 import pydantic
+from sqlalchemy import Connection
 
 from manuel._config import DuckdbAccessMode
-from manuel._executors.base import BaseSqlAlchemyExecutor
-from manuel._utils import requires_extra
+from manuel._executors.base import BaseSqlAlchemyExecutor, Plan
+from manuel._executors.duckdb_native import explain, fetch_record_batches
+from manuel._utils import is_installed, requires_extra
 
-try:
-    import duckdb_engine  # noqa
-except ImportError:
-    _has_duckdb_engine = False
-else:
-    _has_duckdb_engine = True
+_has_duckdb_engine = is_installed("duckdb_engine")
 
 
 logger = logging.getLogger("manuel._executors.motherduck")
@@ -41,3 +38,11 @@ class MotherduckSqlAlchemyExecutor(BaseSqlAlchemyExecutor):
         }
         self.engine_connect_args = connect_args
         return connection_string
+
+    def stream_record_batches(self, sql: str, session: Connection, batch_size: int):
+        # The duckdb connection that underlies the session, in the same transaction
+        connection = session.connection.dbapi_connection
+        return fetch_record_batches(connection, sql, batch_size)
+
+    def explain(self, sql: str, session: Connection) -> Plan:
+        return explain(session.connection.dbapi_connection, sql)
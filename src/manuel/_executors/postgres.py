@@ -1,22 +1,71 @@
+import json
 import logging
+import re
+from typing import IO, Any, List, Optional
 
 import pydantic
+from sqlalchemy import Connection, text
 
-from manuel._executors.base import BaseSqlAlchemyExecutor
-from manuel._utils import requires_extra
+from manuel._core import CopyFormat
+from manuel._executors.base import BaseSqlAlchemyExecutor, Plan
+from manuel._utils import is_installed, requires_extra
 
-try:
-    import psycopg2  # noqa
-except ImportError:
-    _has_psycopg = False
-else:
-    _has_psycopg = True
+_has_psycopg = is_installed("psycopg2")
 
 
 logger = logging.getLogger("manuel._executors.postgres")
 
+# Size of the chunks in which files are sent to the server during COPY
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def copy_statement(
+    sql: Any,
+    table: str,
+    copy_format: CopyFormat,
+    header: bool,
+    delimiter: Optional[str],
+    columns: Optional[List[str]],
+) -> Any:
+    """Compose a COPY FROM STDIN statement
+
+    Args:
+        sql (Any): The `sql` module of psycopg2 or psycopg, which share this API
+    """
+    options = [sql.SQL("FORMAT {}").format(sql.SQL(copy_format.value))]
+    if header:
+        options.append(sql.SQL("HEADER true"))
+    if delimiter is not None:
+        options.append(sql.SQL("DELIMITER {}").format(sql.Literal(delimiter)))
+    return sql.SQL("COPY {table}{columns} FROM STDIN WITH ({options})").format(
+        table=sql.Identifier(*table.split(".")),
+        columns=(
+            sql.SQL(" ({})").format(sql.SQL(", ").join(map(sql.Identifier, columns)))
+            if columns
+            else sql.SQL("")
+        ),
+        options=sql.SQL(", ").join(options),
+    )
+
 
 class PostgresSqlAlchemyExecutor(BaseSqlAlchemyExecutor):
+    supports_savepoints = True
+    supports_autocommit = True
+    non_transactional_statements = re.compile(
+        r"(?:(?:CREATE\s+(?:UNIQUE\s+)?|DROP\s+)INDEX\s+CONCURRENTLY"
+        r"|REINDEX\s+(?:\([^)]*\)\s*)?(?:(?:INDEX|TABLE|SCHEMA)\s+CONCURRENTLY"
+        r"|DATABASE|SYSTEM)"
+        r"|ALTER\s+TABLE\s[^;]*\sDETACH\s+PARTITION\s[^;]*\sCONCURRENTLY"
+        r"|VACUUM|(?:CREATE|DROP)\s+(?:DATABASE|TABLESPACE)|ALTER\s+SYSTEM)\b",
+        re.IGNORECASE,
+    )
+    # See https://www.postgresql.org/docs/current/sql-explain.html
+    explainable_statements = re.compile(
+        r"(?:SELECT|INSERT|UPDATE|DELETE|MERGE|VALUES|WITH|TABLE|EXECUTE|DECLARE"
+        r"|CREATE\s+(?:(?:GLOBAL|LOCAL)\s+)?(?:TEMP(?:ORARY)?\s+|UNLOGGED\s+)?TABLE"
+        r"\b[^(]*?\bAS\b|CREATE\s+MATERIALIZED\s+VIEW)\b",
+        re.IGNORECASE,
+    )
 
     @staticmethod
     @requires_extra(
@@ -34,3 +83,34 @@ class PostgresSqlAlchemyExecutor(BaseSqlAlchemyExecutor):
             port,
             database,
         )
+
+    def copy_from(
+        self,
+        session: Connection,
+        file: IO[bytes],
+        table: str,
+        copy_format: CopyFormat,
+        header: bool,
+        delimiter: Optional[str],
+        columns: Optional[List[str]],
+    ) -> Optional[int]:
+        """Stream a file into a table using COPY FROM STDIN"""
+        from psycopg2 import sql
+
+        statement = copy_statement(
+            sql, table, copy_format, header=header, delimiter=delimiter, columns=columns
+        )
+        # COPY is not supported by SQLAlchemy, so the psycopg2 connection of the
+        #  session is used directly, within the same transaction
+        connection = session.connection.dbapi_connection
+        with connection.cursor() as cursor:
+            logger.debug("Executing statement: \n\n%s", statement.as_string(cursor))
+            cursor.copy_expert(statement, file, size=COPY_CHUNK_SIZE)
+            return cursor.rowcount if cursor.rowcount >= 0 else None
+
+    def explain(self, sql: str, session: Connection) -> Plan:
+        (plan,) = session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).one()
+        # psycopg2 parses json columns, other drivers may not
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        root = plan[0]["Plan"]
+        return Plan(cost=root.get("Total Cost"), rows=root.get("Plan Rows"))
@@ -0,0 +1,74 @@
+import contextlib
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+import pydantic
+from sqlalchemy import text
+
+from manuel._executors.async_runner import BaseAsyncStatementExecutor
+from manuel._utils import is_installed, requires_extra
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# SQLAlchemy's asyncio extension runs on greenlet
+_has_asyncpg = is_installed("asyncpg") and is_installed("greenlet")
+
+
+logger = logging.getLogger("manuel._executors.postgres_async")
+
+
+class PostgresAsyncExecutor(BaseAsyncStatementExecutor):
+    """Executes SQL on Postgres through SQLAlchemy's asyncio extension and asyncpg"""
+
+    def __init__(
+        self, dry_run: bool = False, engine_options: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(dry_run=dry_run)
+        # Connections are checked before use, as for the synchronous executors
+        self.engine_options = {"pool_pre_ping": True, **(engine_options or {})}
+
+    @staticmethod
+    @requires_extra(
+        library_name="asyncpg",
+        extra_name="postgres-async",
+        extra_installed=_has_asyncpg,
+    )
+    def format_connection_string(
+        user: str, password: pydantic.SecretStr, host: str, port: int, database: str
+    ) -> str:
+        return "postgresql+asyncpg://%s:%s@%s:%s/%s" % (
+            user,
+            password.get_secret_value(),
+            host,
+            port,
+            database,
+        )
+
+    @contextlib.asynccontextmanager
+    async def connect(
+        self, pool_size: Optional[int] = None, **engine_kwargs
+    ) -> AsyncIterator["AsyncEngine"]:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        engine_options = dict(self.engine_options)
+        if pool_size is not None:
+            # Every concurrent session needs its own connection
+            engine_options["pool_size"] = pool_size
+        engine = create_async_engine(
+            self.format_connection_string(**engine_kwargs), **engine_options
+        )
+        try:
+            yield engine
+        finally:
+            await engine.dispose()
+
+    @contextlib.asynccontextmanager
+    async def session(self, engine: "AsyncEngine") -> AsyncIterator["AsyncConnection"]:
+        # Rolls back the transaction on close, unless it was committed
+        async with engine.connect() as connection:
+            yield connection
+
+    async def execute_sql(self, sql: str, session: "AsyncConnection"):
+        logger.debug("Executing statement: \n\n%s", sql)
+        return await session.execute(text(sql))
@@ -0,0 +1,179 @@
+import logging
+import time
+from typing import IO, Iterable, Iterator, List, Optional
+
+import pydantic
+from sqlalchemy import Connection
+
+from manuel import _batching
+from manuel._core import CopyFormat
+from manuel._executors.base import StatementResult, _preview
+from manuel._executors.postgres import (
+    COPY_CHUNK_SIZE,
+    PostgresSqlAlchemyExecutor,
+    copy_statement,
+)
+from manuel._utils import is_installed, requires_extra
+
+_has_psycopg = is_installed("psycopg")
+
+
+logger = logging.getLogger("manuel._executors.postgres_pipeline")
+
+DEFAULT_PIPELINE_DEPTH = 100
+
+
+class PostgresPipelineExecutor(PostgresSqlAlchemyExecutor):
+    """Executes SQL on Postgres through psycopg 3 in pipeline mode
+
+    Up to `pipeline_depth` consecutive statements are sent to the server at once, and
+    their results are read afterwards, so that a group costs a single network round
+    trip instead of one per statement. Consecutive single-row INSERTs are still
+    merged as usual within a group.
+
+    Each group runs behind a savepoint. If any statement of a group fails, the group
+    is rolled back to the savepoint and replayed one statement at a time, so that the
+    error is attributed to the statement that caused it and the results are the same
+    as without pipelining.
+    """
+
+    supports_pipelining = True
+
+    @staticmethod
+    @requires_extra(
+        library_name="psycopg",
+        extra_name="postgres-pipeline",
+        extra_installed=_has_psycopg,
+    )
+    def format_connection_string(
+        user: str, password: pydantic.SecretStr, host: str, port: int, database: str
+    ) -> str:
+        return "postgresql+psycopg://%s:%s@%s:%s/%s" % (
+            user,
+            password.get_secret_value(),
+            host,
+            port,
+            database,
+        )
+
+    def connect(self, pool_size: Optional[int] = None, **engine_kwargs):
+        engine = super().connect(pool_size=pool_size, **engine_kwargs)
+        import psycopg
+
+        if not psycopg.Pipeline.is_supported():
+            raise RuntimeError(
+                "Pipeline mode requires psycopg to be built against libpq 14 or newer"
+            )
+        return engine
+
+    def group_statements(self, statements: Iterable[str]) -> Iterator[List[str]]:
+        depth = self.pipeline_depth or DEFAULT_PIPELINE_DEPTH
+        if self.autocommit:
+            # Every statement commits by itself, so a failed group cannot be replayed
+            depth = 1
+        if self.commit_every is not None:
+            # Commits happen between groups, so groups must not overshoot them
+            depth = min(depth, self.commit_every)
+        return _batching.group_consecutive(
+            statements, group_size=depth, isolate=self.requires_autocommit
+        )
+
+    def execute_batch(
+        self, index: int, statements: List[str], session: Connection
+    ) -> List[StatementResult]:
+        if len(statements) == 1:
+            return [self.execute_statement(index, statements[0], session)]
+        start = time.perf_counter()
+        try:
+            with self.savepoint(session):
+                rowcounts = self.execute_pipeline(statements, session)
+        except Exception as e:
+            logger.debug(
+                "Pipeline of statements %s to %s failed, executing them one by one: %s",
+                index,
+                index + len(statements) - 1,
+                e,
+            )
+            return [
+                self.execute_statement(index + offset, statement, session)
+                for offset, statement in enumerate(statements)
+            ]
+        # Results are read at once, so the wall time is spread evenly over the group
+        duration = (time.perf_counter() - start) / len(statements)
+        logger.debug(
+            "Statements %s to %s finished as a pipeline in %.3fs",
+            index,
+            index + len(statements) - 1,
+            duration * len(statements),
+        )
+        return [
+            StatementResult(
+                index=index + offset,
+                preview=_preview(statement),
+                duration=duration,
+                rowcount=rowcount,
+            )
+            for offset, (statement, rowcount) in enumerate(zip(statements, rowcounts))
+        ]
+
+    def execute_pipeline(
+        self, statements: List[str], session: Connection
+    ) -> List[Optional[int]]:
+        """Send statements without waiting for their results, then read the results
+
+        Raises the first error of the pipeline, once all statements were sent.
+
+        Returns:
+            List[Optional[int]]: The rowcount of each statement
+        """
+        # Pipelines are not supported by SQLAlchemy, so the psycopg connection of the
+        #  session is used directly, within the same transaction
+        connection = session.connection.dbapi_connection
+        cursors = []
+        try:
+            with connection.pipeline():
+                batch_size = self.insert_batch_size
+                for group in _batching.group_inserts(statements, batch_size=batch_size):
+                    sql = (
+                        group[0] if len(group) == 1 else _batching.merge_inserts(group)
+                    )
+                    logger.debug("Executing statement: \n\n%s", sql)
+                    cursor = connection.cursor()
+                    cursors.append((cursor, len(group)))
+                    cursor.execute(sql, prepare=False)
+            # The results were read when the pipeline was closed
+            rowcounts: List[Optional[int]] = []
+            for cursor, size in cursors:
+                if size == 1:
+                    rowcounts.append(cursor.rowcount if cursor.rowcount >= 0 else None)
+                else:
+                    rowcount = 1 if cursor.rowcount == size else None
+                    rowcounts.extend([rowcount] * size)
+            return rowcounts
+        finally:
+            for cursor, _ in cursors:
+                cursor.close()
+
+    def copy_from(
+        self,
+        session: Connection,
+        file: IO[bytes],
+        table: str,
+        copy_format: CopyFormat,
+        header: bool,
+        delimiter: Optional[str],
+        columns: Optional[List[str]],
+    ) -> Optional[int]:
+        """Stream a file into a table using COPY FROM STDIN"""
+        from psycopg import sql
+
+        statement = copy_statement(
+            sql, table, copy_format, header=header, delimiter=delimiter, columns=columns
+        )
+        connection = session.connection.dbapi_connection
+        with connection.cursor() as cursor:
+            logger.debug("Executing statement: \n\n%s", statement.as_string(cursor))
+            with cursor.copy(statement) as copy:
+                while chunk := file.read(COPY_CHUNK_SIZE):
+                    copy.write(chunk)
+            return cursor.rowcount if cursor.rowcount >= 0 else None
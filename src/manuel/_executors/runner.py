@@ -0,0 +1,823 @@
+import abc
+import collections
+import contextlib
+import logging
+import re
+import time
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from manuel import _batching, _journal, _ledger, _scheduler, _timings
+from manuel._core import (
+    NO_TRANSACTION_ANNOTATION,
+    CopyFormat,
+    DryRunMode,
+    OutputFormat,
+    TransactionScope,
+    TransactionStrategy,
+)
+
+if TYPE_CHECKING:
+    import pyarrow
+
+logger = logging.getLogger("manuel._executors.runner")
+
+
+class Plan(NamedTuple):
+    # Estimates of the query planner, in the units of the database
+    cost: Optional[float] = None
+    rows: Optional[int] = None
+    # Set if the statement could not be planned
+    error: Optional[str] = None
+
+
+class StatementResult(NamedTuple):
+    index: int
+    # Only the start of the statement is kept, so that results of very large scripts
+    #  do not hold on to the full SQL
+    preview: str
+    duration: float
+    rowcount: Optional[int] = None
+    # Only set for plan-only dry runs, and None if the statement was not planned
+    plan: Optional[Plan] = None
+
+
+class ScriptResult(NamedTuple):
+    name: str
+    statements: List[StatementResult]
+    duration: float
+    # Set if the script was not executed, because the ledger records it as applied
+    skipped: bool = False
+
+
+class LoadResult(NamedTuple):
+    table: str
+    rows: Optional[int]
+    duration: float
+
+
+class QueryResult(NamedTuple):
+    statements: List[StatementResult]
+    rows: int
+    duration: float
+
+
+def _preview(sql: str, length: int = 80) -> str:
+    preview = " ".join(sql[: length * 2].split())
+    return preview if len(preview) <= length else preview[: length - 3] + "..."
+
+
+_LEADING_COMMENTS = re.compile(r"\s*(?:--[^\n]*(?:\n|$)\s*|/\*.*?\*/\s*)*", re.DOTALL)
+
+
+def _strip_leading_comments(sql: str) -> str:
+    return sql[_LEADING_COMMENTS.match(sql).end() :]
+
+
+class BaseSqlExecutor(abc.ABC):
+
+    @abc.abstractmethod
+    def run(
+        self, sql: Union[str, Iterable[str]], **engine_kwargs
+    ) -> List[StatementResult]: ...
+
+
+class BaseStatementExecutor(BaseSqlExecutor):
+    """Executes scripts statement by statement, independently of the database client
+
+    Subclasses provide the connection handling through `connect`, `session` and
+    `execute_sql`. A session is an object with `commit` and `rollback` methods, such
+    as a SQLAlchemy ORM session or a DBAPI connection.
+    """
+
+    # Consecutive INSERTs are only merged into batches if a failed batch can be rolled
+    #  back to a savepoint and then replayed statement by statement
+    supports_savepoints = False
+    # Whether sessions can be opened in the autocommit mode of the driver. Otherwise
+    #  the autocommit strategy commits every statement explicitly.
+    supports_autocommit = False
+    # Statements that `explain` can plan in a plan-only dry run. Other statements are
+    #  skipped. None if any statement can be planned.
+    explainable_statements: Optional[re.Pattern] = None
+    # Statements that cannot be executed inside a transaction block. They are
+    #  executed in autocommit mode between the transactions of a script.
+    non_transactional_statements: Optional[re.Pattern] = None
+    # Whether statements can be sent in pipelines, without waiting for each result
+    supports_pipelining = False
+
+    def __init__(
+        self,
+        dry_run: bool = False,
+        insert_batch_size: int = _batching.DEFAULT_INSERT_BATCH_SIZE,
+        dry_run_mode: DryRunMode = DryRunMode.FULL,
+        journal: Optional[_journal.Journal] = None,
+        resume: bool = False,
+        transaction_strategy: TransactionStrategy = TransactionStrategy.SINGLE,
+        commit_every: Optional[int] = None,
+        commit_interval: Optional[float] = None,
+        ledger: Optional[_ledger.Ledger] = None,
+        force: bool = False,
+        pipeline_depth: Optional[int] = None,
+    ):
+        if pipeline_depth is not None and not self.supports_pipelining:
+            raise ValueError(f"{type(self).__name__} does not support pipelining")
+        if dry_run and transaction_strategy != TransactionStrategy.SINGLE:
+            raise ValueError(
+                "Dry runs can only be rolled back with the single transaction strategy"
+            )
+        if (
+            transaction_strategy == TransactionStrategy.BATCHED
+            and commit_every is None
+            and commit_interval is None
+        ):
+            raise ValueError(
+                "The batched transaction strategy requires commit_every or "
+                "commit_interval"
+            )
+        self.dry_run = dry_run
+        self.insert_batch_size = insert_batch_size
+        self.dry_run_mode = dry_run_mode
+        # Records committed statements, so that an interrupted run can be resumed
+        self.journal = journal
+        self.resume = resume
+        # With the batched strategy, commit after every `commit_every` statements or
+        #  `commit_interval` seconds, whichever comes first
+        self.transaction_strategy = transaction_strategy
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        # Records applied scripts, which are skipped unless `force` is set
+        self.ledger = ledger
+        self.force = force
+        # Maximum number of statements that are sent before their results are read
+        self.pipeline_depth = pipeline_depth
+        # Whether the current run promises a single transaction across all scripts,
+        #  which statements that cannot run in a transaction would break
+        self.single_transaction = False
+
+    @abc.abstractmethod
+    def connect(
+        self, pool_size: Optional[int] = None, **engine_kwargs
+    ) -> ContextManager[Any]:
+        """Open an engine, i.e. anything from which sessions can be created
+
+        Args:
+            pool_size (Optional[int], optional): Number of sessions that may be used
+              concurrently from different threads, if more than one
+        """
+
+    @abc.abstractmethod
+    def session(self, engine: Any, autocommit: bool = False) -> ContextManager[Any]:
+        """Open a session, in which statements are executed in a transaction
+
+        Args:
+            autocommit (bool, optional): Commit every statement on its own instead. A
+              session in autocommit mode cannot be rolled back.
+        """
+
+    @abc.abstractmethod
+    def execute_sql(self, sql: str, session: Any) -> Any: ...
+
+    @abc.abstractmethod
+    def stream_rows(
+        self, sql: str, session: Any, batch_size: int
+    ) -> Tuple[List[str], Iterator[Sequence[Sequence[Any]]]]:
+        """Execute a query and fetch its rows lazily, in batches of `batch_size`
+
+        Returns:
+            Tuple[List[str], Iterator[Sequence[Sequence[Any]]]]: The column names and
+              the batches of rows
+        """
+
+    def stream_record_batches(
+        self, sql: str, session: Any, batch_size: int
+    ) -> "pyarrow.RecordBatchReader":
+        """Execute a query and fetch its rows lazily as Arrow record batches"""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support Arrow or Parquet output"
+        )
+
+    def explain(self, sql: str, session: Any) -> Plan:
+        """Plan a statement without executing it, and return the planner's estimates"""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support plan-only dry runs"
+        )
+
+    def commit(self, session: Any):
+        """Commit the transaction, and start a new one if the session is reused"""
+        session.commit()
+
+    def restart_transaction(self, session: Any):
+        """Roll back and start a new transaction, e.g. after a statement failed"""
+        session.rollback()
+
+    def savepoint(self, session: Any) -> ContextManager[Any]:
+        """Open a savepoint, which is rolled back if the context exits with an error"""
+        raise NotImplementedError(f"{type(self).__name__} does not support savepoints")
+
+    def execute_statement(self, index: int, sql: str, session: Any) -> StatementResult:
+        """Execute a single statement and record its wall time and rowcount"""
+        start = time.perf_counter()
+        try:
+            result = self.execute_sql(sql, session)
+        except Exception:
+            logger.error(
+                "Statement %s failed after %.3fs", index, time.perf_counter() - start
+            )
+            raise
+        duration = time.perf_counter() - start
+        rowcount = getattr(result, "rowcount", None)
+        # DBAPI drivers report -1 if the rowcount is not known
+        rowcount = rowcount if isinstance(rowcount, int) and rowcount >= 0 else None
+        logger.debug(
+            "Statement %s finished in %.3fs (rowcount: %s)", index, duration, rowcount
+        )
+        return StatementResult(
+            index=index, preview=_preview(sql), duration=duration, rowcount=rowcount
+        )
+
+    def plan_statement(self, index: int, sql: str, session: Any) -> StatementResult:
+        """Plan a single statement and record the planner's estimates
+
+        Statements that cannot be planned are skipped. If planning fails, e.g. because
+        the statement depends on a table that an earlier statement would have
+        created, the error is reported and the next statement is planned in a new
+        transaction. Since nothing is executed, nothing is lost by rolling back.
+        """
+        preview = _preview(sql)
+        pattern = self.explainable_statements
+        if pattern is not None and not pattern.match(_strip_leading_comments(sql)):
+            logger.info("Statement %s cannot be planned, skipping: %s", index, preview)
+            return StatementResult(index=index, preview=preview, duration=0.0)
+        start = time.perf_counter()
+        try:
+            plan = self.explain(sql, session)
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            logger.warning("Statement %s could not be planned: %s", index, e)
+            self.restart_transaction(session)
+            plan = Plan(error=str(e))
+        else:
+            logger.info(
+                "Statement %s: estimated cost %s, estimated rows %s: %s",
+                index,
+                plan.cost,
+                plan.rows,
+                preview,
+            )
+        return StatementResult(
+            index=index,
+            preview=preview,
+            duration=time.perf_counter() - start,
+            plan=plan,
+        )
+
+    def execute_batch(
+        self, index: int, statements: List[str], session: Any
+    ) -> List[StatementResult]:
+        """Execute single-row INSERTs as one multi-row INSERT
+
+        If the merged statement fails, it is rolled back to a savepoint and the
+        statements are executed one by one, so that the results and any error are the
+        same as without batching.
+        """
+        if len(statements) == 1:
+            return [self.execute_statement(index, statements[0], session)]
+        start = time.perf_counter()
+        # In autocommit mode the merged statement is a transaction of its own, which
+        #  leaves nothing to roll back if it fails
+        savepoint = contextlib.nullcontext() if self.autocommit else None
+        try:
+            with savepoint or self.savepoint(session):
+                result = self.execute_sql(_batching.merge_inserts(statements), session)
+        except Exception as e:
+            logger.debug(
+                "Batch of statements %s to %s failed, executing them one by one: %s",
+                index,
+                index + len(statements) - 1,
+                e,
+            )
+            return [
+                self.execute_statement(index + offset, statement, session)
+                for offset, statement in enumerate(statements)
+            ]
+        # The wall time of the batch is spread evenly over its statements
+        duration = (time.perf_counter() - start) / len(statements)
+        rowcount = 1 if getattr(result, "rowcount", None) == len(statements) else None
+        logger.debug(
+            "Statements %s to %s finished as a batch in %.3fs",
+            index,
+            index + len(statements) - 1,
+            duration * len(statements),
+        )
+        return [
+            StatementResult(
+                index=index + offset,
+                preview=_preview(statement),
+                duration=duration,
+                rowcount=rowcount,
+            )
+            for offset, statement in enumerate(statements)
+        ]
+
+    def run(
+        self, sql: Union[str, Iterable[str]], **engine_kwargs
+    ) -> List[StatementResult]:
+        """Execute SQL statements one by one in a single transaction
+
+        Args:
+            sql (Union[str, Iterable[str]]): Either a single SQL string, which is sent
+              to the database as-is, or the individual statements of a script. The
+              statements are consumed lazily, so they may be streamed from a file.
+
+        Returns:
+            List[StatementResult]: Wall time and rowcount of each statement
+        """
+        (result,) = self.run_scripts([("<sql>", sql)], **engine_kwargs)
+        return result.statements
+
+    def run_scripts(
+        self,
+        scripts: Iterable[Tuple[str, Union[str, Iterable[str]]]],
+        transaction_scope: TransactionScope = TransactionScope.SCRIPT,
+        engine: Optional[Any] = None,
+        **engine_kwargs,
+    ) -> List[ScriptResult]:
+        """Execute scripts in order through a single engine and connection pool
+
+        Args:
+            scripts (Iterable[Tuple[str, Union[str, Iterable[str]]]]): Pairs of a script
+              name and its SQL, see `run`. The scripts are consumed lazily.
+            transaction_scope (TransactionScope, optional): Whether to use one
+              transaction per script, or one transaction across all scripts.
+            engine (Optional[Any], optional): An engine that was opened with `connect`
+              before, to reuse its connections. It is left open. By default, an
+              engine is opened from `engine_kwargs` and closed after the run.
+
+        Returns:
+            List[ScriptResult]: The statement results of each script
+        """
+        if (
+            transaction_scope == TransactionScope.SINGLE
+            and self.transaction_strategy != TransactionStrategy.SINGLE
+        ):
+            raise ValueError(
+                "A single transaction across all scripts requires the single "
+                "transaction strategy"
+            )
+        self.single_transaction = transaction_scope == TransactionScope.SINGLE
+        if self.single_transaction:
+            self._check_single_transaction(scripts)
+        results = []
+        with (
+            contextlib.nullcontext(engine)
+            if engine is not None
+            else self.connect(**engine_kwargs)
+        ) as engine:
+            self.open_journal(engine)
+            if self.ledger is not None:
+                self.ledger.open(self, engine)
+            if transaction_scope == TransactionScope.SINGLE:
+                with self.session(engine, autocommit=self.autocommit) as session:
+                    for name, sql in scripts:
+                        results.append(self.apply_script(name, sql, session))
+                    self.end_transaction(session)
+            else:
+                for name, sql in scripts:
+                    with self.session(engine, autocommit=self.autocommit) as session:
+                        results.append(self.apply_script(name, sql, session))
+                        self.end_transaction(session)
+        return results
+
+    def run_graph(
+        self,
+        scripts: Dict[str, Union[str, Iterable[str]]],
+        dependencies: _scheduler.Dependencies,
+        max_workers: int,
+        **engine_kwargs,
+    ) -> Tuple[List[ScriptResult], _scheduler.GraphResult]:
+        """Execute scripts concurrently, each once all of its dependencies are done
+
+        Every script runs in its own session and transaction, and all sessions are
+        created from a single engine with room for `max_workers` sessions.
+
+        Args:
+            scripts (Dict[str, Union[str, Iterable[str]]]): The SQL of each script
+            dependencies (_scheduler.Dependencies): The scripts that each script
+              depends on, see `_scheduler.schedule`
+            max_workers (int): Maximum number of scripts that run concurrently
+
+        Returns:
+            Tuple[List[ScriptResult], _scheduler.GraphResult]: The statement results of
+              each script in the order of `scripts`, and the scheduling summary
+        """
+        results: Dict[str, ScriptResult] = {}
+        with self.connect(pool_size=max_workers, **engine_kwargs) as engine:
+            self.open_journal(engine)
+            if self.ledger is not None:
+                self.ledger.open(self, engine)
+
+            def run(name: str) -> None:
+                with self.session(engine, autocommit=self.autocommit) as session:
+                    results[name] = self.apply_script(name, scripts[name], session)
+                    self.end_transaction(session)
+
+            graph = _scheduler.schedule(dependencies, run, max_workers=max_workers)
+        return [results[name] for name in scripts], graph
+
+    def open_journal(self, engine: Any):
+        # Nothing is executed in plan-only dry runs, so there is nothing to record
+        if self.journal is not None and self.dry_run_mode != DryRunMode.PLAN:
+            self.journal.open(self, engine, resume=self.resume)
+
+    def apply_script(
+        self, name: str, sql: Union[str, Iterable[str]], session: Any
+    ) -> ScriptResult:
+        """Run a script, unless the ledger records it as applied, and record it"""
+        if self.ledger is None:
+            return self.run_script(name, sql, session)
+        content_hash = _ledger.script_hash(name, sql)
+        if self.ledger.is_applied(content_hash) and not self.force:
+            logger.info("Skipping %s, which was applied before", name)
+            return ScriptResult(name=name, statements=[], duration=0.0, skipped=True)
+        result = self.run_script(name, sql, session)
+        if not self.dry_run:
+            self.ledger.record(self, session, name, content_hash, result.duration)
+        return result
+
+    def run_script(
+        self, name: str, sql: Union[str, Iterable[str]], session: Any
+    ) -> ScriptResult:
+        logger.debug("Executing script: %s", name)
+        statements = [sql] if isinstance(sql, str) else sql
+        start = time.perf_counter()
+        results: List[StatementResult] = []
+        if self.dry_run and self.dry_run_mode == DryRunMode.PLAN:
+            with _timings.phase("plan"):
+                for statement in statements:
+                    results.append(
+                        self.plan_statement(len(results), statement, session)
+                    )
+            log_plan_results(results)
+        else:
+            try:
+                # Commits and lazily validated statements are timed as their own phases
+                with _timings.phase("execute"):
+                    self.execute_statements(name, statements, session, results)
+            except Exception:
+                if self.journal is not None:
+                    self.journal.discard(session)
+                raise
+            log_statement_results(results)
+        result = ScriptResult(
+            name=name, statements=results, duration=time.perf_counter() - start
+        )
+        _timings.record_script(result)
+        return result
+
+    def execute_statements(
+        self,
+        name: str,
+        statements: Iterable[str],
+        session: Any,
+        results: List[StatementResult],
+    ):
+        journal = self.journal
+        # The index and journal key of each statement that is passed to the batches
+        pending: Deque[Tuple[int, str]] = collections.deque()
+        if journal is not None:
+            statements = self._skip_completed(name, statements, session, pending)
+        uncommitted, last_commit = 0, time.perf_counter()
+        for group in self.group_statements(statements):
+            # Only INSERTs are grouped, so these statements always stand alone
+            no_transaction = len(group) == 1 and self.requires_autocommit(group[0])
+            if no_transaction:
+                group_results = [
+                    self.execute_without_transaction(
+                        len(results), group[0], session, name=name
+                    )
+                ]
+            else:
+                group_results = self.execute_batch(len(results), group, session)
+            if journal is not None:
+                entries = [pending.popleft() for _ in group]
+                group_results = [
+                    result._replace(index=index)
+                    for result, (index, _) in zip(group_results, entries)
+                ]
+                journal.stage(session, name, (key for _, key in entries))
+            results.extend(group_results)
+            uncommitted += len(group)
+            # A statement outside of a transaction is committed by itself, but the
+            #  journal must be updated right away
+            if (no_transaction and not self.dry_run) or self.commit_due(
+                uncommitted, time.perf_counter() - last_commit
+            ):
+                logger.debug("Committing after statement %s", results[-1].index)
+                self.checkpoint(session)
+                uncommitted, last_commit = 0, time.perf_counter()
+
+    def group_statements(self, statements: Iterable[str]) -> Iterator[List[str]]:
+        """Split the statements of a script into the groups passed to `execute_batch`
+
+        A statement that `requires_autocommit` must be a group of its own.
+        """
+        batch_size = self.insert_batch_size if self.supports_savepoints else 1
+        return _batching.group_inserts(statements, batch_size=batch_size)
+
+    def requires_autocommit(self, sql: str) -> bool:
+        """Whether a statement cannot be executed inside a transaction block
+
+        This is the case for statements that match `non_transactional_statements`,
+        and for statements that are annotated with a `manuel:no-transaction` comment
+        right before them.
+        """
+        statement = _strip_leading_comments(sql)
+        comments = sql[: len(sql) - len(statement)]
+        if NO_TRANSACTION_ANNOTATION in comments.lower():
+            return True
+        pattern = self.non_transactional_statements
+        return pattern is not None and pattern.match(statement) is not None
+
+    def _check_single_transaction(
+        self, scripts: Iterable[Tuple[str, Union[str, Iterable[str]]]]
+    ):
+        """Fail before anything runs if a statement cannot run in a transaction
+
+        Only scripts whose statements are held in memory can be checked up front.
+        Statements that are read lazily fail in `execute_without_transaction` once they
+        are reached, before the single transaction is committed.
+        """
+        if not isinstance(scripts, (list, tuple)):
+            return
+        for name, sql in scripts:
+            statements = [sql] if isinstance(sql, str) else sql
+            if not isinstance(statements, (list, tuple)):
+                continue
+            for index, statement in enumerate(statements):
+                if self.requires_autocommit(statement):
+                    raise self._single_transaction_error(name, index, statement)
+
+    @staticmethod
+    def _single_transaction_error(name: str, index: int, sql: str) -> ValueError:
+        return ValueError(
+            f"Statement {index} of {name} cannot run in a transaction, so the "
+            "scripts cannot run in a single transaction. Use one transaction per "
+            f"script instead: {_preview(sql)}"
+        )
+
+    def execute_without_transaction(
+        self, index: int, sql: str, session: Any, name: str = ""
+    ) -> StatementResult:
+        """Execute a statement on the session in autocommit mode, in script order
+
+        The statements before it are committed first, and the statements after it run
+        in a new transaction. Dry runs skip the statement, since it cannot be rolled
+        back.
+
+        Raises:
+            ValueError: If all scripts run in a single transaction, which committing
+              the statements before it would break. Nothing has been committed then.
+        """
+        if self.single_transaction:
+            raise self._single_transaction_error(name, index, sql)
+        if self.dry_run:
+            logger.warning(
+                "Statement %s cannot run in a transaction, skipping it in a dry run: %s",
+                index,
+                _preview(sql),
+            )
+            return StatementResult(index=index, preview=_preview(sql), duration=0.0)
+        if self.autocommit:
+            return self.execute_statement(index, sql, session)
+        logger.info(
+            "Statement %s cannot run in a transaction, committing and executing it "
+            "in autocommit mode: %s",
+            index,
+            _preview(sql),
+        )
+        self.checkpoint(session)
+        with self.autocommit_mode(session):
+            return self.execute_statement(index, sql, session)
+
+    def autocommit_mode(self, session: Any) -> ContextManager[Any]:
+        """Switch a session without an open transaction to autocommit mode
+
+        Executors whose driver has no autocommit mode run the statement in a
+        transaction of its own, which is committed right after it.
+        """
+        return contextlib.nullcontext()
+
+    def commit_due(self, uncommitted: int, elapsed: float) -> bool:
+        """Whether to commit, given the statements and seconds since the last commit"""
+        if self.transaction_strategy == TransactionStrategy.AUTOCOMMIT:
+            # With the autocommit mode of the driver every statement was committed
+            #  already, but the journal must still be updated
+            return not self.autocommit or self.journal is not None
+        if self.transaction_strategy == TransactionStrategy.BATCHED:
+            return (
+                self.commit_every is not None and uncommitted >= self.commit_every
+            ) or (self.commit_interval is not None and elapsed >= self.commit_interval)
+        return False
+
+    def _skip_completed(
+        self,
+        name: str,
+        statements: Iterable[str],
+        session: Any,
+        pending: Deque[Tuple[int, str]],
+    ) -> Iterator[str]:
+        assert self.journal is not None
+        completed = (
+            self.journal.completed(self, session, name) if self.resume else set()
+        )
+        skipped = 0
+        for index, (key, statement) in enumerate(_journal.statement_keys(statements)):
+            if key in completed:
+                logger.debug(
+                    "Skipping statement %s, which was completed before: %s",
+                    index,
+                    _preview(statement),
+                )
+                skipped += 1
+                continue
+            pending.append((index, key))
+            yield statement
+        if skipped:
+            logger.info(
+                "Skipped %s statement(s) of %s that were completed in a previous run",
+                skipped,
+                name,
+            )
+
+    def query(
+        self,
+        statements: List[str],
+        output: IO,
+        output_format: OutputFormat = OutputFormat.CSV,
+        batch_size: int = 10_000,
+        **engine_kwargs,
+    ) -> QueryResult:
+        """Execute statements and stream the rows of the last one to a file
+
+        Args:
+            statements (List[str]): The statements of a script. All but the last are
+              executed as in `run_script`, in the same transaction as the query.
+            output (IO): The file to write the rows to. Must be opened in binary mode
+              for Parquet and Arrow output.
+            output_format (OutputFormat, optional): The format of the output
+            batch_size (int, optional): Number of rows that are fetched at a time. For
+              Parquet output, this is also the maximum size of a row group.
+
+        Returns:
+            QueryResult: The results of the other statements, and the number of rows
+        """
+        from manuel import _output
+
+        *setup, sql = statements
+        with self.connect(**engine_kwargs) as engine:
+            with self.session(engine) as session:
+                results = self.run_script("<setup>", setup, session).statements
+                start = time.perf_counter()
+                logger.debug("Executing query: \n\n%s", sql)
+                if output_format.is_binary:
+                    reader = self.stream_record_batches(sql, session, batch_size)
+                    rows = _output.write_record_batches(
+                        output, reader, output_format, row_group_size=batch_size
+                    )
+                else:
+                    columns, batches = self.stream_rows(sql, session, batch_size)
+                    rows = _output.write_rows(output, columns, batches, output_format)
+                self.end_transaction(session)
+        return QueryResult(
+            statements=results, rows=rows, duration=time.perf_counter() - start
+        )
+
+    def load(
+        self,
+        file: IO[bytes],
+        table: str,
+        copy_format: CopyFormat = CopyFormat.CSV,
+        header: bool = False,
+        delimiter: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        **engine_kwargs,
+    ) -> LoadResult:
+        """Bulk load a file into a table in a single transaction
+
+        Args:
+            file (IO[bytes]): The data to load, read in chunks
+            table (str): The table to load into, optionally qualified by its schema
+            copy_format (CopyFormat, optional): The format of the data
+            header (bool, optional): Whether the first line is a header to be skipped
+            delimiter (Optional[str], optional): Column delimiter, if it is not the
+              default of the format
+            columns (Optional[List[str]], optional): The columns to load, in the order
+              in which they appear in the data. Defaults to all columns of the table.
+
+        Returns:
+            LoadResult: The number of rows loaded and the wall time
+        """
+        with self.connect(**engine_kwargs) as engine:
+            with self.session(engine) as session:
+                start = time.perf_counter()
+                rows = self.copy_from(
+                    session,
+                    file,
+                    table=table,
+                    copy_format=copy_format,
+                    header=header,
+                    delimiter=delimiter,
+                    columns=columns,
+                )
+                self.end_transaction(session)
+        duration = time.perf_counter() - start
+        logger.info(
+            "Loaded %s row(s) into %s in %.3fs (%.0f rows/s)",
+            rows,
+            table,
+            duration,
+            (rows or 0) / duration if duration else 0.0,
+        )
+        return LoadResult(table=table, rows=rows, duration=duration)
+
+    def copy_from(
+        self,
+        session: Any,
+        file: IO[bytes],
+        table: str,
+        copy_format: CopyFormat,
+        header: bool,
+        delimiter: Optional[str],
+        columns: Optional[List[str]],
+    ) -> Optional[int]:
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support bulk loading files"
+        )
+
+    @property
+    def autocommit(self) -> bool:
+        """Whether sessions are opened in the autocommit mode of the driver"""
+        return (
+            self.transaction_strategy == TransactionStrategy.AUTOCOMMIT
+            and self.supports_autocommit
+        )
+
+    def checkpoint(self, session: Any):
+        """Commit, and record the statements that were committed in the journal"""
+        with _timings.phase("commit"):
+            if self.journal is not None:
+                self.journal.before_commit(self, session)
+            if not self.autocommit:
+                self.commit(session)
+            if self.journal is not None:
+                self.journal.after_commit(session)
+
+    def end_transaction(self, session: Any):
+        if self.dry_run:
+            with _timings.phase("rollback"):
+                session.rollback()
+            if self.journal is not None:
+                self.journal.discard(session)
+        else:
+            self.checkpoint(session)
+
+
+def log_statement_results(results: List[StatementResult]):
+    if not results:
+        return
+    slowest = max(results, key=lambda result: result.duration)
+    logger.info(
+        "Executed %s statement(s) in %.3fs. Slowest was statement %s (%.3fs): %s",
+        len(results),
+        sum(result.duration for result in results),
+        slowest.index,
+        slowest.duration,
+        slowest.preview,
+    )
+
+
+def log_plan_results(results: List[StatementResult]):
+    planned = [r.plan for r in results if r.plan is not None and r.plan.error is None]
+    logger.info(
+        "Planned %s statement(s) with a total estimated cost of %s. %s skipped, %s "
+        "could not be planned",
+        len(planned),
+        sum(plan.cost for plan in planned if plan.cost is not None),
+        sum(1 for r in results if r.plan is None),
+        sum(1 for r in results if r.plan is not None and r.plan.error is not None),
+    )
@@ -0,0 +1,163 @@
+import json
+import logging
+import pathlib as plb
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+)
+
+if TYPE_CHECKING:
+    import pydantic
+
+    from manuel._executors.runner import ScriptResult
+
+logger = logging.getLogger("manuel._fanout")
+
+DEFAULT_TARGET_WORKERS = 8
+
+
+class Target(NamedTuple):
+    name: str
+    config: "pydantic.BaseModel"
+
+
+class TargetResult(NamedTuple):
+    target: str
+    duration: float
+    # None if the target failed
+    scripts: Optional[List["ScriptResult"]] = None
+    error: Optional[str] = None
+
+
+def load_targets(
+    path: plb.Path,
+    config_class: Type["pydantic.BaseModel"],
+    defaults: Optional[Dict[str, Any]] = None,
+) -> List[Target]:
+    """Read the database configs of the targets of a fan-out run from a JSON file
+
+    The file holds either an object that maps target names to configs, or a list of
+    configs, each optionally with a "name". Unnamed targets are named by their
+    position. Fields that a config leaves out are taken from `defaults`, and then
+    from environment variables, as for a single database.
+
+    Raises:
+        ValueError: If the file cannot be read, or a config is not valid
+    """
+    try:
+        entries = json.loads(plb.Path(path).read_text())
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read targets '{path}': {e}") from e
+    if isinstance(entries, list):
+        named: Dict[str, Any] = {}
+        for index, entry in enumerate(entries):
+            name = str(entry.pop("name", index) if isinstance(entry, dict) else index)
+            if name in named:
+                raise ValueError(f"Targets '{path}' contain '{name}' more than once")
+            named[name] = entry
+        entries = named
+    if not isinstance(entries, dict) or not all(
+        isinstance(entry, dict) for entry in entries.values()
+    ):
+        raise ValueError(
+            f"Targets '{path}' must be a list or an object of database configs"
+        )
+    if not entries:
+        raise ValueError(f"Targets '{path}' do not contain any databases")
+    targets = []
+    for name, entry in entries.items():
+        try:
+            config = config_class(**{**(defaults or {}), **entry})
+        except ValueError as e:
+            raise ValueError(f"Config of target '{name}' is not valid: {e}") from e
+        targets.append(Target(name=name, config=config))
+    return targets
+
+
+def run_targets(
+    targets: Sequence[Target],
+    run: Callable[[Target], List["ScriptResult"]],
+    max_workers: int = DEFAULT_TARGET_WORKERS,
+) -> List[TargetResult]:
+    """Run the same work against every target in a thread pool
+
+    A failure on one target does not stop the others. Failures are logged as they
+    happen and returned with the results.
+
+    Returns:
+        List[TargetResult]: The result of each target, in the order of `targets`
+    """
+
+    def timed(target: Target) -> TargetResult:
+        start = time.perf_counter()
+        try:
+            scripts = run(target)
+        except Exception as e:
+            logger.error("Target %s failed: %s", target.name, e)
+            logger.debug("Traceback of target %s", target.name, exc_info=True)
+            return TargetResult(
+                target=target.name,
+                duration=time.perf_counter() - start,
+                error=f"{type(e).__name__}: {e}",
+            )
+        duration = time.perf_counter() - start
+        logger.info("Target %s finished in %.3fs", target.name, duration)
+        return TargetResult(target=target.name, duration=duration, scripts=scripts)
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="manuel-target"
+    ) as pool:
+        return list(pool.map(timed, targets))
+
+
+def log_report(results: Sequence[TargetResult], duration: float):
+    failed = [result for result in results if result.error is not None]
+    for result in failed:
+        logger.error("%s: %s", result.target, result.error)
+    succeeded = [result for result in results if result.error is None]
+    slowest = max(succeeded, key=lambda result: result.duration, default=None)
+    logger.info(
+        "Executed on %s target(s) in %.3fs: %s succeeded, %s failed%s",
+        len(results),
+        duration,
+        len(succeeded),
+        len(failed),
+        f". Slowest was {slowest.target} ({slowest.duration:.3f}s)" if slowest else "",
+    )
+
+
+def write_report(path: plb.Path, results: Sequence[TargetResult], duration: float):
+    """Write the results of a fan-out run as JSON"""
+    report = {
+        "duration": duration,
+        "succeeded": sum(1 for result in results if result.error is None),
+        "failed": sum(1 for result in results if result.error is not None),
+        "targets": [
+            {
+                "target": result.target,
+                "status": "failed" if result.error is not None else "succeeded",
+                "duration": result.duration,
+                "error": result.error,
+                "scripts": [
+                    {
+                        "name": script.name,
+                        "duration": script.duration,
+                        "statements": len(script.statements),
+                        "skipped": script.skipped,
+                    }
+                    for script in result.scripts or []
+                ],
+            }
+            for result in results
+        ],
+    }
+    plb.Path(path).write_text(json.dumps(report, indent=2) + "\n")
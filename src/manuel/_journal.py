@@ -0,0 +1,185 @@
+import abc
+import hashlib
+import json
+import logging
+import os
+import pathlib as plb
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from manuel import _utils
+
+if TYPE_CHECKING:
+    from manuel._executors.runner import BaseStatementExecutor
+
+logger = logging.getLogger("manuel._journal")
+
+DEFAULT_JOURNAL_TABLE = "manuel_journal"
+# Maximum number of rows per INSERT into a journal table
+_INSERT_BATCH_SIZE = 1000
+
+
+def statement_keys(statements: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Pair each statement of a script with a key that identifies it by its content
+
+    The key is the SHA-256 hash of the statement. If the same statement occurs more
+    than once in a script, its later occurrences are numbered, so that every statement
+    of a script has a distinct key. Statements are consumed lazily.
+
+    Yields:
+        Tuple[str, str]: The key and the statement
+    """
+    occurrences: Dict[str, int] = {}
+    for statement in statements:
+        digest = hashlib.sha256(statement.encode()).hexdigest()
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        yield (f"{digest}:{occurrence}" if occurrence else digest), statement
+
+
+class Journal(abc.ABC):
+    """Records the statements of each script that were committed
+
+    Statements are staged as they are executed, and only recorded once the
+    transaction that executed them is committed. A journal describes the most recent
+    run: unless it is resumed, it is cleared when it is opened. Sessions may be used
+    from several threads at once, so staged statements are tracked per session.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._staged: Dict[int, List[Tuple[str, str]]] = {}
+
+    @abc.abstractmethod
+    def open(
+        self, executor: "BaseStatementExecutor", engine: Any, resume: bool
+    ) -> None:
+        """Prepare the journal before any script is executed"""
+
+    @abc.abstractmethod
+    def completed(
+        self, executor: "BaseStatementExecutor", session: Any, script: str
+    ) -> Set[str]:
+        """The keys of the statements of `script` that were committed"""
+
+    def stage(self, session: Any, script: str, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._staged.setdefault(id(session), []).extend(
+                (script, key) for key in keys
+            )
+
+    def before_commit(self, executor: "BaseStatementExecutor", session: Any) -> None:
+        """Called in the transaction that is about to be committed"""
+
+    def after_commit(self, session: Any) -> None:
+        """Called once the transaction was committed"""
+        self.discard(session)
+
+    def discard(self, session: Any) -> List[Tuple[str, str]]:
+        """Forget the statements that were staged in `session`, e.g. on rollback"""
+        with self._lock:
+            return self._staged.pop(id(session), [])
+
+    def _peek(self, session: Any) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._staged.get(id(session), []))
+
+
+class FileJournal(Journal):
+    """A journal in a local file, with one JSON object per committed statement
+
+    Statements are appended and synced to disk right after each commit. If the
+    process dies between the commit and the write, the statements of that last
+    transaction are executed again when the run is resumed.
+    """
+
+    def __init__(self, path: plb.Path) -> None:
+        super().__init__()
+        self.path = plb.Path(path)
+        self._completed: Dict[str, Set[str]] = {}
+
+    def open(
+        self, executor: "BaseStatementExecutor", engine: Any, resume: bool
+    ) -> None:
+        if resume and self.path.exists():
+            with self.path.open() as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._completed.setdefault(entry["script"], set()).add(
+                        entry["statement"]
+                    )
+            logger.info(
+                "Resuming from journal %s, with %s completed statement(s)",
+                self.path,
+                sum(len(keys) for keys in self._completed.values()),
+            )
+        elif not executor.dry_run:
+            self.path.write_text("")
+
+    def completed(
+        self, executor: "BaseStatementExecutor", session: Any, script: str
+    ) -> Set[str]:
+        return set(self._completed.get(script, ()))
+
+    def after_commit(self, session: Any) -> None:
+        entries = self.discard(session)
+        if not entries:
+            return
+        with self._lock, self.path.open("a") as f:
+            for script, key in entries:
+                f.write(json.dumps({"script": script, "statement": key}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class TableJournal(Journal):
+    """A journal in a table of the target database
+
+    Statements are inserted into the table in the same transaction in which they are
+    executed, so the journal is always consistent with the database.
+    """
+
+    def __init__(self, table: str = DEFAULT_JOURNAL_TABLE) -> None:
+        super().__init__()
+        self.table = table
+
+    def open(
+        self, executor: "BaseStatementExecutor", engine: Any, resume: bool
+    ) -> None:
+        # Dry runs must not change the database, so the table is only read
+        if executor.dry_run:
+            return
+        with executor.session(engine) as session:
+            executor.execute_sql(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (script VARCHAR NOT NULL, "
+                "statement VARCHAR NOT NULL, "
+                "completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)",
+                session,
+            )
+            if not resume:
+                executor.execute_sql(f"DELETE FROM {self.table}", session)
+            session.commit()
+
+    def completed(
+        self, executor: "BaseStatementExecutor", session: Any, script: str
+    ) -> Set[str]:
+        script = _utils.quote_literal(script)
+        result = executor.execute_sql(
+            f"SELECT statement FROM {self.table} WHERE script = {script}",
+            session,
+        )
+        return {row[0] for row in result.fetchall()}
+
+    def before_commit(self, executor: "BaseStatementExecutor", session: Any) -> None:
+        entries = self._peek(session)
+        for start in range(0, len(entries), _INSERT_BATCH_SIZE):
+            executor.execute_sql(
+                f"INSERT INTO {self.table} (script, statement) VALUES "
+                + ", ".join(
+                    f"({_utils.quote_literal(script)}, {_utils.quote_literal(key)})"
+                    for script, key in entries[start : start + _INSERT_BATCH_SIZE]
+                ),
+                session,
+            )
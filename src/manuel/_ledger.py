@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import pathlib as plb
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Set, Union
+
+from manuel import _utils
+
+if TYPE_CHECKING:
+    from manuel._executors.runner import BaseStatementExecutor
+
+logger = logging.getLogger("manuel._ledger")
+
+DEFAULT_LEDGER_TABLE = "manuel_ledger"
+
+
+def script_hash(name: str, sql: Union[str, Iterable[str]]) -> str:
+    """The SHA-256 hash of the content of a script
+
+    Scripts that were read from a file are hashed from the file, so that the hash does
+    not depend on how the file is read. The file is read in chunks, so its statements
+    may still be consumed lazily afterwards. Other scripts must hold their SQL.
+    """
+    digest = hashlib.sha256()
+    path = plb.Path(name)
+    if path.is_file():
+        for chunk in _utils.iter_sql_file(path):
+            digest.update(chunk.encode("utf-8"))
+    elif isinstance(sql, (str, list, tuple)):
+        for statement in [sql] if isinstance(sql, str) else sql:
+            digest.update(statement.encode("utf-8"))
+            digest.update(b"\x00")
+    else:
+        raise ValueError(f"Cannot hash script '{name}', which is not a file")
+    return digest.hexdigest()
+
+
+class Ledger:
+    """A table in the target database that records every script that was applied
+
+    Scripts are identified by the hash of their content, so a script that was applied
+    before is skipped until it changes, even if it was moved or renamed. The hashes of
+    all applied scripts are read with a single query when the ledger is opened. A
+    script is recorded in the same transaction in which it is executed.
+    """
+
+    def __init__(self, dialect: str, table: str = DEFAULT_LEDGER_TABLE) -> None:
+        self.dialect = dialect
+        self.table = table
+        self.applied: Set[str] = set()
+
+    def open(self, executor: "BaseStatementExecutor", engine: Any) -> None:
+        if not executor.dry_run:
+            with executor.session(engine) as session:
+                executor.execute_sql(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    "script VARCHAR NOT NULL, content_hash VARCHAR NOT NULL, "
+                    "dialect VARCHAR NOT NULL, duration DOUBLE PRECISION, "
+                    "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)",
+                    session,
+                )
+                session.commit()
+        with executor.session(engine) as session:
+            try:
+                result = executor.execute_sql(
+                    f"SELECT content_hash FROM {self.table} "
+                    f"WHERE dialect = {_utils.quote_literal(self.dialect)}",
+                    session,
+                )
+                self.applied = {row[0] for row in result.fetchall()}
+            except Exception as e:
+                # Dry runs do not create the ledger, so it may not exist yet
+                if not executor.dry_run:
+                    raise
+                logger.debug("Could not read ledger %s: %s", self.table, e)
+        logger.debug("Ledger %s holds %s script(s)", self.table, len(self.applied))
+
+    def is_applied(self, content_hash: str) -> bool:
+        return content_hash in self.applied
+
+    def record(
+        self,
+        executor: "BaseStatementExecutor",
+        session: Any,
+        name: str,
+        content_hash: str,
+        duration: Optional[float],
+    ) -> None:
+        values = ", ".join(
+            [
+                _utils.quote_literal(name),
+                _utils.quote_literal(content_hash),
+                _utils.quote_literal(self.dialect),
+                "NULL" if duration is None else repr(duration),
+            ]
+        )
+        executor.execute_sql(
+            f"INSERT INTO {self.table} (script, content_hash, dialect, duration) "
+            f"VALUES ({values})",
+            session,
+        )
+        # A copy of the script later in the same run is skipped like any other
+        self.applied.add(content_hash)
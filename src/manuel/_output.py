@@ -0,0 +1,100 @@
+import csv
+import json
+import logging
+import time
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, List, Sequence
+
+from manuel._core import OutputFormat
+from manuel._utils import is_installed, requires_extra
+
+if TYPE_CHECKING:
+    import pyarrow
+
+_has_pyarrow = is_installed("pyarrow")
+
+logger = logging.getLogger("manuel._output")
+
+# Minimum number of seconds between two progress messages
+PROGRESS_INTERVAL = 5.0
+
+
+def write_rows(
+    file: IO[str],
+    columns: List[str],
+    batches: Iterable[Sequence[Sequence[Any]]],
+    output_format: OutputFormat,
+) -> int:
+    """Write batches of rows to a file as they arrive, and report progress
+
+    Only one batch is held in memory at a time. CSV output starts with a header of
+    column names, and JSONL output has one object per row. Values that have no JSON
+    representation, such as dates and decimals, are written as strings.
+
+    Returns:
+        int: The number of rows written
+    """
+    if output_format == OutputFormat.CSV:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        write_batch = writer.writerows
+    else:
+
+        def write_batch(batch: Sequence[Sequence[Any]]):
+            file.writelines(
+                json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in batch
+            )
+
+    return _write_batches(batches, write_batch)
+
+
+@requires_extra(
+    library_name="pyarrow", extra_name="arrow", extra_installed=_has_pyarrow
+)
+def write_record_batches(
+    file: IO[bytes],
+    reader: "pyarrow.RecordBatchReader",
+    output_format: OutputFormat,
+    row_group_size: int,
+) -> int:
+    """Write Arrow record batches to a Parquet or Arrow IPC file as they arrive
+
+    The batches are written as they are, without converting their values to Python
+    objects. Parquet row groups hold at most `row_group_size` rows.
+
+    Returns:
+        int: The number of rows written
+    """
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    if output_format == OutputFormat.PARQUET:
+        writer = pyarrow.parquet.ParquetWriter(file, reader.schema)
+
+        def write_batch(batch: "pyarrow.RecordBatch"):
+            writer.write_batch(batch, row_group_size=row_group_size)
+
+    else:
+        writer = pyarrow.ipc.new_file(file, reader.schema)
+        write_batch = writer.write_batch
+    with writer:
+        return _write_batches(reader, write_batch)
+
+
+def _write_batches(batches: Iterable[Any], write_batch: Callable[[Any], Any]) -> int:
+    rows = 0
+    start = last_report = time.perf_counter()
+    for batch in batches:
+        write_batch(batch)
+        rows += len(batch)
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL:
+            logger.info("Wrote %s row(s) (%.0f rows/s)", rows, rows / (now - start))
+            last_report = now
+    duration = time.perf_counter() - start
+    logger.info(
+        "Wrote %s row(s) in %.3fs (%.0f rows/s)",
+        rows,
+        duration,
+        rows / duration if duration else 0.0,
+    )
+    return rows
@@ -1,18 +1,191 @@
+import enum
+import functools
 import logging
 import pathlib as plb
+import re
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
-import sqlfluff
+from manuel import _cache, _timings, _utils
+from manuel._core import NO_TRANSACTION_ANNOTATION
 
-from manuel import _utils
+if TYPE_CHECKING:
+    from sqlfluff.core import Linter
+    from sqlfluff.core.parser import BaseSegment
 
 logger = logging.getLogger("manuel._parser")
 
 
+class ValidationMode(enum.Enum):
+    # Template and parse only, no lint rules are evaluated
+    PARSE = "parse"
+    # Evaluate all lint rules. Rule violations are reported but do not fail validation
+    LINT = "lint"
+
+
+# Statements that write to the first table that they reference. Any other table that
+#  they reference is read.
+_TARGET_FIRST_STATEMENTS = {
+    "insert_statement",
+    "update_statement",
+    "delete_statement",
+    "merge_statement",
+    "create_table_statement",
+    "create_table_as_statement",
+    "create_view_statement",
+    "create_index_statement",
+    "drop_table_statement",
+    "drop_view_statement",
+    "alter_table_statement",
+    "truncate_table",
+}
+_READ_ONLY_STATEMENTS = {"select_statement", "with_compound_statement"}
+_DML_SEGMENTS = ("insert_statement", "update_statement", "delete_statement")
+# DDL on objects other than tables, whose effects on other statements are unknown
+_BARRIER_STATEMENT = re.compile(
+    r"(create|drop|alter)_(schema|function|procedure|type|extension)_statement"
+)
+_SCHEMA_STATEMENTS = {
+    "create_schema_statement",
+    "drop_schema_statement",
+    "alter_schema_statement",
+}
+
+
+class TableAccess(NamedTuple):
+    # Table names, lowercased and without schema or quotes. Schemas are named
+    #  '<schema>.*': they are written by schema DDL and read by every statement that
+    #  references a table in them
+    reads: List[str]
+    writes: List[str]
+    # Whether any statement may depend on, or affect, any other statement, e.g. DDL
+    #  on functions or statements that reference no tables, such as 'CALL p()'
+    barrier: bool = False
+
+
+def _name_parts(reference: "BaseSegment") -> List[str]:
+    name = reference.raw.replace('"', "").replace("`", "").replace("[", "")
+    return name.replace("]", "").lower().split(".")
+
+
+def _table_name(reference: "BaseSegment") -> str:
+    return _name_parts(reference)[-1]
+
+
+def _schema_name(reference: "BaseSegment") -> Optional[str]:
+    parts = _name_parts(reference)
+    return f"{parts[-2]}.*" if len(parts) > 1 else None
+
+
+# The result is stored in the validation cache: bump _cache.CACHE_FORMAT_VERSION when
+#  it changes
+def _analyze_tables(tree: Optional["BaseSegment"]) -> TableAccess:
+    """Determine which tables the statements in a parse tree read and write
+
+    Unqualified table names are compared, and any statement that is not known to only
+    read, or to only write to its first table, is assumed to write to every table that
+    it references. This errs on the side of reporting too many writes. Statements
+    whose access is unknown, because they reference no tables or are DDL on other
+    objects than tables, make the tree a barrier.
+    """
+    reads: Set[str] = set()
+    writes: Set[str] = set()
+    barrier = False
+    if tree is None:
+        return TableAccess(reads=[], writes=[])
+    for statement in tree.recursive_crawl("statement", recurse_into=False):
+        kind = statement.segments[0].type if statement.segments else None
+        if kind in _SCHEMA_STATEMENTS:
+            # In bigquery, schemas (datasets) are referenced like tables
+            writes.update(
+                f"{_table_name(reference)}.*"
+                for reference in statement.recursive_crawl(
+                    "schema_reference", "table_reference"
+                )
+            )
+        if kind is None or _BARRIER_STATEMENT.fullmatch(kind):
+            barrier = True
+            continue
+        references = list(statement.recursive_crawl("table_reference"))
+        if not references:
+            barrier = True
+            continue
+        reads.update(
+            schema
+            for schema in (_schema_name(reference) for reference in references)
+            if schema is not None
+        )
+        # Common table expressions are named like tables, but are local to a statement
+        ctes = {
+            _table_name(cte.segments[0])
+            for cte in statement.recursive_crawl("common_table_expression")
+        }
+        names = [
+            name
+            for name in (_table_name(reference) for reference in references)
+            if name not in ctes
+        ]
+        if kind in _READ_ONLY_STATEMENTS:
+            # E.g. 'WITH ... INSERT INTO ...', which writes to the target of the DML
+            dml = next(statement.recursive_crawl(*_DML_SEGMENTS), None)
+            if dml is None:
+                reads.update(names)
+                continue
+            targets = [
+                _table_name(reference)
+                for reference in dml.recursive_crawl("table_reference")
+            ]
+            writes.update(targets[:1])
+            reads.update(name for name in names if name not in targets[:1])
+        elif kind in _TARGET_FIRST_STATEMENTS and names:
+            writes.add(names[0])
+            reads.update(names[1:])
+        else:
+            writes.update(names)
+    return TableAccess(
+        reads=sorted(reads - writes), writes=sorted(writes), barrier=barrier
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _dialect_supported(dialect: str) -> bool:
+    # Importing sqlfluff is expensive, so it is deferred until a parser is created.
+    #  Only the module of the requested dialect is loaded, as opposed to
+    #  'sqlfluff.list_dialects()', which imports every dialect that sqlfluff ships.
+    with _timings.phase("dialect"):
+        from sqlfluff.core.dialects import load_raw_dialect
+        from sqlfluff.core.errors import SQLFluffUserError
+
+        try:
+            load_raw_dialect(dialect)
+        except (KeyError, SQLFluffUserError):
+            return False
+        return True
+
+
+@functools.lru_cache(maxsize=None)
+def _get_linter(dialect: str) -> "Linter":
+    with _timings.phase("linter"):
+        from sqlfluff.core import Linter
+
+        return Linter(dialect=dialect)
+
+
 class SqlParser:
 
     def __init__(self, sql: str, dialect: str) -> None:
         self.sql = sql
         self.dialect = dialect
+        self._statement_spans: Optional[List[Tuple[int, int]]] = None
+        self._tables: Optional[TableAccess] = None
 
     @property
     def sql(self) -> str:
@@ -21,6 +194,30 @@ class SqlParser:
     @sql.setter
     def sql(self, value: str) -> None:
         self._sql = value
+        self._statement_spans = None
+        self._tables = None
+
+    @property
+    def statements(self) -> List[str]:
+        """The individual statements of the SQL string, in source order
+
+        Raises:
+            ValueError: If the SQL string has not been validated yet
+        """
+        if self._statement_spans is None:
+            raise ValueError("SQL must be validated before it can be split")
+        return [self.sql[start:stop] for start, stop in self._statement_spans]
+
+    @property
+    def tables(self) -> TableAccess:
+        """The tables that the SQL string reads from and writes to
+
+        Raises:
+            ValueError: If the SQL string has not been validated yet
+        """
+        if self._tables is None:
+            raise ValueError("SQL must be validated before its tables are known")
+        return self._tables
 
     @property
     def dialect(self) -> str:
@@ -28,17 +225,24 @@ class SqlParser:
 
     @dialect.setter
     def dialect(self, value: str) -> None:
-        if value not in [dialect.label.lower() for dialect in sqlfluff.list_dialects()]:
+        if not _dialect_supported(value):
             raise ValueError(f"Unsupported dialect: {value}")
         else:
             logger.debug("Using dialect '%s'", value)
             self._dialect = value
 
-    def validate(self):
+    def validate(
+        self,
+        cache: Optional[_cache.ValidationCache] = None,
+        mode: ValidationMode = ValidationMode.PARSE,
+    ):
         """Use SQLFluff to validate the input SQL string
 
         Args:
-            sql (str): SQL string to validate
+            cache (ValidationCache, optional): Cache of previously validated SQL. If the
+              SQL string is found in the cache, parsing and linting are skipped.
+            mode (ValidationMode, optional): Whether to only template and parse the SQL
+              string, or to also evaluate all lint rules. Defaults to ValidationMode.PARSE.
 
         Raises:
             ValueError: If the SQL statement is not valid. That is, if there are any Template or Parse errors.
@@ -47,18 +251,98 @@ class SqlParser:
         Returns:
             str: The input SQL string
         """
-        res = sqlfluff.lint(self.sql, dialect=self.dialect)
-        if len(res) == 0:
+        entry = (
+            cache.get(self.sql, self.dialect, mode.value) if cache is not None else None
+        )
+        # Entries written before statement spans and tables were cached are treated
+        #  as a miss
+        if entry is not None and {"statements", "reads", "writes", "barrier"} <= set(
+            entry
+        ):
+            logger.debug("SQL found in validation cache, skipping validation")
+            self._statement_spans = [tuple(span) for span in entry["statements"]]
+            self._tables = TableAccess(
+                reads=entry["reads"], writes=entry["writes"], barrier=entry["barrier"]
+            )
             return self.sql
-        logger.debug("Sqlfluff found %s errors", len(res))
+        linter = _get_linter(self.dialect)
+        if mode == ValidationMode.LINT:
+            parsed = linter.lint_string(self.sql)
+            violations = parsed.get_violations()
+        else:
+            parsed = linter.parse_string(self.sql)
+            violations = parsed.violations
+        logger.debug("Sqlfluff found %s errors", len(violations))
         logger.debug("Will raise errors on TMP (template) and PRS (parse) errors")
-        for r in res:
-            if r["code"] in ["TMP", "PRS"]:
+        for violation in violations:
+            if violation.rule_code() in ["TMP", "PRS"]:
                 raise ValueError(
-                    f"SQL statement is not valid. Got error: \n\n{r['description']}"
+                    f"SQL statement is not valid. Got error: \n\n{violation.desc()}"
                 )
+            logger.warning("%s: %s", violation.rule_code(), violation.desc())
+        self._statement_spans = self._split(parsed.tree)
+        self._tables = _analyze_tables(parsed.tree)
+        logger.debug("Found %s statements", len(self._statement_spans))
+        if cache is not None:
+            cache.put(
+                self.sql,
+                self.dialect,
+                mode.value,
+                statements=self._statement_spans,
+                reads=self._tables.reads,
+                writes=self._tables.writes,
+                barrier=self._tables.barrier,
+            )
         return self.sql
 
+    @staticmethod
+    def _split(tree: Optional["BaseSegment"]) -> List[Tuple[int, int]]:
+        # The spans are stored in the validation cache: bump
+        #  _cache.CACHE_FORMAT_VERSION when they change
+        # Source slices refer to the SQL string as it was passed in, before templating
+        if tree is None:
+            return []
+        spans = []
+        # Comments are otherwise dropped, but an annotation that applies to the next
+        #  statement is kept with it, as it is when statements are streamed
+        annotation_start: Optional[int] = None
+        for segment in tree.recursive_crawl("statement", "comment", recurse_into=False):
+            source_slice = segment.pos_marker.source_slice
+            if segment.is_type("comment"):
+                if (
+                    annotation_start is None
+                    and NO_TRANSACTION_ANNOTATION in segment.raw.lower()
+                ):
+                    annotation_start = source_slice.start
+                continue
+            start = source_slice.start if annotation_start is None else annotation_start
+            spans.append((start, source_slice.stop))
+            annotation_start = None
+        return spans
+
     @classmethod
     def from_file(cls, path: plb.Path, dialect: str):
         return cls(_utils.read_sql_file(path.resolve()), dialect)
+
+
+def validate_statements(
+    statements: Iterable[str],
+    dialect: str,
+    mode: ValidationMode = ValidationMode.PARSE,
+) -> Iterator[str]:
+    """Validate statements one at a time as they are consumed
+
+    Raises:
+        ValueError: If a statement is not valid. Statements before it have already
+          been yielded by then.
+
+    Yields:
+        str: The validated statements
+    """
+    for index, statement in enumerate(statements):
+        try:
+            with _timings.phase("validate"):
+                SqlParser(sql=statement, dialect=dialect).validate(mode=mode)
+        except ValueError as e:
+            raise ValueError(f"{e}\n\nIn statement {index}:\n\n{statement}") from e
+        yield statement
@@ -0,0 +1,242 @@
+import json
+import logging
+import pathlib as plb
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger("manuel._scheduler")
+
+# Maps each script to the scripts that must finish before it may start
+Dependencies = Dict[str, List[str]]
+
+
+class GraphResult(NamedTuple):
+    # Wall time of each script, keyed by script name
+    durations: Dict[str, float]
+    # Longest chain of dependent scripts, and the sum of their wall times
+    critical_path: List[str]
+    critical_duration: float
+    duration: float
+
+
+def load_manifest(path: plb.Path, names: Sequence[str]) -> Dependencies:
+    """Read explicit script dependencies from a JSON manifest
+
+    The manifest maps a script to a list of the scripts that it depends on, e.g.
+    `{"marts/orders.sql": ["staging/orders.sql"]}`. Paths are relative to the
+    directory of the manifest.
+
+    Args:
+        path (plb.Path): Path to the manifest
+        names (Sequence[str]): The scripts that are executed. Dependencies on scripts
+          that are not executed are ignored.
+
+    Raises:
+        ValueError: If the manifest is not a JSON object of lists
+
+    Returns:
+        Dependencies: The dependencies of each script
+    """
+    try:
+        manifest = json.loads(plb.Path(path).read_text())
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read manifest '{path}': {e}") from e
+    if not isinstance(manifest, dict) or not all(
+        isinstance(deps, list) for deps in manifest.values()
+    ):
+        raise ValueError(
+            f"Manifest '{path}' must map each script to a list of dependencies"
+        )
+    root = plb.Path(path).resolve().parent
+    known = {str(plb.Path(name).resolve()): name for name in names}
+
+    def resolve(script: str) -> Optional[str]:
+        return known.get(str((root / script).resolve()))
+
+    dependencies: Dependencies = {name: [] for name in names}
+    for script, deps in manifest.items():
+        name = resolve(script)
+        if name is None:
+            logger.warning("Ignoring manifest entry for unknown script: %s", script)
+            continue
+        for dep in deps:
+            dep_name = resolve(dep)
+            if dep_name is None:
+                logger.warning(
+                    "Ignoring dependency of %s on unknown script: %s", script, dep
+                )
+                continue
+            dependencies[name].append(dep_name)
+    check_acyclic(dependencies)
+    return dependencies
+
+
+def infer_dependencies(
+    names: Sequence[str],
+    reads: Sequence[Set[str]],
+    writes: Sequence[Set[str]],
+    barriers: Optional[Sequence[bool]] = None,
+) -> Dependencies:
+    """Infer script dependencies from the tables that scripts read and write
+
+    A script depends on every earlier script (in the given order) that writes a table
+    which it reads or writes, or that reads a table which it writes. Scripts that touch
+    disjoint tables, or that only read the same tables, are independent. A barrier,
+    i.e. a script whose effects are not known from its tables such as one that
+    creates a schema or a function, depends on every earlier script, and every later
+    script depends on it. Because edges only point to earlier scripts, the result is
+    always acyclic.
+    """
+    barriers = barriers if barriers is not None else [False] * len(names)
+    dependencies: Dependencies = {name: [] for name in names}
+    for j, name in enumerate(names):
+        for i in range(j):
+            if barriers[i] or barriers[j]:
+                dependencies[name].append(names[i])
+            elif writes[i] & (reads[j] | writes[j]) or reads[i] & writes[j]:
+                dependencies[name].append(names[i])
+    return dependencies
+
+
+def check_acyclic(dependencies: Dependencies) -> None:
+    """Raise a ValueError that names the cycle if the dependencies contain one"""
+    # Iterative depth-first search, 1 = on the current path, 2 = done
+    state: Dict[str, int] = {}
+    for root in dependencies:
+        if root in state:
+            continue
+        stack: List[Tuple[str, int]] = [(root, 0)]
+        path: List[str] = []
+        while stack:
+            node, index = stack.pop()
+            if index == 0:
+                state[node] = 1
+                path.append(node)
+            deps = dependencies.get(node, [])
+            if index < len(deps):
+                stack.append((node, index + 1))
+                dep = deps[index]
+                if state.get(dep) == 1:
+                    cycle = path[path.index(dep) :] + [dep]
+                    raise ValueError(
+                        f"Script dependencies contain a cycle: {' -> '.join(cycle)}"
+                    )
+                if dep not in state:
+                    stack.append((dep, 0))
+            else:
+                state[node] = 2
+                path.pop()
+
+
+def critical_path(
+    dependencies: Dependencies, durations: Dict[str, float]
+) -> Tuple[List[str], float]:
+    """Find the chain of dependent scripts with the longest total wall time"""
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for name in _topological_order(dependencies):
+        if name not in durations:
+            continue
+        deps = [dep for dep in dependencies[name] if dep in finish]
+        best = max(deps, key=finish.__getitem__, default=None)
+        previous[name] = best
+        finish[name] = durations[name] + (finish[best] if best else 0.0)
+    if not finish:
+        return [], 0.0
+    node: Optional[str] = max(finish, key=finish.__getitem__)
+    total = finish[node]
+    path: List[str] = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], total
+
+
+def _topological_order(dependencies: Dependencies) -> List[str]:
+    remaining = {name: len(deps) for name, deps in dependencies.items()}
+    dependents: Dict[str, List[str]] = {name: [] for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
+    order = [name for name, count in remaining.items() if not count]
+    for name in order:
+        for dependent in dependents[name]:
+            remaining[dependent] -= 1
+            if not remaining[dependent]:
+                order.append(dependent)
+    return order
+
+
+def schedule(
+    dependencies: Dependencies,
+    run: Callable[[str], None],
+    max_workers: int,
+) -> GraphResult:
+    """Run scripts in a thread pool as soon as all of their dependencies finished
+
+    Scripts are started in the order of `dependencies` whenever a worker is free. If a
+    script fails, no further scripts are started, the scripts that are running are
+    awaited and the first error is raised.
+
+    Args:
+        dependencies (Dependencies): The dependencies of each script. Every script
+          that is run must be a key.
+        run (Callable[[str], None]): Executes a single script
+        max_workers (int): Maximum number of scripts that run concurrently
+
+    Returns:
+        GraphResult: Wall times and the critical path
+    """
+    check_acyclic(dependencies)
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    dependents: Dict[str, List[str]] = {name: [] for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
+    order = {name: index for index, name in enumerate(dependencies)}
+    ready = [name for name, deps in remaining.items() if not deps]
+    durations: Dict[str, float] = {}
+    lock = threading.Lock()
+
+    def timed(name: str) -> None:
+        start = time.perf_counter()
+        run(name)
+        with lock:
+            durations[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    running: Dict[Future, str] = {}
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="manuel"
+    ) as pool:
+        while ready or running:
+            while ready and error is None and len(running) < max_workers:
+                name = ready.pop(0)
+                logger.debug("Starting script: %s", name)
+                running[pool.submit(timed, name)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    logger.error("Script failed: %s", name)
+                    error = error or future.exception()
+                    continue
+                for dependent in dependents[name]:
+                    remaining[dependent].discard(name)
+                    if not remaining[dependent]:
+                        ready.append(dependent)
+            ready.sort(key=order.__getitem__)
+    if error is not None:
+        raise error
+    path, path_duration = critical_path(dependencies, durations)
+    return GraphResult(
+        durations=durations,
+        critical_path=path,
+        critical_duration=path_duration,
+        duration=time.perf_counter() - start,
+    )
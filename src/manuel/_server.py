@@ -0,0 +1,441 @@
+import contextlib
+import functools
+import hashlib
+import hmac
+import http.client
+import http.server
+import json
+import logging
+import os
+import pathlib as plb
+import socket
+import socketserver
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, Union
+
+from manuel import _batching, _core
+
+if TYPE_CHECKING:
+    import pydantic
+    import pydantic_settings
+
+    from manuel._executors.runner import ScriptResult
+
+logger = logging.getLogger("manuel._server")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8753
+# Clients and servers that listen on TCP share this token, since anyone who can
+#  connect to the server can run SQL with the credentials of its clients
+TOKEN_ENV = "MANUEL_SERVER_TOKEN"
+# Local DuckDB databases are cheap to open, and stay locked for other processes
+#  while they are open, so their engines are not kept open between requests
+_UNCACHED_DIALECTS = (_core.SqlDialect.DUCKDB,)
+
+
+class ServerError(Exception):
+    """Raised by the client if the server could not handle a request"""
+
+
+@functools.lru_cache(maxsize=None)
+def _request_config_class(
+    config_class: Type["pydantic_settings.BaseSettings"],
+) -> Type["pydantic_settings.BaseSettings"]:
+    """A config class that is only filled from its arguments, not from the environment"""
+
+    def settings_customise_sources(cls, settings_cls, init_settings, *args, **kwargs):
+        return (init_settings,)
+
+    return type(
+        config_class.__name__,
+        (config_class,),
+        {"settings_customise_sources": classmethod(settings_customise_sources)},
+    )
+
+
+def _engine_config(
+    dialect: _core.SqlDialect,
+    dialect_args: Dict[str, Any],
+    environment: Dict[str, str],
+) -> "pydantic.BaseModel":
+    """Build the database config of a request
+
+    Fields are taken from `dialect_args`, and then from the environment variables of
+    the client. The environment of the server is ignored, so that a client cannot run
+    SQL with the credentials of the user that started the server.
+    """
+    config_class = _request_config_class(_core.get_config(dialect))
+    prefix = config_class.model_config.get("env_prefix", "")
+    environment = {name.upper(): value for name, value in environment.items()}
+    values = {}
+    for name, field in config_class.model_fields.items():
+        # env_prefix does not apply to aliases
+        env_name = (field.alias or prefix + name).upper()
+        if env_name in environment:
+            values[field.alias or name] = environment[env_name]
+    return config_class(**{**values, **dialect_args})
+
+
+def _engine_key(engine_config: "pydantic.BaseModel") -> str:
+    """Identify a database config, including the values of its secrets
+
+    `model_dump_json` masks secrets, so configs that only differ in a password or
+    token would share an engine. The key is a hash, so that the secrets are not kept
+    in memory in plain text.
+    """
+    import pydantic
+
+    def reveal(value: Any) -> str:
+        if isinstance(value, pydantic.SecretStr):
+            return value.get_secret_value()
+        return str(value)
+
+    content = json.dumps(engine_config.model_dump(), default=reveal, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _script_summary(result: "ScriptResult") -> Dict[str, Any]:
+    return {
+        "name": result.name,
+        "duration": result.duration,
+        "statements": len(result.statements),
+        "skipped": result.skipped,
+    }
+
+
+class Engines:
+    """Engines that are kept open between requests, one per executor and database
+
+    Engines are opened on first use and closed when the server stops.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engines: Dict[Tuple[str, str, bool], Any] = {}
+        self._stack = contextlib.ExitStack()
+
+    def get(
+        self,
+        dialect: _core.SqlDialect,
+        engine_config: "pydantic.BaseModel",
+        pipelined: bool = False,
+    ) -> Optional[Any]:
+        """The open engine for a database, or None if its engines are not kept open"""
+        if dialect in _UNCACHED_DIALECTS:
+            return None
+        key = (dialect.value, _engine_key(engine_config), pipelined)
+        with self._lock:
+            if key not in self._engines:
+                logger.info("Opening engine for a %s database", dialect.value)
+                executor = _core.get_executor(dialect, pipelined=pipelined)()
+                self._engines[key] = self._stack.enter_context(
+                    executor.connect(**engine_config.model_dump())
+                )
+            return self._engines[key]
+
+    def close(self) -> None:
+        with self._lock:
+            self._engines.clear()
+            self._stack.close()
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._respond(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        self._respond(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        endpoints = {"/validate": self.server.validate, "/run": self.server.run}
+        if not self.server.authorized(self.headers.get("Authorization")):
+            self._respond(401, {"error": f"Missing or wrong token in {TOKEN_ENV}"})
+            return
+        if self.path not in endpoints:
+            self._respond(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            self._respond(400, {"error": f"Request is not valid JSON: {e}"})
+            return
+        try:
+            response = endpoints[self.path](request)
+        except Exception as e:
+            logger.error("Request to %s failed: %s", self.path, e)
+            logger.debug("Traceback of request to %s", self.path, exc_info=True)
+            self._respond(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._respond(200, response)
+
+    def _respond(self, status: int, body: Dict[str, Any]) -> None:
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _Server:
+    """Handles the requests of a server, with state that is kept between requests"""
+
+    engines: Engines
+
+    def __init__(self, token: Optional[str] = None) -> None:
+        self.engines = Engines()
+        self.token = token
+        # The sqlfluff linter of each dialect is shared, and may not be thread safe
+        self.parse_lock = threading.Lock()
+
+    def authorized(self, authorization: Optional[str]) -> bool:
+        """Whether the Authorization header of a request carries the token, if any"""
+        if self.token is None:
+            return True
+        return authorization is not None and hmac.compare_digest(
+            authorization.encode("utf-8"), f"Bearer {self.token}".encode("utf-8")
+        )
+
+    def validate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self.parse_lock:
+            results = _core.validate_files(
+                paths=request["paths"],
+                dialect=_core.SqlDialect(request["dialect"]),
+                use_cache=request.get("use_cache", True),
+                lint=request.get("lint", False),
+                # The linter of the server process is warm, worker processes are not
+                max_workers=1,
+            )
+        return {
+            "results": [
+                {"path": str(result.path), "error": result.error} for result in results
+            ]
+        }
+
+    def run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from manuel import _journal, _ledger
+
+        dialect = _core.SqlDialect(request["dialect"])
+        engine_config = _engine_config(
+            dialect,
+            dialect_args=request.get("dialect_args") or {},
+            environment=request.get("environment") or {},
+        )
+        if request.get("journal") is not None:
+            journal: Optional[_journal.Journal] = _journal.FileJournal(
+                plb.Path(request["journal"])
+            )
+        elif request.get("journal_table") is not None:
+            journal = _journal.TableJournal(request["journal_table"])
+        else:
+            journal = None
+        ledger_table = request.get("ledger_table")
+        pipeline_depth = request.get("pipeline_depth")
+        with self.parse_lock:
+            scripts = _core.read_scripts(
+                paths=request["paths"],
+                dialect=dialect,
+                use_cache=request.get("use_cache", True),
+            )
+        executor = _core._build_executor(
+            dialect,
+            dry_run=request.get("dry_run", False),
+            insert_batch_size=request.get(
+                "insert_batch_size", _batching.DEFAULT_INSERT_BATCH_SIZE
+            ),
+            dry_run_mode=_core.DryRunMode(request.get("dry_run_mode", "full")),
+            journal=journal,
+            resume=request.get("resume", False),
+            transaction_strategy=_core.TransactionStrategy(
+                request.get("transaction_strategy", "single")
+            ),
+            commit_every=request.get("commit_every"),
+            commit_interval=request.get("commit_interval"),
+            ledger=(
+                _ledger.Ledger(dialect=dialect.value, table=ledger_table)
+                if ledger_table is not None
+                else None
+            ),
+            force=request.get("force", False),
+            pipeline_depth=pipeline_depth,
+        )
+        results = executor.run_scripts(
+            scripts,
+            transaction_scope=_core.TransactionScope(
+                request.get("transaction_scope", "script")
+            ),
+            engine=self.engines.get(
+                dialect, engine_config, pipelined=pipeline_depth is not None
+            ),
+            **engine_config.model_dump(),
+        )
+        return {"scripts": [_script_summary(result) for result in results]}
+
+
+class TcpServer(_Server, http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, token: str) -> None:
+        # Other users of the host can connect to a TCP port
+        if not token:
+            raise ValueError(f"Listening on TCP requires a token in {TOKEN_ENV}")
+        _Server.__init__(self, token=token)
+        http.server.ThreadingHTTPServer.__init__(self, (host, port), Handler)
+
+
+# Unix sockets are not available on every platform
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class UnixServer(
+        _Server, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+    ):
+        daemon_threads = True
+
+        def __init__(self, path: str, token: Optional[str] = None) -> None:
+            _Server.__init__(self, token=token)
+            socketserver.UnixStreamServer.__init__(self, path, Handler)
+
+        def server_bind(self) -> None:
+            # Only the user that started the server may connect. The socket is
+            #  created with these permissions, so that there is no window in which
+            #  other users can connect
+            umask = os.umask(0o177)
+            try:
+                super().server_bind()
+            finally:
+                os.umask(umask)
+
+
+def default_socket_path() -> str:
+    """The Unix socket of the current user, in its runtime or temporary directory"""
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"manuel-{os.getuid()}.sock")
+
+
+def serve(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    socket_path: Optional[str] = None,
+    token: Optional[str] = None,
+) -> None:
+    """Serve validate and run requests until interrupted
+
+    The sqlfluff linters, the validation cache and the engines of the databases that
+    were used are kept warm between requests. Requests are handled concurrently.
+
+    By default, the server listens on a Unix socket that only the current user can
+    connect to. Listening on TCP requires a token, since other users of the host can
+    connect to it.
+
+    Args:
+        host (Optional[str], optional): Listen on TCP on this host instead of on a
+          Unix socket. Defaults to DEFAULT_HOST if `port` is passed
+        port (Optional[int], optional): Listen on TCP on this port instead of on a
+          Unix socket. Defaults to DEFAULT_PORT if `host` is passed
+        socket_path (Optional[str], optional): The Unix socket to listen on. Defaults
+          to `default_socket_path()`
+        token (Optional[str], optional): Only handle requests that carry this token.
+          Required to listen on TCP
+    """
+    server: Union[TcpServer, "UnixServer"]
+    if host is not None or port is not None:
+        if socket_path is not None:
+            raise ValueError("A Unix socket cannot be combined with a host or port")
+        server = TcpServer(
+            host or DEFAULT_HOST,
+            port if port is not None else DEFAULT_PORT,
+            token=token,
+        )
+        address = f"http://{host or DEFAULT_HOST}:{server.server_address[1]}"
+    else:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise ValueError(
+                "Unix sockets are not supported on this platform, pass a host or port"
+            )
+        socket_path = socket_path or default_socket_path()
+        server = UnixServer(socket_path, token=token)
+        address = f"unix://{socket_path}"
+    logger.info("Serving on %s", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        server.engines.close()
+        if socket_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(socket_path)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def request(
+    server: str,
+    endpoint: str,
+    payload: Dict[str, Any],
+    token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Send a request to a server and return its response
+
+    Args:
+        server (str): The address of the server, either 'http://host:port' or
+          'unix:///path/to/socket'
+        endpoint (str): 'validate' or 'run'
+        token (Optional[str], optional): The token of the server, if it requires one
+
+    Raises:
+        ServerError: If the server cannot be reached, or the request failed
+    """
+    if server.startswith("unix://"):
+        connection: http.client.HTTPConnection = _UnixHTTPConnection(
+            server[len("unix://") :]
+        )
+    elif server.startswith("http://"):
+        connection = http.client.HTTPConnection(server[len("http://") :].rstrip("/"))
+    else:
+        raise ServerError(
+            f"Server address must start with http:// or unix://, got '{server}'"
+        )
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    try:
+        connection.request(
+            "POST", f"/{endpoint}", body=json.dumps(payload), headers=headers
+        )
+        response = connection.getresponse()
+        body = json.loads(response.read())
+    except (OSError, ValueError) as e:
+        raise ServerError(f"Could not reach server {server}: {e}") from e
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise ServerError(body.get("error", f"Server responded with {response.status}"))
+    return body
+
+
+def absolute_paths(paths: List[plb.Path]) -> List[str]:
+    """Make paths and glob patterns absolute, since the server has its own cwd"""
+    return [
+        str(path if path.is_absolute() else plb.Path.cwd() / path) for path in paths
+    ]
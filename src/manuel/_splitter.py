@@ -0,0 +1,292 @@
+import logging
+import re
+from typing import Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("manuel._splitter")
+
+# Dialects in which backslashes escape characters inside string literals
+_BACKSLASH_ESCAPES = {"bigquery", "databricks"}
+# Dialects that support dollar-quoted strings (e.g. $$ ... $$ or $body$ ... $body$)
+_DOLLAR_QUOTES = {"postgres", "duckdb"}
+# Dialects in which block comments can be nested
+_NESTED_COMMENTS = {"postgres"}
+# Dialects with escape string constants (E'...'), in which backslashes escape quotes
+_ESCAPE_STRINGS = {"postgres"}
+# Dialects with blocks that contain statements, whose semicolons do not end the
+#  enclosing statement: SQL-standard function bodies (BEGIN ATOMIC ... END) in
+#  postgres, and procedure bodies and scripting statements in bigquery
+_BLOCKS = {"postgres", "bigquery"}
+# Bigquery scripting statements that contain statements and end with END <keyword>
+_CONTROL_BLOCKS = {"IF", "LOOP", "WHILE", "REPEAT", "FOR"}
+
+_IDENTIFIER_CHARS = re.compile(r"[A-Za-z0-9_]")
+_WORD = re.compile(r"(?<![A-Za-z0-9_$])[A-Za-z_][A-Za-z0-9_$]*")
+_LABEL_COLON = re.compile(r"\s*:")
+
+
+class StatementSplitter:
+    """Incrementally split a stream of SQL text into statements
+
+    Text is fed to the splitter in chunks of arbitrary size. Statements are emitted as
+    soon as their terminating semicolon has been read, so that only the statement that
+    is currently being read is kept in memory. Semicolons inside comments, quoted
+    strings, quoted identifiers and dollar-quoted strings do not end a statement, and
+    neither do semicolons inside a postgres `BEGIN ATOMIC ... END` function body or
+    inside bigquery `BEGIN ... END` blocks and scripting statements (IF, LOOP, WHILE,
+    REPEAT, FOR and CASE). Statements that consist of only whitespace and comments
+    are dropped.
+    """
+
+    def __init__(self, dialect: str) -> None:
+        self.backslash_escapes = dialect in _BACKSLASH_ESCAPES
+        self.dollar_quotes = dialect in _DOLLAR_QUOTES
+        self.nested_comments = dialect in _NESTED_COMMENTS
+        self.escape_strings = dialect in _ESCAPE_STRINGS
+        self.dialect = dialect
+        self.blocks = dialect in _BLOCKS
+        self._normal = re.compile(
+            r"--|/\*|['\"`;]"
+            + (r"|\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$" if self.dollar_quotes else "")
+        )
+        self._block_comment = re.compile(r"/\*|\*/" if self.nested_comments else r"\*/")
+        self._buffer = ""
+        # Start of the current statement, and position up to which it has been scanned
+        self._start = 0
+        self._pos = 0
+        # One of None (plain SQL), '--', '/*', a quote character or a dollar quote tag
+        self._state: Optional[str] = None
+        self._comment_depth = 0
+        self._has_code = False
+        # The blocks that enclose the current position, innermost last, with the
+        #  CASE expressions inside them, which also end with END
+        self._blocks: List[str] = []
+        self._last_word = ""
+        # Whether the next word starts a statement inside a block
+        self._statement_start = True
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk of SQL text and return the statements that it completes"""
+        # Drop the statements that were already emitted before appending, so that the
+        #  buffer never holds more than the current statement and the new chunk
+        self._buffer = self._buffer[self._start :] + chunk
+        self._pos -= self._start
+        self._start = 0
+        return list(self._scan(final=False))
+
+    def close(self) -> List[str]:
+        """Signal the end of the input and return the last statement, if any"""
+        statements = list(self._scan(final=True))
+        if self._state not in (None, "--"):
+            raise ValueError(
+                f"SQL statement is not valid. Got error: \n\nUnterminated {self._state!r} at end of input"
+            )
+        statement = self._emit(len(self._buffer))
+        if statement is not None:
+            statements.append(statement)
+        self._buffer, self._start, self._pos = "", 0, 0
+        return statements
+
+    def _emit(self, end: int) -> Optional[str]:
+        statement = self._buffer[self._start : end].strip() if self._has_code else None
+        self._start = self._pos = end + 1
+        self._has_code = False
+        self._blocks = []
+        self._last_word = ""
+        self._statement_start = True
+        return statement if statement else None
+
+    def _scan(self, final: bool) -> Iterator[str]:
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            if self._state is None:
+                match = self._normal.search(buffer, self._pos)
+                # A '-' or '/' at the end of the buffer may be the start of a comment,
+                #  and a '$' the start of a dollar quote tag, so these are scanned
+                #  again once more input is available
+                end = match.start() if match else self._resume_position(final)
+                if buffer[self._pos : end].strip():
+                    self._has_code = True
+                    if self.blocks:
+                        self._track_blocks(self._pos, end)
+                if match is None:
+                    self._pos = end
+                    return
+                token = match.group()
+                if token == ";" and self.blocks and self._end_block_statement():
+                    self._pos = match.end()
+                    continue
+                if token == ";":
+                    statement = self._emit(match.start())
+                    if statement is not None:
+                        yield statement
+                    continue
+                if token.startswith("$") and match.start() > 0:
+                    if _IDENTIFIER_CHARS.match(buffer[match.start() - 1]):
+                        # E.g. 'my$table$', which is an identifier in postgres
+                        self._has_code = True
+                        self._pos = match.start() + 1
+                        continue
+                if token in ("--", "/*"):
+                    self._comment_depth = 1
+                else:
+                    self._has_code = True
+                if token == "'" and self._escape_string(match.start()):
+                    token = "E'"
+                self._state = token
+                self._pos = match.end()
+            elif self._state == "--":
+                end = buffer.find("\n", self._pos)
+                if end == -1:
+                    self._pos = len(buffer)
+                    return
+                self._state = None
+                self._pos = end + 1
+            elif self._state == "/*":
+                match = self._block_comment.search(buffer, self._pos)
+                if match is None:
+                    self._pos = max(self._pos, len(buffer) - 1)
+                    return
+                self._comment_depth += 1 if match.group() == "/*" else -1
+                if self._comment_depth == 0:
+                    self._state = None
+                self._pos = match.end()
+            elif self._state.startswith("$"):
+                end = buffer.find(self._state, self._pos)
+                if end == -1:
+                    self._pos = max(self._pos, len(buffer) - len(self._state) + 1)
+                    return
+                self._pos = end + len(self._state)
+                self._state = None
+            else:
+                if not self._scan_quoted(final):
+                    return
+
+    def _escape_string(self, quote: int) -> bool:
+        """Whether the quote at this position opens an escape string, e.g. E'a\\'b'"""
+        if not self.escape_strings or quote == 0:
+            return False
+        prefix = self._buffer[quote - 1]
+        if prefix not in "eE":
+            return False
+        return quote == 1 or not _IDENTIFIER_CHARS.match(self._buffer[quote - 2])
+
+    def _track_blocks(self, start: int, end: int):
+        previous_end = start
+        for match in _WORD.finditer(self._buffer, start, end):
+            if self._buffer[previous_end : match.start()].strip():
+                # E.g. the comma in 'END, CASE', which are not a single keyword
+                self._last_word = ""
+            previous_end = match.end()
+            word = match.group().upper()
+            if self.dialect == "postgres":
+                self._track_postgres_word(word)
+            else:
+                self._track_bigquery_word(word, match.end())
+            self._last_word = word
+        if self._buffer[previous_end:end].strip():
+            self._last_word = ""
+
+    def _track_postgres_word(self, word: str):
+        if word == "ATOMIC" and self._last_word == "BEGIN":
+            self._blocks.append(word)
+        elif word == "CASE" and self._blocks:
+            self._blocks.append(word)
+        elif word == "END" and self._blocks:
+            self._blocks.pop()
+
+    def _track_bigquery_word(self, word: str, end: int):
+        blocks, statement_start = self._blocks, self._statement_start
+        self._statement_start = False
+        top = blocks[-1] if blocks else None
+        if self._last_word == "END" and word in _CONTROL_BLOCKS | {"CASE"}:
+            # E.g. END IF, which closed the block of the preceding END
+            return
+        if word == "TRANSACTION" and self._last_word == "BEGIN" and top == "BEGIN":
+            # BEGIN TRANSACTION is a statement, not a block
+            blocks.pop()
+        elif word == "BEGIN":
+            blocks.append(word)
+            self._statement_start = True
+        elif word == "CASE":
+            blocks.append("CASE STATEMENT" if statement_start else word)
+        elif word in _CONTROL_BLOCKS and statement_start:
+            # Elsewhere, these are e.g. the IF and REPEAT functions or FOR SYSTEM_TIME
+            blocks.append(word)
+            self._statement_start = word in ("LOOP", "REPEAT")
+        elif word == "END":
+            if blocks:
+                blocks.pop()
+        elif word == "THEN" and top in ("IF", "BEGIN", "CASE STATEMENT"):
+            self._statement_start = True
+        elif word == "ELSE" and top in ("IF", "CASE STATEMENT"):
+            self._statement_start = True
+        elif word == "DO" and top in ("WHILE", "FOR"):
+            self._statement_start = True
+        elif statement_start and _LABEL_COLON.match(self._buffer, end):
+            # A label, e.g. 'outer: LOOP'
+            self._statement_start = True
+
+    def _end_block_statement(self) -> bool:
+        """Handle a semicolon, and return whether it ends a statement inside a block"""
+        if self._last_word == "BEGIN" and self._blocks[-1:] == ["BEGIN"]:
+            # BEGIN; starts a transaction in bigquery
+            self._blocks.pop()
+        self._last_word = ";"
+        self._statement_start = True
+        return bool(self._blocks)
+
+    def _scan_quoted(self, final: bool) -> bool:
+        buffer, quote = self._buffer, self._state
+        assert quote is not None
+        pos = self._pos
+        backslash_escapes = self.backslash_escapes and quote != "`"
+        if quote == "E'":
+            quote, backslash_escapes = "'", True
+        while True:
+            end = buffer.find(quote, pos)
+            if backslash_escapes:
+                escape = buffer.find("\\", pos)
+                if escape != -1 and (end == -1 or escape < end):
+                    if escape == len(buffer) - 1 and not final:
+                        self._pos = escape
+                        return False
+                    pos = escape + 2
+                    continue
+            if end == -1:
+                self._pos = len(buffer)
+                return False
+            if end == len(buffer) - 1 and not final:
+                # The quote may be the first half of an escaped (doubled) quote
+                self._pos = end
+                return False
+            if buffer.startswith(quote, end + 1):
+                pos = end + 2
+                continue
+            self._state = None
+            self._pos = end + 1
+            return True
+
+    def _resume_position(self, final: bool) -> int:
+        buffer = self._buffer
+        if final:
+            return len(buffer)
+        if buffer.endswith(("-", "/")):
+            return len(buffer) - 1
+        if self.blocks:
+            # A keyword at the end of the buffer may continue in the next chunk
+            word = re.search(r"[A-Za-z0-9_$]+\Z", buffer[self._pos :])
+            if word is not None:
+                return self._pos + word.start()
+        if self.dollar_quotes:
+            dollar = buffer.rfind("$", self._pos)
+            if dollar != -1 and re.fullmatch(r"\$[A-Za-z0-9_]*", buffer[dollar:]):
+                return dollar
+        return len(buffer)
+
+
+def split_statements(chunks: Iterable[str], dialect: str) -> Iterator[str]:
+    """Split chunks of SQL text into statements, reading the chunks lazily"""
+    splitter = StatementSplitter(dialect)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
@@ -0,0 +1,127 @@
+import contextlib
+import json
+import logging
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from manuel._executors.runner import ScriptResult
+
+logger = logging.getLogger("manuel._timings")
+
+# The collector of the current run, if timings were requested. Phases are no-ops
+#  otherwise, so that instrumented code pays next to nothing by default.
+_collector: Optional["Timings"] = None
+
+
+class Timings:
+    """Collects the wall time spent in each phase of a run, and of each statement
+
+    Phases may be nested, e.g. a module that is imported while an engine is created.
+    The time of a phase excludes the time of the phases nested in it, so that the
+    phases of a single thread add up to at most the total wall time. Phases of
+    concurrent threads are added up, and may exceed it.
+    """
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Total exclusive duration and number of occurrences of each phase
+        self.phases: Dict[str, List[float]] = {}
+        if started_at is not None:
+            self.phases["startup"] = [self.start - started_at, 1]
+            self.start = started_at
+        self.scripts: List["ScriptResult"] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        stack: List[float] = self._local.__dict__.setdefault("stack", [])
+        # Time spent in nested phases is accumulated on the stack
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                total = self.phases.setdefault(name, [0.0, 0])
+                total[0] += elapsed - nested
+                total[1] += 1
+
+    def record_script(self, result: "ScriptResult") -> None:
+        with self._lock:
+            self.scripts.append(result)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": time.perf_counter() - self.start,
+                "phases": {
+                    name: {"duration": duration, "count": count}
+                    for name, (duration, count) in self.phases.items()
+                },
+                "scripts": [
+                    {
+                        "name": script.name,
+                        "duration": script.duration,
+                        "skipped": script.skipped,
+                        "statements": [
+                            {
+                                "index": statement.index,
+                                "duration": statement.duration,
+                                "rowcount": statement.rowcount,
+                                "preview": statement.preview,
+                            }
+                            for statement in script.statements
+                        ],
+                    }
+                    for script in self.scripts
+                ],
+            }
+
+    def write(self, destination: str) -> None:
+        """Write the report as JSON to a file, or to stderr if `destination` is '-'"""
+        content = json.dumps(self.report(), indent=2) + "\n"
+        if destination == "-":
+            sys.stderr.write(content)
+        else:
+            with open(destination, "w") as f:
+                f.write(content)
+            logger.info("Timings written to %s", destination)
+
+
+def start(started_at: Optional[float] = None) -> Timings:
+    """Start collecting timings, until `stop` is called
+
+    Args:
+        started_at (Optional[float], optional): `time.perf_counter()` when the work
+          to be timed started, e.g. when the package was imported. The time until now
+          is reported as the 'startup' phase, and is part of the total
+    """
+    global _collector
+    _collector = Timings(started_at=started_at)
+    return _collector
+
+
+def stop() -> Optional[Timings]:
+    global _collector
+    collector, _collector = _collector, None
+    return collector
+
+
+def phase(name: str):
+    """Time a phase of the run, if timings are being collected"""
+    collector = _collector
+    return collector.phase(name) if collector is not None else contextlib.nullcontext()
+
+
+def record_script(result: "ScriptResult") -> None:
+    collector = _collector
+    if collector is not None:
+        collector.record_script(result)
@@ -1,8 +1,23 @@
+import codecs
+import glob
+import importlib
+import importlib.util
 import logging
+import mmap
+import os
 import pathlib as plb
+import queue
+import threading
+from typing import Any, Iterable, Iterator, List, TypeVar, Union
+
+from manuel import _timings
 
 logger = logging.getLogger("manuel._dialects.utils")
 
+T = TypeVar("T")
+
+_END = object()
+
 
 def _path_valid(path: plb.Path) -> plb.Path:
     if not path.exists():
@@ -17,6 +32,103 @@ def read_sql_file(path: plb.Path) -> str:
         return f.read()
 
 
+def iter_sql_file(path: plb.Path, chunk_size: int = 1024 * 1024) -> Iterator[str]:
+    """Read a SQL file in chunks of (at most) `chunk_size` bytes
+
+    The file is memory-mapped, so that only the chunk that is being decoded is held
+    in memory, regardless of the size of the file.
+    """
+    path = plb.Path(path).resolve()
+    logger.debug("Streaming file: %s", path)
+    with _path_valid(path).open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # Chunk boundaries may split multi-byte characters
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for offset in range(0, len(mm), chunk_size):
+                yield decoder.decode(mm[offset : offset + chunk_size])
+            yield decoder.decode(b"", final=True)
+
+
+def quote_literal(value: str) -> str:
+    """Quote a string as a SQL string literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def iterate_in_thread(iterable: Iterable[T], buffer_size: int = 64) -> Iterator[T]:
+    """Consume an iterable in a background thread, ahead of the caller
+
+    At most `buffer_size` items are read ahead. An exception raised by the iterable is
+    re-raised in the consuming thread once all items before it have been consumed. If
+    the consumer stops early, the background thread stops after its current item.
+    """
+    items: "queue.Queue" = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def put(item, error=None) -> bool:
+        while not stop.is_set():
+            try:
+                items.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_END, e)
+        else:
+            put(_END)
+
+    thread = threading.Thread(target=produce, name="manuel-producer", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def collect_sql_files(paths: Iterable[Union[str, plb.Path]]) -> List[plb.Path]:
+    """Expand files, directories and glob patterns into a list of SQL files
+
+    Directories are searched recursively for '*.sql' files. Duplicates are removed
+    while preserving the order in which the files were found.
+    """
+    files: List[plb.Path] = []
+    for path in paths:
+        if glob.has_magic(str(path)):
+            matches = [
+                plb.Path(p) for p in sorted(glob.glob(str(path), recursive=True))
+            ]
+            if not matches:
+                raise FileNotFoundError(f"No files match pattern: {path}")
+        else:
+            path = _path_valid(plb.Path(path))
+            matches = sorted(path.rglob("*.sql")) if path.is_dir() else [path]
+        files.extend(m.resolve() for m in matches if m.is_file())
+    return list(dict.fromkeys(files))
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 def requires_extra(library_name: str, extra_name: str, extra_installed: bool):
     def decorator(function):
         def wrapper(*args, **kwargs):
@@ -29,3 +141,19 @@ def requires_extra(library_name: str, extra_name: str, extra_installed: bool):
         return wrapper
 
     return decorator
+
+
+def is_installed(module_name: str) -> bool:
+    """Check whether a module can be imported without actually importing it"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:
+        # Raised if a parent package of a dotted module name is not installed
+        return False
+
+
+def import_object(path: str) -> Any:
+    """Import an object given a 'package.module:object' path"""
+    module_name, object_name = path.split(":")
+    with _timings.phase("import"):
+        return getattr(importlib.import_module(module_name), object_name)
@@ -1,12 +1,25 @@
+import contextlib
 import json
 import logging
+import os
 import pathlib as plb
-from typing import Optional
+import sys
+from typing import List, Optional
 
 import typer
 from typing_extensions import Annotated
 
-from manuel import _core
+import manuel
+from manuel import (
+    _batching,
+    _core,
+    _fanout,
+    _journal,
+    _ledger,
+    _server,
+    _timings,
+    _utils,
+)
 
 logger = logging.getLogger("manuel")
 handler = logging.StreamHandler()
@@ -15,6 +28,12 @@ handler.setFormatter(format)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+# Dialects in which Manuel can keep its own bookkeeping tables
+_TABLE_DIALECTS = (
+    _core.SqlDialect.POSTGRES,
+    _core.SqlDialect.DUCKDB,
+    _core.SqlDialect.MOTHERDUCK,
+)
 
 app = typer.Typer(
     name="manuel",
@@ -34,25 +53,84 @@ def main(debug: bool = typer.Option(False, help="Enable debug logging.")):
 
 @app.command(
     name="validate",
-    help="Validate a SQL file using SQLFluff",
+    help="Validate SQL files using SQLFluff",
 )
 def _validate(
-    path: Annotated[plb.Path, typer.Argument(help="Path to the SQL file to validate")],
+    paths: Annotated[
+        List[plb.Path],
+        typer.Argument(
+            help="SQL files, directories or glob patterns (e.g. 'migrations/**/*.sql') to validate"
+        ),
+    ],
     dialect: Annotated[
         _core.SqlDialect, typer.Option(help="SQL dialect to use", case_sensitive=False)
     ] = "postgres",
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            help="Always validate the SQL file, ignoring the validation cache",
+            envvar="MANUEL_NO_CACHE",
+        ),
+    ] = False,
+    lint: Annotated[
+        bool,
+        typer.Option(
+            help="Evaluate all SQLFluff lint rules instead of only parsing the SQL file. Rule violations are reported as warnings"
+        ),
+    ] = False,
+    workers: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Number of worker processes. Defaults to the number of available CPUs",
+            min=1,
+        ),
+    ] = None,
+    server: Annotated[
+        Optional[str],
+        typer.Option(
+            help=f"Send the request to a server started with 'manuel serve' (e.g. 'unix:///run/user/1000/manuel-1000.sock' or 'http://127.0.0.1:8753'), which keeps parsers and database engines warm between calls. The token of the server is read from {_server.TOKEN_ENV}",
+            envvar="MANUEL_SERVER",
+        ),
+    ] = None,
 ):
-    logger.info("Validating SQL file: %s", path)
-    _core.parse_sql(path=path, dialect=dialect)
+    if server is not None:
+        results = _validate_on_server(
+            server, paths, dialect, use_cache=not no_cache, lint=lint
+        )
+    else:
+        results = _core.validate_files(
+            paths=paths,
+            dialect=dialect,
+            use_cache=not no_cache,
+            lint=lint,
+            max_workers=workers,
+        )
+    failed = [result for result in results if result.error is not None]
+    for result in failed:
+        logger.error("%s: %s", result.path, result.error)
+    logger.info(
+        "Validated %s file(s): %s passed, %s failed",
+        len(results),
+        len(results) - len(failed),
+        len(failed),
+    )
+    if failed:
+        raise typer.Exit(code=1)
     logger.info("Validation successful")
 
 
 @app.command(
     name="run",
-    help="Execute a SQL file",
+    help="Execute SQL files in order, through a single database engine",
 )
 def _run(
-    path: Annotated[plb.Path, typer.Argument(help="Path to the SQL file to validate")],
+    ctx: typer.Context,
+    paths: Annotated[
+        List[plb.Path],
+        typer.Argument(
+            help="SQL files, directories or glob patterns to execute. Files in directories are executed in alphabetical order"
+        ),
+    ],
     dialect: Annotated[_core.SqlDialect, typer.Argument(help="SQL dialect to use")],
     dry_run: Annotated[
         bool,
@@ -69,18 +147,611 @@ def _run(
             uppercase and an underscore (e.g. 'POSTGRES_USER')"""
         ),
     ] = None,
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            help="Always validate the SQL file, ignoring the validation cache",
+            envvar="MANUEL_NO_CACHE",
+        ),
+    ] = False,
+    stream: Annotated[
+        bool,
+        typer.Option(
+            help="Read, validate and execute the SQL file one statement at a time, so that memory usage does not depend on the size of the file"
+        ),
+    ] = False,
+    pipeline: Annotated[
+        bool,
+        typer.Option(
+            help="Like --stream, but validate the next statements in a background thread while the current statement is executed. If a statement is not valid, the run is aborted and rolled back"
+        ),
+    ] = False,
+    transaction_scope: Annotated[
+        _core.TransactionScope,
+        typer.Option(
+            help="Commit after every file ('script'), or once after all files ('single'). 'single' fails before committing anything if a statement cannot run in a transaction",
+            case_sensitive=False,
+        ),
+    ] = "script",
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Execute up to this many files concurrently, each in its own transaction, as soon as the files that it depends on have finished. Dependencies are inferred from the tables that files read and write, unless --manifest is given",
+            min=1,
+        ),
+    ] = 1,
+    manifest: Annotated[
+        Optional[plb.Path],
+        typer.Option(
+            help="""JSON file that maps each SQL file to the files that it depends on (e.g. '{"b.sql": ["a.sql"]}'), relative to the manifest. Only used with --workers"""
+        ),
+    ] = None,
+    insert_batch_size: Annotated[
+        int,
+        typer.Option(
+            help="Merge up to this many consecutive single-row INSERTs into the same table into one multi-row INSERT (postgres only). Use 1 to disable",
+            min=1,
+        ),
+    ] = _batching.DEFAULT_INSERT_BATCH_SIZE,
+    dry_run_mode: Annotated[
+        Optional[_core.DryRunMode],
+        typer.Option(
+            help="How to dry run: 'full' executes every statement and rolls back, 'plan' only plans each statement with EXPLAIN and reports the estimated cost and rows (postgres, duckdb, motherduck). Implies --dry-run",
+            case_sensitive=False,
+            envvar="MANUEL_DRY_RUN_MODE",
+        ),
+    ] = None,
+    journal: Annotated[
+        Optional[plb.Path],
+        typer.Option(
+            help="File in which every committed statement is recorded by its content hash, so that a failed run can be continued with --resume"
+        ),
+    ] = None,
+    journal_table: Annotated[
+        Optional[str],
+        typer.Option(
+            help=f"Like --journal, but record committed statements in this table of the target database (e.g. '{_journal.DEFAULT_JOURNAL_TABLE}'), in the same transaction as the statements (postgres, duckdb, motherduck)"
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            help="Skip the statements that the journal records as committed, and continue from the statement that failed. Requires --journal or --journal-table"
+        ),
+    ] = False,
+    transaction_strategy: Annotated[
+        Optional[_core.TransactionStrategy],
+        typer.Option(
+            help="When to commit: once per file ('single'), after every statement ('autocommit'), or after every --commit-every statements or --commit-interval seconds ('batched'). Defaults to 'batched' if either of these is given, and to 'single' otherwise. Dry runs require 'single'",
+            case_sensitive=False,
+        ),
+    ] = None,
+    commit_every: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Commit after this many statements, instead of once per file, so that a failed run loses less work and holds locks for less time",
+            min=1,
+        ),
+    ] = None,
+    commit_interval: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Commit once this many seconds have passed since the last commit",
+            min=0,
+        ),
+    ] = None,
+    ledger: Annotated[
+        bool,
+        typer.Option(
+            help="Record every applied file by the hash of its content in a ledger table of the target database, and skip files that were applied before (postgres, duckdb, motherduck)",
+            envvar="MANUEL_LEDGER",
+        ),
+    ] = False,
+    ledger_table: Annotated[
+        str, typer.Option(help="Name of the ledger table used by --ledger")
+    ] = _ledger.DEFAULT_LEDGER_TABLE,
+    force: Annotated[
+        bool,
+        typer.Option(
+            help="Execute files even if the ledger records them as applied. Requires --ledger"
+        ),
+    ] = False,
+    targets: Annotated[
+        Optional[plb.Path],
+        typer.Option(
+            help="""JSON file with the configs of many databases of the dialect, as a list or as an object keyed by target name (e.g. '{"tenant_a": {"database": "a"}}'). The files are validated once and executed on every target concurrently. Fields that a config leaves out are taken from --dialect-args and environment variables"""
+        ),
+    ] = None,
+    target_workers: Annotated[
+        int,
+        typer.Option(
+            help="Maximum number of targets on which files are executed concurrently",
+            min=1,
+        ),
+    ] = _fanout.DEFAULT_TARGET_WORKERS,
+    report: Annotated[
+        Optional[plb.Path],
+        typer.Option(
+            help="File to write the results, timings and failures of every target to as JSON. Only used with --targets"
+        ),
+    ] = None,
+    pipeline_depth: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Send up to this many consecutive statements at once through psycopg 3 pipeline mode, instead of waiting for the result of each statement, to save network round trips to remote databases (postgres only)",
+            min=2,
+        ),
+    ] = None,
+    server: Annotated[
+        Optional[str],
+        typer.Option(
+            help=f"Send the request to a server started with 'manuel serve' (e.g. 'unix:///run/user/1000/manuel-1000.sock' or 'http://127.0.0.1:8753'), which keeps parsers and database engines warm between calls. The token of the server is read from {_server.TOKEN_ENV}",
+            envvar="MANUEL_SERVER",
+        ),
+    ] = None,
+    timings: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Write the time spent in each phase of the run (startup, import, config, read, dialect, validate, engine, connect, execute, commit, ...) and of each statement as JSON to this file, or to stderr if '-'. Startup covers the imports of the CLI since the manuel package was imported, but not the start of the Python interpreter",
+        ),
+    ] = None,
 ):
-    logger.info("Executing SQL file: %s", path)
-    _core.run_sql(
-        sql=_core.parse_sql(path=path, dialect=dialect),
+    if timings is not None:
+        _timings.start(started_at=manuel._IMPORTED_AT)
+        # Also written if the run fails, to show where the time went until then
+        ctx.call_on_close(lambda: _write_timings(timings))
+    if dry_run_mode is not None:
+        dry_run = True
+    dry_run_mode = dry_run_mode or _core.DryRunMode.FULL
+    if journal is not None and journal_table is not None:
+        raise typer.BadParameter("--journal cannot be combined with --journal-table")
+    if journal_table is not None and dialect not in _TABLE_DIALECTS:
+        raise typer.BadParameter(
+            "--journal-table is only supported for postgres, duckdb and motherduck"
+        )
+    if ledger and dialect not in _TABLE_DIALECTS:
+        raise typer.BadParameter(
+            "--ledger is only supported for postgres, duckdb and motherduck"
+        )
+    if pipeline_depth is not None and dialect != _core.SqlDialect.POSTGRES:
+        raise typer.BadParameter("--pipeline-depth is only supported for postgres")
+    if force and not ledger:
+        raise typer.BadParameter("--force requires --ledger")
+    if resume and journal is None and journal_table is None:
+        raise typer.BadParameter("--resume requires --journal or --journal-table")
+    batched = commit_every is not None or commit_interval is not None
+    if transaction_strategy is None:
+        transaction_strategy = (
+            _core.TransactionStrategy.BATCHED
+            if batched
+            else _core.TransactionStrategy.SINGLE
+        )
+    if batched != (transaction_strategy == _core.TransactionStrategy.BATCHED):
+        raise typer.BadParameter(
+            "--commit-every and --commit-interval require --transaction-strategy batched"
+        )
+    if transaction_strategy != _core.TransactionStrategy.SINGLE:
+        if dry_run:
+            raise typer.BadParameter(
+                "Dry runs require --transaction-strategy single, since committed statements cannot be rolled back"
+            )
+        if transaction_scope == _core.TransactionScope.SINGLE:
+            raise typer.BadParameter(
+                f"--transaction-strategy {transaction_strategy.value} cannot be combined with --transaction-scope single"
+            )
+    if journal is not None:
+        statement_journal = _journal.FileJournal(journal)
+    elif journal_table is not None:
+        statement_journal = _journal.TableJournal(journal_table)
+    else:
+        statement_journal = None
+    if server is not None:
+        if targets is not None or workers > 1 or stream or pipeline:
+            raise typer.BadParameter(
+                "--server cannot be combined with --targets, --workers, --stream or --pipeline"
+            )
+        logger.info(
+            "Executing SQL file(s) on server %s: %s",
+            server,
+            ", ".join(str(path) for path in paths),
+        )
+        _run_on_server(
+            server,
+            {
+                "paths": _server.absolute_paths(paths),
+                "dialect": dialect.value,
+                "dialect_args": json.loads(dialect_args) if dialect_args else {},
+                # The server ignores its own environment, which may hold the
+                #  credentials of another user
+                "environment": {
+                    name: value
+                    for name, value in os.environ.items()
+                    if name.upper().startswith(f"{dialect.value.upper()}_")
+                },
+                "use_cache": not no_cache,
+                "dry_run": dry_run,
+                "transaction_scope": transaction_scope.value,
+                "insert_batch_size": insert_batch_size,
+                "dry_run_mode": dry_run_mode.value,
+                "journal": str(journal.resolve()) if journal is not None else None,
+                "journal_table": journal_table,
+                "resume": resume,
+                "transaction_strategy": transaction_strategy.value,
+                "commit_every": commit_every,
+                "commit_interval": commit_interval,
+                "ledger_table": ledger_table if ledger else None,
+                "force": force,
+                "pipeline_depth": pipeline_depth,
+            },
+        )
+        logger.info("Execution successful")
+        return
+    if targets is not None:
+        if workers > 1 or stream or pipeline:
+            raise typer.BadParameter(
+                "--targets cannot be combined with --workers, --stream or --pipeline"
+            )
+        if statement_journal is not None:
+            raise typer.BadParameter("--targets cannot be combined with a journal")
+        with _timings.phase("config"):
+            target_configs = _fanout.load_targets(
+                targets,
+                _core.get_config(dialect),
+                defaults=json.loads(dialect_args) if dialect_args else None,
+            )
+        logger.info(
+            "Executing SQL file(s) on %s target(s) with %s workers: %s",
+            len(target_configs),
+            target_workers,
+            ", ".join(str(path) for path in paths),
+        )
+        results = _core.run_targets(
+            paths=paths,
+            dialect=dialect,
+            targets=target_configs,
+            dry_run=dry_run,
+            max_workers=target_workers,
+            use_cache=not no_cache,
+            transaction_scope=transaction_scope,
+            insert_batch_size=insert_batch_size,
+            dry_run_mode=dry_run_mode,
+            transaction_strategy=transaction_strategy,
+            commit_every=commit_every,
+            commit_interval=commit_interval,
+            ledger_table=ledger_table if ledger else None,
+            force=force,
+            report=report,
+            pipeline_depth=pipeline_depth,
+        )
+        if any(result.error is not None for result in results):
+            raise typer.Exit(code=1)
+        logger.info("Execution successful")
+        return
+    with _timings.phase("config"):
+        engine_config = _core.get_config(dialect)(
+            **json.loads(dialect_args) if dialect_args else {}
+        )
+    script_ledger = (
+        _ledger.Ledger(dialect=dialect.value, table=ledger_table) if ledger else None
+    )
+    if workers > 1:
+        if stream or pipeline:
+            raise typer.BadParameter(
+                "--workers cannot be combined with --stream or --pipeline"
+            )
+        if transaction_scope == _core.TransactionScope.SINGLE:
+            raise typer.BadParameter(
+                "--workers cannot be combined with --transaction-scope single"
+            )
+        logger.info(
+            "Executing SQL file(s) with %s workers: %s",
+            workers,
+            ", ".join(str(path) for path in paths),
+        )
+        _core.run_graph(
+            paths=paths,
+            dialect=dialect,
+            engine_config=engine_config,
+            dry_run=dry_run,
+            max_workers=workers,
+            manifest=manifest,
+            use_cache=not no_cache,
+            insert_batch_size=insert_batch_size,
+            dry_run_mode=dry_run_mode,
+            journal=statement_journal,
+            resume=resume,
+            transaction_strategy=transaction_strategy,
+            commit_every=commit_every,
+            commit_interval=commit_interval,
+            ledger=script_ledger,
+            force=force,
+            pipeline_depth=pipeline_depth,
+        )
+        logger.info("Execution successful")
+        return
+    if pipeline:
+        read_mode = _core.ReadMode.PIPELINE
+    elif stream:
+        read_mode = _core.ReadMode.STREAM
+    else:
+        read_mode = _core.ReadMode.PARSE
+    logger.info("Executing SQL file(s): %s", ", ".join(str(path) for path in paths))
+    scripts = _core.read_scripts(
+        paths=paths, dialect=dialect, read_mode=read_mode, use_cache=not no_cache
+    )
+    _core.run_scripts(
+        scripts=scripts,
         dialect=dialect,
         dry_run=dry_run,
-        engine_config=_core.config_map[dialect](
-            **json.loads(dialect_args) if dialect_args else {}
-        ),
+        engine_config=engine_config,
+        transaction_scope=transaction_scope,
+        insert_batch_size=insert_batch_size,
+        dry_run_mode=dry_run_mode,
+        journal=statement_journal,
+        resume=resume,
+        transaction_strategy=transaction_strategy,
+        commit_every=commit_every,
+        commit_interval=commit_interval,
+        ledger=script_ledger,
+        force=force,
+        pipeline_depth=pipeline_depth,
     )
     logger.info("Execution successful")
 
 
+@app.command(
+    name="query",
+    help="Execute a SQL file and stream the rows of its last statement to CSV or JSONL",
+)
+def _query(
+    path: Annotated[
+        plb.Path,
+        typer.Argument(
+            help="SQL file to execute. The rows of its last statement are written to the output"
+        ),
+    ],
+    dialect: Annotated[_core.SqlDialect, typer.Argument(help="SQL dialect to use")],
+    output: Annotated[
+        str,
+        typer.Option(help="File to write the rows to, or '-' to write to stdout"),
+    ] = "-",
+    format: Annotated[
+        _core.OutputFormat,
+        typer.Option(
+            help="Format of the output. 'parquet' and 'arrow' (IPC file) are written from Arrow record batches, and are only supported for duckdb and motherduck",
+            case_sensitive=False,
+        ),
+    ] = "csv",
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            help="Number of rows that are fetched from the database at a time. This is also the maximum row group size of Parquet output",
+            min=1,
+        ),
+    ] = 10_000,
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            help="Dry run do not commit changes to the database",
+            envvar="MANUEL_DRY_RUN",
+        ),
+    ] = False,
+    dialect_args: Annotated[
+        Optional[str],
+        typer.Option(
+            help="""Dialect-specific arguments passed as JSON (e.g. '{"user": "postgres", ...}').
+            These may also be passed using environment variables prefixed with the dialect name in
+            uppercase and an underscore (e.g. 'POSTGRES_USER')"""
+        ),
+    ] = None,
+    no_cache: Annotated[
+        bool,
+        typer.Option(
+            help="Always validate the SQL file, ignoring the validation cache",
+            envvar="MANUEL_NO_CACHE",
+        ),
+    ] = False,
+):
+    engine_config = _core.get_config(dialect)(
+        **json.loads(dialect_args) if dialect_args else {}
+    )
+    if format.is_binary and dialect not in (
+        _core.SqlDialect.DUCKDB,
+        _core.SqlDialect.MOTHERDUCK,
+    ):
+        raise typer.BadParameter(
+            f"'{format.value}' output is only supported for duckdb and motherduck"
+        )
+    logger.info("Querying SQL file: %s", path)
+    if output == "-":
+        output_file = contextlib.nullcontext(
+            sys.stdout.buffer if format.is_binary else sys.stdout
+        )
+    elif format.is_binary:
+        output_file = open(output, "wb")
+    else:
+        output_file = open(output, "w", newline="")
+    with output_file as f:
+        _core.query_sql(
+            path=path,
+            output=f,
+            dialect=dialect,
+            engine_config=engine_config,
+            dry_run=dry_run,
+            output_format=format,
+            batch_size=batch_size,
+            use_cache=not no_cache,
+        )
+    logger.info("Query successful")
+
+
+@app.command(
+    name="load",
+    help="Bulk load a CSV or text file into a table using COPY (postgres only)",
+)
+def _load(
+    file: Annotated[
+        str,
+        typer.Argument(help="CSV or text file to load, or '-' to read from stdin"),
+    ],
+    table: Annotated[
+        str,
+        typer.Argument(help="Table to load into, optionally qualified by its schema"),
+    ],
+    dialect: Annotated[_core.SqlDialect, typer.Argument(help="SQL dialect to use")],
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            help="Dry run do not commit changes to the database",
+            envvar="MANUEL_DRY_RUN",
+        ),
+    ] = False,
+    dialect_args: Annotated[
+        Optional[str],
+        typer.Option(
+            help="""Dialect-specific arguments passed as JSON (e.g. '{"user": "postgres", ...}').
+            These may also be passed using environment variables prefixed with the dialect name in
+            uppercase and an underscore (e.g. 'POSTGRES_USER')"""
+        ),
+    ] = None,
+    format: Annotated[
+        _core.CopyFormat,
+        typer.Option(
+            help="Format of the data: comma-separated ('csv') or tab-separated ('text')",
+            case_sensitive=False,
+        ),
+    ] = "csv",
+    header: Annotated[
+        bool, typer.Option(help="Skip the first line of the file, which is a header")
+    ] = False,
+    delimiter: Annotated[
+        Optional[str],
+        typer.Option(help="Column delimiter, if it is not the default of the format"),
+    ] = None,
+    columns: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Comma-separated columns to load, in the order in which they appear in the file"
+        ),
+    ] = None,
+):
+    if dialect != _core.SqlDialect.POSTGRES:
+        raise typer.BadParameter("Bulk loading is only supported for postgres")
+    engine_config = _core.get_config(dialect)(
+        **json.loads(dialect_args) if dialect_args else {}
+    )
+    logger.info("Loading %s into %s", "stdin" if file == "-" else file, table)
+    with (
+        contextlib.nullcontext(sys.stdin.buffer)
+        if file == "-"
+        else _utils._path_valid(plb.Path(file).resolve()).open("rb")
+    ) as f:
+        _core.load_file(
+            f,
+            table=table,
+            dialect=dialect,
+            engine_config=engine_config,
+            dry_run=dry_run,
+            copy_format=format,
+            header=header,
+            delimiter=delimiter,
+            columns=(
+                [column.strip() for column in columns.split(",")] if columns else None
+            ),
+        )
+    logger.info("Load successful")
+
+
+@app.command(
+    name="serve",
+    help="Serve validate and run requests from clients that pass --server, keeping SQLFluff dialects, the validation cache and database engines warm between requests",
+)
+def _serve(
+    host: Annotated[
+        Optional[str],
+        typer.Option(
+            help=f"Listen on TCP on this host instead of on a Unix socket. Defaults to {_server.DEFAULT_HOST} if --port is passed. Requires a token in {_server.TOKEN_ENV}, which clients must also set"
+        ),
+    ] = None,
+    port: Annotated[
+        Optional[int],
+        typer.Option(
+            help=f"Listen on TCP on this port instead of on a Unix socket. Defaults to {_server.DEFAULT_PORT} if --host is passed",
+            min=0,
+        ),
+    ] = None,
+    socket: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Unix socket to listen on, which only the current user can connect to. Defaults to manuel-<uid>.sock in $XDG_RUNTIME_DIR, or in the temporary directory"
+        ),
+    ] = None,
+):
+    tcp = host is not None or port is not None
+    if tcp and socket is not None:
+        raise typer.BadParameter("--socket cannot be combined with --host or --port")
+    token = os.environ.get(_server.TOKEN_ENV) or None
+    if tcp and token is None:
+        raise typer.BadParameter(
+            f"--host and --port require a token in {_server.TOKEN_ENV}, since other users of the host can connect to a TCP port"
+        )
+    _server.serve(host=host, port=port, socket_path=socket, token=token)
+
+
+def _validate_on_server(
+    server: str,
+    paths: List[plb.Path],
+    dialect: _core.SqlDialect,
+    use_cache: bool,
+    lint: bool,
+) -> List[_core.ValidationResult]:
+    try:
+        response = _server.request(
+            server,
+            "validate",
+            {
+                "paths": _server.absolute_paths(paths),
+                "dialect": dialect.value,
+                "use_cache": use_cache,
+                "lint": lint,
+            },
+            token=os.environ.get(_server.TOKEN_ENV),
+        )
+    except _server.ServerError as e:
+        logger.error("%s", e)
+        raise typer.Exit(code=1)
+    return [
+        _core.ValidationResult(path=plb.Path(result["path"]), error=result["error"])
+        for result in response["results"]
+    ]
+
+
+def _run_on_server(server: str, payload: dict):
+    try:
+        with _timings.phase("server"):
+            response = _server.request(
+                server, "run", payload, token=os.environ.get(_server.TOKEN_ENV)
+            )
+    except _server.ServerError as e:
+        logger.error("%s", e)
+        raise typer.Exit(code=1)
+    for script in response["scripts"]:
+        if script["skipped"]:
+            logger.info("Skipped %s, which was applied before", script["name"])
+        else:
+            logger.info(
+                "Executed %s statement(s) of %s in %.3fs",
+                script["statements"],
+                script["name"],
+                script["duration"],
+            )
+
+
+def _write_timings(destination: str):
+    collector = _timings.stop()
+    if collector is not None:
+        collector.write(destination)
+
+
 def entrypoint():
     app()
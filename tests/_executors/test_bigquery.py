@@ -134,18 +134,17 @@ def test_bigquery_sql_executor_execute_sql(
     session.rollback()
 
 
-@mock.patch("manuel._executors.base.Session")
 def test_bigquery_sql_executor_run(
-    mock_session: mock.MagicMock,
     statement: str,
     bigquery_sql_executor: BigQuerySqlAlchemyExecutor,
     config: BigQuerySqlConfig,
 ):
     get_engine_mock = mock.MagicMock()
     execute_sql_mock = mock.MagicMock()
-    sqlalchemy_session_mock = mock.MagicMock()
-    # Add a mock to the return value of the mocked Session context manager return value
-    mock_session.return_value.__enter__.return_value = sqlalchemy_session_mock
+    sqlalchemy_connection_mock = mock.MagicMock()
+    # Add a mock to the connection that the mocked engine opens as a context manager
+    engine_mock = get_engine_mock.return_value.__enter__.return_value
+    engine_mock.connect.return_value.__enter__.return_value = sqlalchemy_connection_mock
     # Add mocks to these two methods, which are called in the run method
     # We have checked them above, so all we care about is that the arguments are
     # passed correctly.
@@ -155,4 +154,4 @@ def test_bigquery_sql_executor_run(
     get_engine_mock.assert_called_once_with(
         "bigquery://test-project&location=europe-west4?user_supplied_client=True"
     )
-    execute_sql_mock.assert_called_once_with(statement, sqlalchemy_session_mock)
+    execute_sql_mock.assert_called_once_with(statement, sqlalchemy_connection_mock)
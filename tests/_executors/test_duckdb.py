@@ -1,12 +1,16 @@
+import io
 import pathlib as plb
 from typing import Iterator
 from unittest import mock
 
+import duckdb
 import duckdb_engine
+import pyarrow.ipc
 import pytest
 from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import Session
 
+from manuel import _core
 from manuel._config import DuckdbSqlConfig
 from manuel._executors import DuckdbSqlAlchemyExecutor
 
@@ -144,18 +148,17 @@ def test_duckdb_sql_executor_execute_sql(
     session.rollback()
 
 
-@mock.patch("manuel._executors.base.Session")
 def test_duckdb_sql_executor_run(
-    mock_session: mock.MagicMock,
     statement: str,
     duckdb_sql_executor: DuckdbSqlAlchemyExecutor,
     config: DuckdbSqlConfig,
 ):
     get_engine_mock = mock.MagicMock()
     execute_sql_mock = mock.MagicMock()
-    sqlalchemy_session_mock = mock.MagicMock()
-    # Add a mock to the return value of the mocked Session context manager return value
-    mock_session.return_value.__enter__.return_value = sqlalchemy_session_mock
+    sqlalchemy_connection_mock = mock.MagicMock()
+    # Add a mock to the connection that the mocked engine opens as a context manager
+    engine_mock = get_engine_mock.return_value.__enter__.return_value
+    engine_mock.connect.return_value.__enter__.return_value = sqlalchemy_connection_mock
     # Add mocks to these two methods, which are called in the run method
     # We have checked them above, so all we care about is that the arguments are
     # passed correctly.
@@ -163,4 +166,137 @@ def test_duckdb_sql_executor_run(
     duckdb_sql_executor.execute_sql = execute_sql_mock
     duckdb_sql_executor.run(sql=statement, **config.model_dump())
     get_engine_mock.assert_called_once_with("duckdb:///%s" % config.database)
-    execute_sql_mock.assert_called_once_with(statement, sqlalchemy_session_mock)
+    execute_sql_mock.assert_called_once_with(statement, sqlalchemy_connection_mock)
+
+
+def test_duckdb_sql_executor_run_statements(tmp_path: plb.Path):
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    results = DuckdbSqlAlchemyExecutor().run(
+        sql=[
+            "CREATE TABLE test_table (id INTEGER)",
+            "INSERT INTO test_table VALUES (1), (2)",
+        ],
+        **config.model_dump(),
+    )
+    assert [result.index for result in results] == [0, 1]
+    assert all(result.duration >= 0 for result in results)
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (2,)
+
+
+def test_duckdb_sql_executor_run_pipelined_rolls_back_invalid_script(
+    tmp_path: plb.Path,
+):
+    script = tmp_path / "script.sql"
+    script.write_text(
+        "CREATE TABLE test_table (id INTEGER);\n"
+        "INSERT INTO test_table VALUES (1);\n"
+        "SELECT 1 FROM test_table WHERE;\n"
+    )
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    with pytest.raises(ValueError, match="In statement 2"):
+        DuckdbSqlAlchemyExecutor().run(
+            sql=_core.pipeline_sql(path=script, dialect=_core.SqlDialect.DUCKDB),
+            **config.model_dump(),
+        )
+    with duckdb.connect(config.database) as con:
+        assert con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = 'test_table'"
+        ).fetchone() == (0,)
+
+
+@pytest.mark.parametrize(
+    "transaction_scope,tables",
+    [(_core.TransactionScope.SCRIPT, 1), (_core.TransactionScope.SINGLE, 0)],
+)
+def test_duckdb_sql_executor_run_scripts(
+    tmp_path: plb.Path, transaction_scope: _core.TransactionScope, tables: int
+):
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    executor = DuckdbSqlAlchemyExecutor()
+    with mock.patch.object(
+        executor, "get_engine", wraps=executor.get_engine
+    ) as get_engine:
+        with pytest.raises(Exception, match="does not exist"):
+            executor.run_scripts(
+                [
+                    ("01.sql", ["CREATE TABLE test_table (id INTEGER)"]),
+                    ("02.sql", ["INSERT INTO missing_table VALUES (1)"]),
+                ],
+                transaction_scope=transaction_scope,
+                **config.model_dump(),
+            )
+    get_engine.assert_called_once()
+    with duckdb.connect(config.database) as con:
+        assert con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = 'test_table'"
+        ).fetchone() == (tables,)
+
+
+def test_duckdb_sql_executor_run_graph(tmp_path: plb.Path):
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    executor = DuckdbSqlAlchemyExecutor(engine_options={"pool_size": 2})
+    results, graph = executor.run_graph(
+        {
+            "01.sql": ["CREATE TABLE a (id INTEGER)"],
+            "02.sql": ["CREATE TABLE b (id INTEGER)"],
+            "03.sql": ["INSERT INTO a SELECT 1 FROM b UNION ALL SELECT 2"],
+        },
+        dependencies={"01.sql": [], "02.sql": [], "03.sql": ["01.sql", "02.sql"]},
+        max_workers=2,
+        **config.model_dump(),
+    )
+    assert [result.name for result in results] == ["01.sql", "02.sql", "03.sql"]
+    assert graph.critical_path[-1] == "03.sql"
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM a").fetchone() == (1,)
+
+
+def test_duckdb_sql_executor_query(tmp_path: plb.Path):
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    output = io.StringIO()
+    result = DuckdbSqlAlchemyExecutor().query(
+        ["SELECT range AS id, 'x' AS name FROM range(3)"],
+        output=output,
+        output_format=_core.OutputFormat.JSONL,
+        batch_size=2,
+        **config.model_dump(),
+    )
+    assert result.rows == 3
+    assert output.getvalue().splitlines()[0] == '{"id": 0, "name": "x"}'
+
+
+def test_duckdb_sql_executor_query_arrow(tmp_path: plb.Path):
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    output = io.BytesIO()
+    result = DuckdbSqlAlchemyExecutor().query(
+        [
+            "CREATE TABLE test_table AS SELECT range AS id FROM range(3)",
+            "SELECT id FROM test_table",
+        ],
+        output=output,
+        output_format=_core.OutputFormat.ARROW,
+        **config.model_dump(),
+    )
+    assert result.rows == 3
+    output.seek(0)
+    assert pyarrow.ipc.open_file(output).read_all().num_rows == 3
+
+
+def test_duckdb_sql_executor_autocommit(tmp_path: plb.Path):
+    # duckdb_engine has no autocommit mode, so every statement is committed explicitly
+    config = DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+    executor = DuckdbSqlAlchemyExecutor(
+        transaction_strategy=_core.TransactionStrategy.AUTOCOMMIT
+    )
+    with pytest.raises(Exception):
+        executor.run(
+            sql=[
+                "CREATE TABLE test_table (id INTEGER)",
+                "INSERT INTO test_table VALUES (1)",
+                "INSERT INTO missing_table VALUES (2)",
+            ],
+            **config.model_dump(),
+        )
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (1,)
@@ -0,0 +1,109 @@
+import asyncio
+import pathlib as plb
+
+import duckdb
+import pytest
+
+from manuel import _core
+from manuel._config import DuckdbSqlConfig
+from manuel._executors import DuckdbAsyncExecutor
+
+
+@pytest.fixture
+def config(tmp_path: plb.Path) -> DuckdbSqlConfig:
+    return DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+
+
+def _count(database: str, table: str) -> int:
+    with duckdb.connect(database) as con:
+        return con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = ?",
+            [table],
+        ).fetchone()[0]
+
+
+def test_get_async_executor():
+    assert _core.get_async_executor(_core.SqlDialect.DUCKDB) is DuckdbAsyncExecutor
+    with pytest.raises(ValueError, match="bigquery"):
+        _core.get_async_executor(_core.SqlDialect.BIGQUERY)
+
+
+def test_duckdb_async_executor_run(config: DuckdbSqlConfig):
+    results = asyncio.run(
+        DuckdbAsyncExecutor().run(
+            sql=[
+                "CREATE TABLE test_table (id INTEGER)",
+                "INSERT INTO test_table VALUES (1), (2)",
+            ],
+            **config.model_dump(),
+        )
+    )
+    assert [result.index for result in results] == [0, 1]
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (2,)
+
+
+def test_duckdb_async_executor_dry_run(config: DuckdbSqlConfig):
+    asyncio.run(
+        DuckdbAsyncExecutor(dry_run=True).run(
+            sql=["CREATE TABLE test_table (id INTEGER)"], **config.model_dump()
+        )
+    )
+    assert _count(config.database, "test_table") == 0
+
+
+def test_duckdb_async_executor_rolls_back_failed_script(config: DuckdbSqlConfig):
+    with pytest.raises(duckdb.CatalogException):
+        asyncio.run(
+            DuckdbAsyncExecutor().run_scripts(
+                [
+                    ("01.sql", ["CREATE TABLE test_table (id INTEGER)"]),
+                    ("02.sql", ["SELECT * FROM missing"]),
+                ],
+                transaction_scope=_core.TransactionScope.SINGLE,
+                **config.model_dump(),
+            )
+        )
+    assert _count(config.database, "test_table") == 0
+
+
+def test_duckdb_async_executor_run_concurrently(config: DuckdbSqlConfig):
+    scripts = {
+        f"{i:02}.sql": [f"CREATE TABLE table_{i} AS SELECT range AS id FROM range({i})"]
+        for i in range(20)
+    }
+
+    async def run_targets():
+        # Several databases are driven from the same event loop
+        return await asyncio.gather(
+            DuckdbAsyncExecutor().run_concurrently(
+                scripts, max_concurrency=4, **config.model_dump()
+            ),
+            DuckdbAsyncExecutor().run_concurrently(
+                scripts,
+                max_concurrency=4,
+                **DuckdbSqlConfig(database=":memory:").model_dump(),
+            ),
+        )
+
+    results, in_memory = asyncio.run(run_targets())
+    assert [result.name for result in results] == list(scripts)
+    assert [result.name for result in in_memory] == list(scripts)
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM table_19").fetchone() == (19,)
+
+
+def test_duckdb_async_executor_run_concurrently_cancels_on_error(
+    config: DuckdbSqlConfig,
+):
+    scripts = {
+        "01.sql": ["SELECT * FROM missing"],
+        "02.sql": ["CREATE TABLE test_table (id INTEGER)"],
+    }
+    with pytest.raises(duckdb.CatalogException):
+        asyncio.run(
+            DuckdbAsyncExecutor().run_concurrently(
+                scripts, max_concurrency=1, **config.model_dump()
+            )
+        )
+    assert _count(config.database, "test_table") == 0
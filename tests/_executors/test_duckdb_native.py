@@ -0,0 +1,330 @@
+import io
+import pathlib as plb
+import re
+
+import duckdb
+import pyarrow.parquet
+import pytest
+
+from manuel import _core, _journal, _ledger
+from manuel._config import DuckdbAccessMode, DuckdbSqlConfig
+from manuel._executors import DuckdbNativeExecutor
+from manuel._executors.runner import Plan
+
+
+@pytest.fixture
+def config(tmp_path: plb.Path) -> DuckdbSqlConfig:
+    return DuckdbSqlConfig(database=str(tmp_path / "test.db"))
+
+
+def _count_tables(database: str) -> int:
+    with duckdb.connect(database) as con:
+        return con.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_name = 'test_table'"
+        ).fetchone()[0]
+
+
+def test_duckdb_native_executor_get_config():
+    config = DuckdbNativeExecutor.get_config(
+        access_mode=DuckdbAccessMode.READ_ONLY, allow_community_extensions=False
+    )
+    assert config == {"access_mode": "read_only", "allow_community_extensions": False}
+
+
+def test_duckdb_native_executor_run(config: DuckdbSqlConfig):
+    results = DuckdbNativeExecutor().run(
+        sql=[
+            "CREATE TABLE test_table (id INTEGER)",
+            "INSERT INTO test_table VALUES (1), (2)",
+        ],
+        **config.model_dump(),
+    )
+    assert [result.index for result in results] == [0, 1]
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (2,)
+
+
+def test_duckdb_native_executor_run_multiple_statements(config: DuckdbSqlConfig):
+    (result,) = DuckdbNativeExecutor().run(
+        sql="CREATE TABLE test_table (id INTEGER); INSERT INTO test_table VALUES (1);",
+        **config.model_dump(),
+    )
+    assert result.index == 0
+    assert _count_tables(config.database) == 1
+
+
+def test_duckdb_native_executor_dry_run(config: DuckdbSqlConfig):
+    DuckdbNativeExecutor(dry_run=True).run(
+        sql=["CREATE TABLE test_table (id INTEGER)"], **config.model_dump()
+    )
+    assert _count_tables(config.database) == 0
+
+
+def test_duckdb_native_executor_rolls_back_failed_script(config: DuckdbSqlConfig):
+    with pytest.raises(duckdb.CatalogException):
+        DuckdbNativeExecutor().run_scripts(
+            [
+                ("01.sql", ["CREATE TABLE test_table (id INTEGER)"]),
+                (
+                    "02.sql",
+                    ["CREATE TABLE other_table (id INTEGER)", "SELECT * FROM missing"],
+                ),
+            ],
+            transaction_scope=_core.TransactionScope.SINGLE,
+            **config.model_dump(),
+        )
+    assert _count_tables(config.database) == 0
+
+
+def test_duckdb_native_executor_run_graph_in_memory():
+    config = DuckdbSqlConfig(database=":memory:")
+    results, _ = DuckdbNativeExecutor().run_graph(
+        {
+            "01.sql": ["CREATE TABLE a (id INTEGER)"],
+            "02.sql": ["CREATE TABLE b (id INTEGER)"],
+            # Only sees the tables of the other scripts if all sessions share the
+            #  in-memory database
+            "03.sql": ["INSERT INTO a SELECT * FROM b"],
+        },
+        dependencies={"01.sql": [], "02.sql": [], "03.sql": ["01.sql", "02.sql"]},
+        max_workers=2,
+        **config.model_dump(),
+    )
+    assert [result.name for result in results] == ["01.sql", "02.sql", "03.sql"]
+
+
+def test_get_executor_duckdb():
+    assert _core.get_executor(_core.SqlDialect.DUCKDB) is DuckdbNativeExecutor
+    assert _core.get_executor(_core.SqlDialect.MOTHERDUCK).__name__ == (
+        "MotherduckSqlAlchemyExecutor"
+    )
+
+
+def test_duckdb_native_executor_query(config: DuckdbSqlConfig):
+    output = io.StringIO()
+    result = DuckdbNativeExecutor().query(
+        [
+            "CREATE TEMPORARY TABLE test_table AS SELECT range AS id FROM range(5)",
+            "SELECT id FROM test_table WHERE id > 1 ORDER BY id",
+        ],
+        output=output,
+        batch_size=2,
+        **config.model_dump(),
+    )
+    assert result.rows == 3
+    assert len(result.statements) == 1
+    assert output.getvalue().splitlines() == ["id", "2", "3", "4"]
+
+
+def test_duckdb_native_executor_query_parquet(config: DuckdbSqlConfig):
+    output = io.BytesIO()
+    result = DuckdbNativeExecutor().query(
+        ["SELECT range AS id FROM range(5)"],
+        output=output,
+        output_format=_core.OutputFormat.PARQUET,
+        batch_size=2,
+        **config.model_dump(),
+    )
+    assert result.rows == 5
+    output.seek(0)
+    assert pyarrow.parquet.read_table(output).column("id").to_pylist() == [
+        0,
+        1,
+        2,
+        3,
+        4,
+    ]
+
+
+def test_duckdb_native_executor_plan_dry_run(config: DuckdbSqlConfig):
+    with duckdb.connect(config.database) as con:
+        con.execute("CREATE TABLE test_table AS SELECT range AS id FROM range(100)")
+    executor = DuckdbNativeExecutor(dry_run=True, dry_run_mode=_core.DryRunMode.PLAN)
+    results = executor.run(
+        sql=[
+            "DELETE FROM test_table",
+            "SELECT * FROM missing_table",
+            "UPDATE test_table SET id = id + 1",
+        ],
+        **config.model_dump(),
+    )
+    assert results[0].plan == Plan(rows=100)
+    assert "missing_table" in results[1].plan.error
+    # Planning continues in a new transaction after a statement failed
+    assert results[2].plan.error is None
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (100,)
+
+
+def test_duckdb_native_executor_plan_skips_unexplainable(config: DuckdbSqlConfig):
+    executor = DuckdbNativeExecutor(dry_run=True, dry_run_mode=_core.DryRunMode.PLAN)
+    executor.explainable_statements = re.compile("SELECT", re.IGNORECASE)
+    results = executor.run(
+        sql=["CREATE TABLE test_table (id INTEGER)", "-- Comment\nselect 1"],
+        **config.model_dump(),
+    )
+    assert results[0].plan is None
+    assert results[1].plan == Plan(rows=1)
+
+
+@pytest.mark.parametrize("journal_type", ["file", "table"])
+def test_duckdb_native_executor_resume(
+    config: DuckdbSqlConfig, tmp_path: plb.Path, journal_type: str
+):
+    def journal():
+        if journal_type == "file":
+            return _journal.FileJournal(tmp_path / "journal.jsonl")
+        return _journal.TableJournal()
+
+    statements = [
+        "CREATE TABLE test_table (id INTEGER)",
+        "INSERT INTO test_table VALUES (1)",
+        "INSERT INTO test_table VALUES (1)",
+        "INSERT INTO missing_table VALUES (2)",
+        "INSERT INTO test_table VALUES (3)",
+    ]
+    executor = DuckdbNativeExecutor(
+        journal=journal(),
+        transaction_strategy=_core.TransactionStrategy.BATCHED,
+        commit_every=2,
+    )
+    with pytest.raises(duckdb.CatalogException):
+        executor.run(sql=statements, **config.model_dump())
+    # Only the first two statements were committed
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT id FROM test_table").fetchall() == [(1,)]
+
+    statements[3] = "INSERT INTO test_table VALUES (2)"
+    results = DuckdbNativeExecutor(journal=journal(), resume=True).run(
+        sql=statements, **config.model_dump()
+    )
+    assert [result.index for result in results] == [2, 3, 4]
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT id FROM test_table ORDER BY id").fetchall() == [
+            (1,),
+            (1,),
+            (2,),
+            (3,),
+        ]
+
+
+def test_duckdb_native_executor_ledger(config: DuckdbSqlConfig, tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("INSERT INTO test_table VALUES (1)")
+    scripts = [(str(script), ["INSERT INTO test_table VALUES (1)"])]
+    with duckdb.connect(config.database) as con:
+        con.execute("CREATE TABLE test_table (id INTEGER)")
+
+    def run(**kwargs):
+        ledger = _ledger.Ledger(dialect="duckdb")
+        return DuckdbNativeExecutor(ledger=ledger, **kwargs).run_scripts(
+            scripts, **config.model_dump()
+        )
+
+    # Dry runs neither create nor fill the ledger
+    assert not run(dry_run=True)[0].skipped
+    assert not run()[0].skipped
+    assert run()[0].skipped
+    assert not run(force=True)[0].skipped
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (2,)
+        assert (
+            con.execute("SELECT script, dialect FROM manuel_ledger").fetchall()
+            == [(str(script), "duckdb")] * 2
+        )
+
+
+def test_duckdb_native_executor_ledger_skips_copies(
+    config: DuckdbSqlConfig, tmp_path: plb.Path
+):
+    scripts = [
+        (name, ["CREATE TABLE test_table (id INTEGER)"]) for name in ("a.sql", "b.sql")
+    ]
+    ledger = _ledger.Ledger(dialect="duckdb")
+    results = DuckdbNativeExecutor(ledger=ledger).run_scripts(
+        scripts, **config.model_dump()
+    )
+    # Both scripts have the same content, so the second one is already applied
+    assert [result.skipped for result in results] == [False, True]
+
+
+@pytest.mark.parametrize(
+    "strategy, kwargs, committed",
+    [
+        (_core.TransactionStrategy.SINGLE, {}, 0),
+        (_core.TransactionStrategy.AUTOCOMMIT, {}, 3),
+        (_core.TransactionStrategy.BATCHED, {"commit_every": 2}, 2),
+        (_core.TransactionStrategy.BATCHED, {"commit_interval": 0.0}, 3),
+    ],
+)
+def test_duckdb_native_executor_transaction_strategy(
+    config: DuckdbSqlConfig,
+    strategy: _core.TransactionStrategy,
+    kwargs: dict,
+    committed: int,
+):
+    with duckdb.connect(config.database) as con:
+        con.execute("CREATE TABLE test_table (id INTEGER)")
+    executor = DuckdbNativeExecutor(transaction_strategy=strategy, **kwargs)
+    with pytest.raises(duckdb.CatalogException):
+        executor.run(
+            sql=[
+                "INSERT INTO test_table VALUES (1)",
+                "INSERT INTO test_table VALUES (2)",
+                "INSERT INTO test_table VALUES (3)",
+                "INSERT INTO missing_table VALUES (4)",
+            ],
+            **config.model_dump(),
+        )
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (committed,)
+
+
+def test_duckdb_native_executor_transaction_strategy_dry_run():
+    with pytest.raises(ValueError, match="single transaction strategy"):
+        DuckdbNativeExecutor(
+            dry_run=True, transaction_strategy=_core.TransactionStrategy.AUTOCOMMIT
+        )
+
+
+@pytest.mark.parametrize("dry_run", [False, True])
+def test_duckdb_native_executor_no_transaction(config: DuckdbSqlConfig, dry_run: bool):
+    with duckdb.connect(config.database) as con:
+        con.execute("CREATE TABLE test_table (id INTEGER)")
+    with pytest.raises(duckdb.CatalogException):
+        DuckdbNativeExecutor(dry_run=dry_run).run(
+            sql=[
+                "INSERT INTO test_table VALUES (1)",
+                "-- manuel:no-transaction\nCHECKPOINT",
+                "INSERT INTO test_table VALUES (2)",
+                "INSERT INTO missing_table VALUES (3)",
+            ],
+            **config.model_dump(),
+        )
+    # The statements before the annotated statement were committed, unless dry run
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT id FROM test_table").fetchall() == (
+            [] if dry_run else [(1,)]
+        )
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_duckdb_native_executor_no_transaction_single_scope(
+    config: DuckdbSqlConfig, lazy: bool
+):
+    with duckdb.connect(config.database) as con:
+        con.execute("CREATE TABLE test_table (id INTEGER)")
+    statements = [
+        "INSERT INTO test_table VALUES (1)",
+        "-- manuel:no-transaction\nCHECKPOINT",
+    ]
+    scripts = [("a.sql", iter(statements) if lazy else statements)]
+    with pytest.raises(ValueError, match="Statement 1 of a.sql cannot run"):
+        DuckdbNativeExecutor().run_scripts(
+            scripts,
+            transaction_scope=_core.TransactionScope.SINGLE,
+            **config.model_dump(),
+        )
+    # Nothing was committed, since the single transaction was never committed
+    with duckdb.connect(config.database) as con:
+        assert con.execute("SELECT id FROM test_table").fetchall() == []
@@ -72,18 +72,17 @@ def test_motherduck_executor(
         assert isinstance(engine.dialect, duckdb_engine.Dialect)
 
 
-@mock.patch("manuel._executors.base.Session")
 def test_motherduck_sql_executor_run(
-    mock_session: mock.MagicMock,
     statement: str,
     motherduck_sql_executor: MotherduckSqlAlchemyExecutor,
     config: MotherduckSqlConfig,
 ):
     get_engine_mock = mock.MagicMock()
     execute_sql_mock = mock.MagicMock()
-    sqlalchemy_session_mock = mock.MagicMock()
-    # Add a mock to the return value of the mocked Session context manager return value
-    mock_session.return_value.__enter__.return_value = sqlalchemy_session_mock
+    sqlalchemy_connection_mock = mock.MagicMock()
+    # Add a mock to the connection that the mocked engine opens as a context manager
+    engine_mock = get_engine_mock.return_value.__enter__.return_value
+    engine_mock.connect.return_value.__enter__.return_value = sqlalchemy_connection_mock
     # Add mocks to these two methods, which are called in the run method
     # We have checked them above, so all we care about is that the arguments are
     # passed correctly.
@@ -91,4 +90,4 @@ def test_motherduck_sql_executor_run(
     motherduck_sql_executor.execute_sql = execute_sql_mock
     motherduck_sql_executor.run(sql=statement, **config.model_dump())
     get_engine_mock.assert_called_once_with("duckdb:///md:%s" % config.database)
-    execute_sql_mock.assert_called_once_with(statement, sqlalchemy_session_mock)
+    execute_sql_mock.assert_called_once_with(statement, sqlalchemy_connection_mock)
@@ -0,0 +1,77 @@
+from unittest import mock
+
+import pytest
+
+from manuel import _core
+from manuel._executors import PostgresPipelineExecutor
+
+
+@pytest.fixture
+def session() -> mock.MagicMock:
+    session = mock.MagicMock()
+    cursor = session.connection.dbapi_connection.cursor.return_value
+    cursor.rowcount = 1
+    return session
+
+
+def _pipelined(session: mock.MagicMock):
+    cursor = session.connection.dbapi_connection.cursor.return_value
+    return [call.args[0] for call in cursor.execute.call_args_list]
+
+
+def test_get_pipeline_executor():
+    executor = _core.get_executor(_core.SqlDialect.POSTGRES, pipelined=True)
+    assert executor is PostgresPipelineExecutor
+    with pytest.raises(ValueError, match="duckdb"):
+        _core.get_executor(_core.SqlDialect.DUCKDB, pipelined=True)
+
+
+def test_pipeline_executor_groups_statements(session: mock.MagicMock):
+    executor = PostgresPipelineExecutor(pipeline_depth=3, insert_batch_size=2)
+    executor.execute_sql = mock.MagicMock()
+    result = executor.run_script(
+        "script.sql",
+        [
+            "INSERT INTO t VALUES (1)",
+            "INSERT INTO t VALUES (2)",
+            "UPDATE t SET a = 1",
+            "CREATE INDEX CONCURRENTLY i ON t (a)",
+            "DELETE FROM t",
+        ],
+        session,
+    )
+    # The INSERTs are merged within the pipeline, and the statement that cannot run
+    #  in a transaction is executed on its own
+    assert _pipelined(session) == [
+        "INSERT INTO t VALUES (1), (2)",
+        "UPDATE t SET a = 1",
+    ]
+    assert [call.args[0] for call in executor.execute_sql.call_args_list] == [
+        "CREATE INDEX CONCURRENTLY i ON t (a)",
+        "DELETE FROM t",
+    ]
+    assert [r.index for r in result.statements] == [0, 1, 2, 3, 4]
+    session.begin_nested.assert_called_once()
+
+
+def test_pipeline_executor_replays_failed_pipeline(session: mock.MagicMock):
+    executor = PostgresPipelineExecutor(pipeline_depth=10)
+    executor.execute_sql = mock.MagicMock(side_effect=[None, RuntimeError("2")])
+    pipeline = session.connection.dbapi_connection.pipeline.return_value
+    pipeline.__exit__.side_effect = RuntimeError("pipeline")
+    statements = ["UPDATE t SET a = 1", "UPDATE t SET a = 'x'", "DELETE FROM t"]
+    with pytest.raises(RuntimeError, match="2"):
+        executor.run_script("script.sql", statements, session)
+    assert [call.args[0] for call in executor.execute_sql.call_args_list] == (
+        statements[:2]
+    )
+
+
+def test_pipeline_executor_respects_commit_every():
+    executor = PostgresPipelineExecutor(
+        pipeline_depth=10,
+        transaction_strategy=_core.TransactionStrategy.BATCHED,
+        commit_every=2,
+    )
+    groups = executor.group_statements(["SELECT 1", "SELECT 2", "SELECT 3"])
+    assert [len(group) for group in groups] == [2, 1]
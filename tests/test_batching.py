@@ -0,0 +1,116 @@
+from unittest import mock
+
+import pytest
+
+from manuel import _batching
+from manuel._executors import DuckdbSqlAlchemyExecutor
+
+
+@pytest.mark.parametrize(
+    "statement,batched",
+    [
+        ("INSERT INTO t VALUES (1, 'a', NULL)", True),
+        ("insert into s.t (a, b) values (-1.5e3, DATE '2024-01-01');", True),
+        ("INSERT INTO t VALUES ('it''s'::text, E'a', TRUE, DEFAULT)", True),
+        ("INSERT INTO t VALUES ((SELECT max(a) FROM t))", False),
+        ("INSERT INTO t VALUES (now())", False),
+        ("INSERT INTO t VALUES (1) ON CONFLICT DO NOTHING", False),
+        ("INSERT INTO t VALUES (1) RETURNING a", False),
+        ("INSERT INTO t VALUES (1), (2)", False),
+        ("INSERT INTO t VALUES ('a\\'')", False),
+        ("INSERT INTO t SELECT 1", False),
+        ("UPDATE t SET a = 1", False),
+    ],
+)
+def test_parse_insert(statement: str, batched: bool):
+    assert (_batching._parse_insert(statement) is not None) == batched
+
+
+def test_group_inserts():
+    statements = [
+        "INSERT INTO t (a) VALUES (1)",
+        "INSERT INTO t (a) VALUES (2)",
+        "INSERT INTO t (a) VALUES (3)",
+        "INSERT INTO t (b) VALUES (4)",
+        "UPDATE t SET a = 5",
+        "INSERT INTO t (b) VALUES (6)",
+    ]
+    assert list(_batching.group_inserts(statements, batch_size=2)) == [
+        statements[0:2],
+        statements[2:3],
+        statements[3:4],
+        statements[4:5],
+        statements[5:6],
+    ]
+    assert list(_batching.group_inserts(statements, batch_size=1)) == [
+        [statement] for statement in statements
+    ]
+
+
+def test_merge_inserts():
+    assert (
+        _batching.merge_inserts(
+            [
+                "INSERT INTO t (a, b)\nVALUES (1, 'x');",
+                "insert into t (a, b) values (2, 'y')",
+            ]
+        )
+        == "INSERT INTO t (a, b)\nVALUES (1, 'x'), (2, 'y')"
+    )
+
+
+@pytest.fixture
+def executor() -> DuckdbSqlAlchemyExecutor:
+    executor = DuckdbSqlAlchemyExecutor(insert_batch_size=2)
+    executor.supports_savepoints = True
+    executor.execute_sql = mock.MagicMock()
+    return executor
+
+
+def test_execute_batch(executor: DuckdbSqlAlchemyExecutor):
+    executor.execute_sql.return_value.rowcount = 2
+    session = mock.MagicMock()
+    result = executor.run_script(
+        "script.sql",
+        [
+            "INSERT INTO t VALUES (1)",
+            "INSERT INTO t VALUES (2)",
+            "INSERT INTO t VALUES (3)",
+        ],
+        session,
+    )
+    assert [call.args[0] for call in executor.execute_sql.call_args_list] == [
+        "INSERT INTO t VALUES (1), (2)",
+        "INSERT INTO t VALUES (3)",
+    ]
+    assert [r.index for r in result.statements] == [0, 1, 2]
+    assert [r.rowcount for r in result.statements[:2]] == [1, 1]
+    session.begin_nested.assert_called_once()
+
+
+def test_execute_batch_replays_failed_batch(executor: DuckdbSqlAlchemyExecutor):
+    executor.execute_sql.side_effect = [RuntimeError("batch"), None, RuntimeError("2")]
+    statements = ["INSERT INTO t VALUES (1)", "INSERT INTO t VALUES ('x')"]
+    with pytest.raises(RuntimeError, match="2"):
+        executor.run_script("script.sql", statements, mock.MagicMock())
+    assert [call.args[0] for call in executor.execute_sql.call_args_list[1:]] == (
+        statements
+    )
+
+
+def test_group_consecutive():
+    statements = ["SELECT 1", "SELECT 2", "SELECT 3", "VACUUM", "SELECT 4"]
+    groups = _batching.group_consecutive(
+        statements, group_size=2, isolate=lambda statement: statement == "VACUUM"
+    )
+    assert list(groups) == [
+        statements[0:2],
+        statements[2:3],
+        statements[3:4],
+        statements[4:5],
+    ]
+
+
+def test_pipelining_requires_support():
+    with pytest.raises(ValueError, match="does not support pipelining"):
+        DuckdbSqlAlchemyExecutor(pipeline_depth=10)
@@ -0,0 +1,100 @@
+import pathlib as plb
+from unittest import mock
+
+import pytest
+
+from manuel import _cache, _parser
+
+
+@pytest.fixture
+def cache(tmp_path: plb.Path) -> _cache.ValidationCache:
+    return _cache.ValidationCache(directory=tmp_path / "cache")
+
+
+def test_validation_cache_miss(cache: _cache.ValidationCache):
+    assert cache.get("SELECT 1", "postgres", "parse") is None
+
+
+def test_validation_cache_hit(cache: _cache.ValidationCache):
+    cache.put("SELECT 1", "postgres", "parse")
+    assert cache.get("SELECT 1", "postgres", "parse") == {
+        "dialect": "postgres",
+        "mode": "parse",
+    }
+
+
+def test_validation_cache_key_depends_on_dialect_and_content():
+    assert _cache.ValidationCache.key(
+        "SELECT 1", "postgres", "parse"
+    ) != _cache.ValidationCache.key("SELECT 1", "duckdb", "parse")
+    assert _cache.ValidationCache.key(
+        "SELECT 1", "postgres", "parse"
+    ) != _cache.ValidationCache.key("SELECT 2", "postgres", "parse")
+
+
+def test_validation_cache_key_depends_on_mode():
+    assert _cache.ValidationCache.key(
+        "SELECT 1", "postgres", "parse"
+    ) != _cache.ValidationCache.key("SELECT 1", "postgres", "lint")
+
+
+def test_validation_cache_key_depends_on_sqlfluff_version():
+    key = _cache.ValidationCache.key("SELECT 1", "postgres", "parse")
+    with mock.patch("manuel._cache._SQLFLUFF_VERSION", "0.0.1"):
+        assert _cache.ValidationCache.key("SELECT 1", "postgres", "parse") != key
+
+
+def test_validation_cache_key_depends_on_format_version():
+    key = _cache.ValidationCache.key("SELECT 1", "postgres", "parse")
+    with mock.patch("manuel._cache.CACHE_FORMAT_VERSION", "0"):
+        assert _cache.ValidationCache.key("SELECT 1", "postgres", "parse") != key
+
+
+def test_validation_cache_evicts_least_recently_used(tmp_path: plb.Path):
+    cache = _cache.ValidationCache(directory=tmp_path / "cache", max_bytes=0)
+    cache.put("SELECT 1", "postgres", "parse")
+    assert cache.get("SELECT 1", "postgres", "parse") is None
+
+
+def test_validation_cache_scans_only_when_over_limit(
+    cache: _cache.ValidationCache,
+):
+    with mock.patch.object(
+        _cache.ValidationCache, "_entries", wraps=cache._entries
+    ) as entries:
+        for index in range(10):
+            cache.put(f"SELECT {index}", "postgres", "parse")
+    # The size of the directory is only scanned on the first write
+    assert entries.call_count == 1
+    cache.max_bytes = 0
+    cache.put("SELECT 10", "postgres", "parse")
+    assert cache.get("SELECT 10", "postgres", "parse") is None
+
+
+def test_sql_parser_validate_skips_lint_on_cache_hit(
+    cache: _cache.ValidationCache,
+):
+    _parser.SqlParser(sql="SELECT 1", dialect="postgres").validate(cache=cache)
+    with mock.patch("manuel._parser._get_linter") as mock_linter:
+        _parser.SqlParser(sql="SELECT 1", dialect="postgres").validate(cache=cache)
+    mock_linter.assert_not_called()
+
+
+def test_sql_parser_validate_does_not_cache_invalid_sql(
+    cache: _cache.ValidationCache,
+):
+    with pytest.raises(ValueError, match="SQL statement is not valid"):
+        _parser.SqlParser(sql="SELECT 1 WHERE", dialect="postgres").validate(
+            cache=cache
+        )
+    assert cache.get("SELECT 1 WHERE", "postgres", "parse") is None
+
+
+def test_sql_parser_statements_from_cache(cache: _cache.ValidationCache):
+    sql = "SELECT 1; SELECT 2;"
+    _parser.SqlParser(sql=sql, dialect="postgres").validate(cache=cache)
+    parser = _parser.SqlParser(sql=sql, dialect="postgres")
+    with mock.patch("manuel._parser._get_linter") as mock_linter:
+        parser.validate(cache=cache)
+    mock_linter.assert_not_called()
+    assert parser.statements == ["SELECT 1", "SELECT 2"]
@@ -1,3 +1,4 @@
+import json
 import os
 import pathlib as plb
 from unittest import mock
@@ -5,6 +6,7 @@ from unittest import mock
 import pytest
 from typer.testing import CliRunner
 
+from manuel import _core
 from manuel.cli import app
 
 runner = CliRunner()
@@ -62,8 +64,10 @@ executor_map = {
 }
 
 
-@pytest.mark.parametrize("dialect", ["postgres", "bigquery", "databricks"])
-@mock.patch("manuel.cli._core.run_sql")
+@pytest.mark.parametrize(
+    "dialect", ["postgres", "bigquery", "databricks", "duckdb", "motherduck"]
+)
+@mock.patch("manuel.cli._core.run_scripts")
 @mock.patch("manuel.cli._core.parse_sql")
 def test_run_cmd_with_dialect_args(
     mock_parse_sql: mock.MagicMock,
@@ -87,8 +91,10 @@ def test_run_cmd_with_dialect_args(
     assert 1 == 1
 
 
-@pytest.mark.parametrize("dialect", ["postgres", "bigquery", "databricks"])
-@mock.patch("manuel.cli._core.run_sql")
+@pytest.mark.parametrize(
+    "dialect", ["postgres", "bigquery", "databricks", "duckdb", "motherduck"]
+)
+@mock.patch("manuel.cli._core.run_scripts")
 @mock.patch("manuel.cli._core.parse_sql")
 def test_run_cmd_with_env_vars(
     mock_parse_sql: mock.MagicMock,
@@ -112,8 +118,10 @@ def test_run_cmd_with_env_vars(
     assert result.exit_code == 0
 
 
-@pytest.mark.parametrize("dialect", ["postgres", "bigquery", "databricks"])
-@mock.patch("manuel.cli._core.run_sql")
+@pytest.mark.parametrize(
+    "dialect", ["postgres", "bigquery", "databricks", "duckdb", "motherduck"]
+)
+@mock.patch("manuel.cli._core.run_scripts")
 @mock.patch("manuel.cli._core.parse_sql")
 def test_run_cmd_fails_without_env_vars_or_dialect_args(
     mock_parse_sql: mock.MagicMock,
@@ -128,3 +136,380 @@ def test_run_cmd_fails_without_env_vars_or_dialect_args(
         ["run", str(script), dialect],
     )
     assert result.exit_code == 1
+
+
+@pytest.mark.parametrize("flag,use_cache", [([], True), (["--no-cache"], False)])
+@mock.patch("manuel.cli._core.validate_files", return_value=[])
+def test_validate_cmd_no_cache(
+    mock_validate_files: mock.MagicMock,
+    tmp_path: plb.Path,
+    flag: list,
+    use_cache: bool,
+):
+    script = tmp_path / "script.sql"
+    script.touch()
+    result = runner.invoke(app, ["validate", str(script), *flag])
+    assert result.exit_code == 0
+    assert mock_validate_files.call_args.kwargs["use_cache"] is use_cache
+
+
+def test_validate_cmd_multiple_paths(tmp_path: plb.Path):
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "valid.sql").write_text("SELECT 1;")
+    (tmp_path / "other.sql").write_text("SELECT 2;")
+    result = runner.invoke(
+        app,
+        [
+            "validate",
+            str(tmp_path / "scripts"),
+            str(tmp_path / "other.sql"),
+            "--no-cache",
+        ],
+    )
+    assert result.exit_code == 0
+
+
+def test_validate_cmd_fails_if_any_file_invalid(tmp_path: plb.Path):
+    (tmp_path / "valid.sql").write_text("SELECT 1;")
+    (tmp_path / "invalid.sql").write_text("SELECT 1 WHERE;")
+    result = runner.invoke(
+        app, ["validate", str(tmp_path / "*.sql"), "--no-cache", "--workers", "2"]
+    )
+    assert result.exit_code == 1
+
+
+@pytest.mark.parametrize(
+    "flag,reader",
+    [([], "parse_sql"), (["--stream"], "stream_sql"), (["--pipeline"], "pipeline_sql")],
+)
+@mock.patch("manuel.cli._core.run_scripts")
+def test_run_cmd_statement_reader(
+    mock_run_scripts: mock.MagicMock, tmp_path: plb.Path, flag: list, reader: str
+):
+    script = tmp_path / "script.sql"
+    script.touch()
+    with mock.patch(f"manuel.cli._core.{reader}") as mock_reader:
+        result = runner.invoke(
+            app,
+            [
+                "run",
+                str(script),
+                "postgres",
+                "--dialect-args",
+                executor_map["postgres"]["args"],
+                *flag,
+            ],
+        )
+    assert result.exit_code == 0
+    assert list(mock_run_scripts.call_args.kwargs["scripts"]) == [
+        (str(script), mock_reader.return_value)
+    ]
+
+
+@mock.patch("manuel.cli._core.run_scripts")
+def test_run_cmd_multiple_files(mock_run_scripts: mock.MagicMock, tmp_path: plb.Path):
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "02.sql").write_text("SELECT 2;")
+    (tmp_path / "scripts" / "01.sql").write_text("SELECT 1;")
+    (tmp_path / "00.sql").write_text("SELECT 0;")
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(tmp_path / "00.sql"),
+            str(tmp_path / "scripts"),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--transaction-scope",
+            "single",
+            "--no-cache",
+        ],
+    )
+    assert result.exit_code == 0
+    kwargs = mock_run_scripts.call_args.kwargs
+    assert [(plb.Path(name).name, sql) for name, sql in kwargs["scripts"]] == [
+        ("00.sql", ["SELECT 0"]),
+        ("01.sql", ["SELECT 1"]),
+        ("02.sql", ["SELECT 2"]),
+    ]
+    assert kwargs["transaction_scope"] == _core.TransactionScope.SINGLE
+
+
+@mock.patch("manuel.cli._core.run_graph")
+def test_run_cmd_workers(mock_run_graph: mock.MagicMock, tmp_path: plb.Path):
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(tmp_path),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--workers",
+            "4",
+        ],
+    )
+    assert result.exit_code == 0
+    assert mock_run_graph.call_args.kwargs["max_workers"] == 4
+    assert mock_run_graph.call_args.kwargs["manifest"] is None
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(tmp_path),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--workers",
+            "4",
+            "--stream",
+        ],
+    )
+    assert result.exit_code != 0
+
+
+@mock.patch("manuel.cli._core.load_file")
+def test_load_cmd(mock_load_file: mock.MagicMock, tmp_path: plb.Path):
+    data = tmp_path / "data.csv"
+    data.write_text("id,name\n1,a\n")
+    result = runner.invoke(
+        app,
+        [
+            "load",
+            str(data),
+            "public.test_table",
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--header",
+            "--columns",
+            "id, name",
+        ],
+    )
+    assert result.exit_code == 0
+    kwargs = mock_load_file.call_args.kwargs
+    assert kwargs["table"] == "public.test_table"
+    assert kwargs["copy_format"] == _core.CopyFormat.CSV
+    assert kwargs["header"] is True
+    assert kwargs["columns"] == ["id", "name"]
+
+
+@mock.patch("manuel.cli._core.load_file")
+def test_load_cmd_stdin(mock_load_file: mock.MagicMock):
+    data = []
+    mock_load_file.side_effect = lambda f, **_: data.append(f.read())
+    result = runner.invoke(
+        app,
+        [
+            "load",
+            "-",
+            "test_table",
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--format",
+            "text",
+        ],
+        input="1\ta\n",
+    )
+    assert result.exit_code == 0
+    assert data == [b"1\ta\n"]
+    assert mock_load_file.call_args.kwargs["copy_format"] == _core.CopyFormat.TEXT
+
+
+def test_load_cmd_unsupported_dialect(tmp_path: plb.Path):
+    result = runner.invoke(
+        app,
+        ["load", "-", "test_table", "bigquery", "--dialect-args", "{}"],
+    )
+    assert result.exit_code != 0
+
+
+@mock.patch("manuel.cli._core.query_sql")
+def test_query_cmd(mock_query_sql: mock.MagicMock, tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    result = runner.invoke(
+        app,
+        [
+            "query",
+            str(script),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--format",
+            "jsonl",
+            "--output",
+            str(tmp_path / "out.jsonl"),
+        ],
+    )
+    assert result.exit_code == 0
+    kwargs = mock_query_sql.call_args.kwargs
+    assert kwargs["output_format"] == _core.OutputFormat.JSONL
+    assert kwargs["output"].name == str(tmp_path / "out.jsonl")
+
+
+def test_query_cmd_parquet_requires_duckdb(tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    result = runner.invoke(
+        app,
+        [
+            "query",
+            str(script),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--format",
+            "parquet",
+        ],
+    )
+    assert result.exit_code != 0
+
+
+@mock.patch("manuel.cli._core.run_scripts")
+def test_run_cmd_dry_run_mode(mock_run_scripts: mock.MagicMock, tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(script),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--dry-run-mode",
+            "plan",
+        ],
+    )
+    assert result.exit_code == 0
+    kwargs = mock_run_scripts.call_args.kwargs
+    assert kwargs["dry_run"] is True
+    assert kwargs["dry_run_mode"] == _core.DryRunMode.PLAN
+
+
+def test_run_cmd_resume_requires_journal(tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(script),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--resume",
+        ],
+    )
+    assert result.exit_code != 0
+    assert "--resume requires --journal" in result.output
+
+
+def test_run_cmd_force_requires_ledger(tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(script),
+            "postgres",
+            "--dialect-args",
+            executor_map["postgres"]["args"],
+            "--force",
+        ],
+    )
+    assert result.exit_code != 0
+    assert "--force requires --ledger" in result.output
+
+
+@mock.patch("manuel.cli._core.run_scripts")
+def test_run_cmd_transaction_strategy(
+    mock_run_scripts: mock.MagicMock, tmp_path: plb.Path
+):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    args = ["run", str(script), "postgres", "--dialect-args"]
+    args.append(executor_map["postgres"]["args"])
+    result = runner.invoke(app, args + ["--commit-interval", "30"])
+    assert result.exit_code == 0
+    kwargs = mock_run_scripts.call_args.kwargs
+    assert kwargs["transaction_strategy"] == _core.TransactionStrategy.BATCHED
+    assert kwargs["commit_interval"] == 30.0
+    result = runner.invoke(
+        app, args + ["--transaction-strategy", "autocommit", "--dry-run"]
+    )
+    assert result.exit_code != 0
+    result = runner.invoke(
+        app, args + ["--transaction-strategy", "autocommit", "--commit-every", "2"]
+    )
+    assert result.exit_code != 0
+
+
+@mock.patch("manuel.cli._core.run_scripts")
+def test_run_cmd_pipeline_depth(mock_run_scripts: mock.MagicMock, tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    args = ["run", str(script), "postgres", "--dialect-args"]
+    args.append(executor_map["postgres"]["args"])
+    result = runner.invoke(app, args + ["--pipeline-depth", "50"])
+    assert result.exit_code == 0
+    assert mock_run_scripts.call_args.kwargs["pipeline_depth"] == 50
+    result = runner.invoke(
+        app,
+        ["run", str(script), "duckdb", "--dialect-args", '{"database": "a.db"}']
+        + ["--pipeline-depth", "50"],
+    )
+    assert result.exit_code != 0
+    assert "--pipeline-depth is only supported for postgres" in result.output
+
+
+@mock.patch("manuel.cli._core.run_targets")
+def test_run_cmd_targets(mock_run_targets: mock.MagicMock, tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1")
+    targets = tmp_path / "targets.json"
+    targets.write_text('{"a": {}, "b": {"database": "b.db"}}')
+    mock_run_targets.return_value = []
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            str(script),
+            "duckdb",
+            "--dialect-args",
+            '{"database": "a.db"}',
+            "--targets",
+            str(targets),
+            "--target-workers",
+            "4",
+        ],
+    )
+    assert result.exit_code == 0
+    kwargs = mock_run_targets.call_args.kwargs
+    assert kwargs["max_workers"] == 4
+    assert [t.config.database for t in kwargs["targets"]] == ["a.db", "b.db"]
+
+
+def test_run_cmd_timings(tmp_path: plb.Path, monkeypatch: pytest.MonkeyPatch):
+    for name in list(os.environ):
+        if name.startswith("DUCKDB_"):
+            monkeypatch.delenv(name)
+    script = tmp_path / "script.sql"
+    script.write_text("CREATE TABLE a (x INT);\nINSERT INTO a VALUES (1);")
+    timings = tmp_path / "timings.json"
+    result = runner.invoke(
+        app,
+        ["run", str(script), "duckdb", "--dialect-args"]
+        + [json.dumps({"database": str(tmp_path / "a.db")})]
+        + ["--timings", str(timings)],
+    )
+    assert result.exit_code == 0
+    report = json.loads(timings.read_text())
+    assert {"config", "read", "validate", "connect", "execute", "commit"} <= set(
+        report["phases"]
+    )
+    assert [len(script["statements"]) for script in report["scripts"]] == [2]
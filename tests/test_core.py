@@ -0,0 +1,87 @@
+import pathlib as plb
+from unittest import mock
+
+import pytest
+
+from manuel import _core
+
+
+@pytest.fixture
+def sql_files(tmp_path: plb.Path) -> plb.Path:
+    for i in range(6):
+        (tmp_path / f"valid_{i}.sql").write_text(f"SELECT {i} FROM public.table;")
+    (tmp_path / "invalid.sql").write_text("SELECT 1 FROM public.table WHERE;")
+    return tmp_path
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_validate_files(sql_files: plb.Path, max_workers: int):
+    results = _core.validate_files(
+        paths=[sql_files],
+        dialect=_core.SqlDialect.POSTGRES,
+        use_cache=False,
+        max_workers=max_workers,
+    )
+    assert [result.path.name for result in results] == sorted(
+        p.name for p in sql_files.iterdir()
+    )
+    errors = {result.path.name: result.error for result in results}
+    assert "SQL statement is not valid" in errors.pop("invalid.sql")
+    assert set(errors.values()) == {None}
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_validate_files_unreadable(sql_files: plb.Path, max_workers: int):
+    (sql_files / "binary.sql").write_bytes(b"SELECT '\xff\xfe';")
+    results = _core.validate_files(
+        paths=[sql_files / "*.sql"],
+        dialect=_core.SqlDialect.POSTGRES,
+        use_cache=False,
+        max_workers=max_workers,
+    )
+    errors = {result.path.name: result.error for result in results}
+    assert "codec can't decode" in errors["binary.sql"]
+    assert errors["valid_0.sql"] is None
+
+
+def test_validate_files_os_error(sql_files: plb.Path):
+    with mock.patch(
+        "manuel._core.parse_sql", side_effect=PermissionError("Permission denied")
+    ):
+        results = _core.validate_files(
+            paths=[sql_files], dialect=_core.SqlDialect.POSTGRES, max_workers=1
+        )
+    assert {result.error for result in results} == {"Permission denied"}
+
+
+def test_stream_sql(tmp_path: plb.Path):
+    path = tmp_path / "script.sql"
+    path.write_text("SELECT 1;\nSELECT 2 FROM public.table WHERE;\n")
+    statements = _core.stream_sql(path=path, dialect=_core.SqlDialect.POSTGRES)
+    assert next(statements) == "SELECT 1"
+    with pytest.raises(ValueError, match="In statement 1"):
+        next(statements)
+
+
+def test_stream_sql_same_statements_as_parse_sql(tmp_path: plb.Path):
+    path = tmp_path / "script.sql"
+    path.write_text(
+        "CREATE FUNCTION f(a int) RETURNS int LANGUAGE sql\n"
+        "BEGIN ATOMIC\n  SELECT CASE WHEN a > 0 THEN 1 END;\n  SELECT 2;\nEND;\n"
+        "SELECT 3;\n"
+    )
+    statements = _core.parse_sql(
+        path=path, dialect=_core.SqlDialect.POSTGRES, use_cache=False
+    )
+    assert len(statements) == 2
+    assert (
+        list(_core.stream_sql(path=path, dialect=_core.SqlDialect.POSTGRES))
+        == statements
+    )
+
+
+def test_stream_sql_file_not_found(tmp_path: plb.Path):
+    with pytest.raises(FileNotFoundError):
+        _core.stream_sql(
+            path=tmp_path / "missing.sql", dialect=_core.SqlDialect.POSTGRES
+        )
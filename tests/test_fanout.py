@@ -0,0 +1,62 @@
+import json
+import os
+import pathlib as plb
+
+import pytest
+
+from manuel import _core, _fanout
+from manuel._config import DuckdbSqlConfig
+
+
+def test_load_targets(tmp_path: plb.Path):
+    path = tmp_path / "targets.json"
+    path.write_text(json.dumps([{"name": "a", "database": "a.db"}, {}]))
+    targets = _fanout.load_targets(
+        path, DuckdbSqlConfig, defaults={"database": "default.db"}
+    )
+    assert [(t.name, t.config.database) for t in targets] == [
+        ("a", "a.db"),
+        ("1", "default.db"),
+    ]
+    path.write_text(json.dumps({"a": {"database": "a.db"}}))
+    assert _fanout.load_targets(path, DuckdbSqlConfig)[0].name == "a"
+    path.write_text(json.dumps({"a": {"access_mode": "invalid"}}))
+    with pytest.raises(ValueError, match="Config of target 'a' is not valid"):
+        _fanout.load_targets(path, DuckdbSqlConfig)
+    path.write_text(json.dumps([{"name": "a"}, {"name": "a"}]))
+    with pytest.raises(ValueError, match="more than once"):
+        _fanout.load_targets(path, DuckdbSqlConfig)
+
+
+def test_run_targets(tmp_path: plb.Path, monkeypatch: pytest.MonkeyPatch):
+    # Other tests may leave settings of the duckdb config in the environment
+    for name in os.environ:
+        if name.startswith("DUCKDB_"):
+            monkeypatch.delenv(name)
+    script = tmp_path / "script.sql"
+    script.write_text("CREATE TABLE test_table AS SELECT 1 AS id;")
+    targets = [
+        _fanout.Target(name=name, config=DuckdbSqlConfig(database=database))
+        for name, database in [
+            ("a", str(tmp_path / "a.db")),
+            ("missing", str(tmp_path / "missing" / "b.db")),
+            ("c", str(tmp_path / "c.db")),
+        ]
+    ]
+    report = tmp_path / "report.json"
+    results = _core.run_targets(
+        paths=[script],
+        dialect=_core.SqlDialect.DUCKDB,
+        targets=targets,
+        dry_run=False,
+        max_workers=2,
+        use_cache=False,
+        report=report,
+    )
+    # A failure on one target does not stop the others
+    assert [result.target for result in results] == ["a", "missing", "c"]
+    assert [result.error is None for result in results] == [True, False, True]
+    assert len(results[0].scripts[0].statements) == 1
+    content = json.loads(report.read_text())
+    assert (content["succeeded"], content["failed"]) == (2, 1)
+    assert content["targets"][1]["status"] == "failed"
@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "sqlfluff",
+    "sqlalchemy",
+    "pydantic",
+    "pydantic_settings",
+    "psycopg2",
+    "sqlalchemy_bigquery",
+    "databricks",
+    "duckdb",
+    "duckdb_engine",
+]
+
+
+def _imported_modules(code: str) -> set:
+    # Run in a fresh interpreter, since the test session has already imported
+    #  most of these modules
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import json, sys; {code}; print(json.dumps(sorted(sys.modules)))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(json.loads(result.stdout))
+
+
+def test_import_cli_does_not_import_heavy_modules():
+    modules = _imported_modules("import manuel.cli")
+    assert modules.isdisjoint(HEAVY_MODULES)
+
+
+def test_import_executors_package_does_not_import_executors():
+    modules = _imported_modules("import manuel._executors")
+    assert modules.isdisjoint(HEAVY_MODULES)
+    assert "manuel._executors.base" not in modules
+
+
+@pytest.mark.parametrize(
+    "dialect,loaded,not_loaded",
+    [
+        ("POSTGRES", "manuel._executors.postgres", "manuel._executors.duckdb"),
+        ("BIGQUERY", "manuel._executors.bigquery", "manuel._executors.postgres"),
+        ("DUCKDB", "manuel._executors.duckdb_native", "sqlalchemy"),
+    ],
+)
+def test_get_executor_only_imports_selected_executor(
+    dialect: str, loaded: str, not_loaded: str
+):
+    modules = _imported_modules(
+        f"from manuel import _core; _core.get_executor(_core.SqlDialect.{dialect})"
+    )
+    assert loaded in modules
+    assert not_loaded not in modules
+    assert "sqlfluff" not in modules
+
+
+def test_parser_only_loads_selected_dialect():
+    modules = _imported_modules(
+        "from manuel import _parser; _parser.SqlParser(sql='SELECT 1', dialect='postgres')"
+    )
+    assert "sqlfluff.dialects.dialect_postgres" in modules
+    assert "sqlfluff.dialects.dialect_tsql" not in modules
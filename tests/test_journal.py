@@ -0,0 +1,37 @@
+import pathlib as plb
+from unittest import mock
+
+from manuel import _journal
+
+
+def test_statement_keys():
+    keys = [
+        key for key, _ in _journal.statement_keys(["SELECT 1", "SELECT 2", "SELECT 1"])
+    ]
+    assert len(set(keys)) == 3
+    # Repeated statements are numbered
+    assert keys[2] == keys[0] + ":1"
+    assert [key for key, _ in _journal.statement_keys(["SELECT 1"])] == keys[:1]
+
+
+def test_file_journal(tmp_path: plb.Path):
+    path = tmp_path / "journal.jsonl"
+    executor = mock.MagicMock(dry_run=False)
+    journal = _journal.FileJournal(path)
+    journal.open(executor, engine=None, resume=False)
+    session, other_session = object(), object()
+    journal.stage(session, "a.sql", ["x", "y"])
+    journal.stage(other_session, "a.sql", ["z"])
+    journal.after_commit(session)
+    # Statements that were rolled back are not recorded
+    journal.discard(other_session)
+    journal.after_commit(other_session)
+
+    resumed = _journal.FileJournal(path)
+    resumed.open(executor, engine=None, resume=True)
+    assert resumed.completed(executor, None, "a.sql") == {"x", "y"}
+    assert resumed.completed(executor, None, "b.sql") == set()
+
+    # A run that is not resumed starts a new journal
+    _journal.FileJournal(path).open(executor, engine=None, resume=False)
+    assert path.read_text() == ""
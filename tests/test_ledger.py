@@ -0,0 +1,19 @@
+import pathlib as plb
+
+import pytest
+
+from manuel import _ledger
+
+
+def test_script_hash(tmp_path: plb.Path):
+    script = tmp_path / "script.sql"
+    script.write_text("SELECT 1;\nSELECT 2;")
+    content_hash = _ledger.script_hash(str(script), iter(["SELECT 1", "SELECT 2"]))
+    assert content_hash == _ledger.script_hash(str(script), [])
+    script.write_text("SELECT 1;\nSELECT 3;")
+    assert _ledger.script_hash(str(script), []) != content_hash
+    assert _ledger.script_hash("<sql>", ["SELECT 1"]) == _ledger.script_hash(
+        "<sql>", "SELECT 1"
+    )
+    with pytest.raises(ValueError, match="not a file"):
+        _ledger.script_hash("<sql>", iter(["SELECT 1"]))
@@ -0,0 +1,55 @@
+import datetime
+import io
+import json
+
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+import pytest
+
+from manuel import _core, _output
+
+
+def test_write_rows_csv():
+    output = io.StringIO()
+    rows = _output.write_rows(
+        output,
+        ["id", "name"],
+        iter([[(1, "a"), (2, None)], [(3, "c,d")]]),
+        _core.OutputFormat.CSV,
+    )
+    assert rows == 3
+    assert output.getvalue().splitlines() == ["id,name", "1,a", "2,", '3,"c,d"']
+
+
+def test_write_rows_jsonl():
+    output = io.StringIO()
+    rows = _output.write_rows(
+        output,
+        ["id", "day"],
+        iter([[(1, datetime.date(2024, 1, 1))]]),
+        _core.OutputFormat.JSONL,
+    )
+    assert rows == 1
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+        {"id": 1, "day": "2024-01-01"}
+    ]
+
+
+@pytest.mark.parametrize(
+    "output_format", [_core.OutputFormat.PARQUET, _core.OutputFormat.ARROW]
+)
+def test_write_record_batches(output_format: _core.OutputFormat):
+    table = pyarrow.table({"id": list(range(5)), "name": list("abcde")})
+    output = io.BytesIO()
+    rows = _output.write_record_batches(
+        output, table.to_reader(max_chunksize=2), output_format, row_group_size=2
+    )
+    assert rows == 5
+    output.seek(0)
+    if output_format == _core.OutputFormat.PARQUET:
+        parquet_file = pyarrow.parquet.ParquetFile(output)
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.read().equals(table)
+    else:
+        assert pyarrow.ipc.open_file(output).read_all().equals(table)
@@ -1,4 +1,5 @@
 import pathlib as plb
+from unittest import mock
 
 import pytest
 
@@ -36,7 +37,7 @@ def sql() -> str:
     return "SELECT 1;"
 
 
-@pytest.mark.parametrize("dialect", [d.value for d in _core.SqlDialect])
+@pytest.mark.parametrize("dialect", [d.sqlfluff_dialect for d in _core.SqlDialect])
 def test_sql_dialect_mapping_valid(dialect: str):
     _parser.SqlParser(sql="SELECT 1;", dialect=dialect)
 
@@ -63,6 +64,36 @@ def test_sql_parser_validate(dialect: str, kind: str):
         _parser.SqlParser(sql=statement, dialect=dialect).validate()
 
 
+@pytest.mark.parametrize("mode", list(_parser.ValidationMode))
+def test_sql_parser_validate_mode(mode: _parser.ValidationMode):
+    _parser.SqlParser(sql="SELECT 1 FROM public.table", dialect="postgres").validate(
+        mode=mode
+    )
+    with pytest.raises(ValueError, match="SQL statement is not valid"):
+        _parser.SqlParser(
+            sql="SELECT 1 FROM public.table WHERE", dialect="postgres"
+        ).validate(mode=mode)
+
+
+def test_sql_parser_validate_parse_mode_skips_lint_rules():
+    with mock.patch("manuel._parser._get_linter") as mock_linter:
+        mock_linter.return_value.parse_string.return_value.violations = []
+        _parser.SqlParser(sql="SELECT 1", dialect="postgres").validate()
+    mock_linter.return_value.lint_string.assert_not_called()
+
+
+@pytest.mark.parametrize("mode", list(_parser.ValidationMode))
+def test_sql_parser_statements(mode: _parser.ValidationMode):
+    parser = _parser.SqlParser(
+        sql="SELECT 1;\n-- comment\nINSERT INTO t VALUES ('a;b');\n/* end */",
+        dialect="postgres",
+    )
+    with pytest.raises(ValueError, match="SQL must be validated"):
+        parser.statements
+    parser.validate(mode=mode)
+    assert parser.statements == ["SELECT 1", "INSERT INTO t VALUES ('a;b')"]
+
+
 def test_sql_parser_unknown_dialect():
     with pytest.raises(ValueError, match="Unsupported dialect: unknown"):
         _parser.SqlParser(sql="SELECT 1", dialect="unknown").validate()
@@ -72,3 +103,62 @@ def test_sql_parser_from_sql_file(sql_statement_from_file: plb.Path):
     _parser.SqlParser.from_file(
         path=sql_statement_from_file, dialect="postgres"
     ).validate()
+
+
+def test_sql_parser_tables():
+    parser = _parser.SqlParser(
+        sql="""
+        CREATE TABLE staging.orders AS SELECT * FROM raw.orders;
+        WITH recent AS (SELECT * FROM staging.orders)
+        INSERT INTO "Marts" SELECT * FROM recent JOIN customers USING (id);
+        SELECT count(*) FROM marts;
+        """,
+        dialect="postgres",
+    )
+    with pytest.raises(ValueError, match="must be validated"):
+        parser.tables
+    parser.validate()
+    # Tables in a schema also read the schema
+    assert parser.tables == _parser.TableAccess(
+        reads=["customers", "raw.*", "staging.*"], writes=["marts", "orders"]
+    )
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $$ SELECT 1 $$",
+        "CREATE TYPE mood AS ENUM ('happy')",
+        "CREATE EXTENSION hstore",
+        "SELECT f()",
+        "CALL p()",
+    ],
+)
+def test_sql_parser_tables_barrier(sql: str):
+    parser = _parser.SqlParser(sql=f"SELECT * FROM t; {sql};", dialect="postgres")
+    parser.validate()
+    assert parser.tables.barrier
+
+
+def test_sql_parser_tables_schema():
+    parser = _parser.SqlParser(sql="CREATE SCHEMA Staging;", dialect="postgres")
+    parser.validate()
+    assert parser.tables == _parser.TableAccess(
+        reads=[], writes=["staging.*"], barrier=True
+    )
+    parser = _parser.SqlParser(sql="CREATE SCHEMA d;", dialect="bigquery")
+    parser.validate()
+    assert parser.tables.writes == ["d.*"]
+
+
+def test_sql_parser_keeps_no_transaction_annotation():
+    parser = _parser.SqlParser(
+        sql="-- header\nSELECT 1;\n-- manuel:no-transaction\nVACUUM;\nSELECT 2;",
+        dialect="postgres",
+    )
+    parser.validate()
+    assert parser.statements == [
+        "SELECT 1",
+        "-- manuel:no-transaction\nVACUUM",
+        "SELECT 2",
+    ]
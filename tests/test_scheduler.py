@@ -0,0 +1,99 @@
+import json
+import pathlib as plb
+import threading
+import time
+
+import pytest
+
+from manuel import _scheduler
+
+
+def test_infer_dependencies():
+    dependencies = _scheduler.infer_dependencies(
+        ["a", "b", "c", "d"],
+        reads=[set(), {"x"}, {"x"}, {"y"}],
+        writes=[{"x"}, {"y"}, {"z"}, {"x"}],
+    )
+    # c only reads x, like b, so it does not depend on b. d writes x, which b and c
+    #  read, so it must wait for both of them.
+    assert dependencies == {"a": [], "b": ["a"], "c": ["a"], "d": ["a", "b", "c"]}
+
+
+def test_infer_dependencies_barrier():
+    dependencies = _scheduler.infer_dependencies(
+        ["schema", "a", "b", "function", "c"],
+        reads=[set(), {"s.*"}, {"s.*"}, set(), {"x"}],
+        writes=[{"s.*"}, {"a"}, {"b"}, set(), {"c"}],
+        barriers=[True, False, False, True, False],
+    )
+    # a and b are independent of each other, but not of the barriers around them
+    assert dependencies == {
+        "schema": [],
+        "a": ["schema"],
+        "b": ["schema"],
+        "function": ["schema", "a", "b"],
+        "c": ["schema", "function"],
+    }
+
+
+def test_check_acyclic():
+    _scheduler.check_acyclic({"a": [], "b": ["a"], "c": ["a", "b"]})
+    with pytest.raises(ValueError, match="a -> b -> a"):
+        _scheduler.check_acyclic({"a": ["b"], "b": ["a"], "c": []})
+
+
+def test_critical_path():
+    path, duration = _scheduler.critical_path(
+        {"a": [], "b": ["a"], "c": [], "d": ["b", "c"]},
+        {"a": 1.0, "b": 2.0, "c": 4.0, "d": 1.0},
+    )
+    assert path == ["c", "d"]
+    assert duration == 5.0
+
+
+def test_load_manifest(tmp_path: plb.Path):
+    names = [str(tmp_path / name) for name in ("a.sql", "b.sql")]
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"b.sql": ["a.sql", "missing.sql"]}))
+    assert _scheduler.load_manifest(manifest, names) == {
+        names[0]: [],
+        names[1]: [names[0]],
+    }
+    manifest.write_text(json.dumps({"b.sql": "a.sql"}))
+    with pytest.raises(ValueError, match="must map each script"):
+        _scheduler.load_manifest(manifest, names)
+
+
+def test_schedule_respects_dependencies():
+    finished = []
+    lock = threading.Lock()
+
+    def run(name: str):
+        time.sleep(0.01)
+        with lock:
+            finished.append(name)
+
+    dependencies = {"a": [], "b": [], "c": ["a"], "d": ["b", "c"]}
+    result = _scheduler.schedule(dependencies, run, max_workers=4)
+    for name, deps in dependencies.items():
+        assert all(finished.index(dep) < finished.index(name) for dep in deps)
+    assert set(result.durations) == set(dependencies)
+    assert result.critical_path == ["a", "c", "d"]
+
+
+def test_schedule_runs_independent_scripts_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    _scheduler.schedule({"a": [], "b": [], "c": []}, lambda _: barrier.wait(), 3)
+
+
+def test_schedule_stops_on_failure():
+    started = []
+
+    def run(name: str):
+        started.append(name)
+        if name == "a":
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _scheduler.schedule({"a": [], "b": ["a"], "c": ["b"]}, run, max_workers=2)
+    assert started == ["a"]
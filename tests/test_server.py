@@ -0,0 +1,167 @@
+import contextlib
+import os
+import pathlib as plb
+import threading
+from typing import Iterator
+from unittest import mock
+
+import duckdb
+import pydantic
+import pytest
+from typer.testing import CliRunner
+
+from manuel import _core, _server
+from manuel.cli import app
+
+runner = CliRunner()
+
+TOKEN = "token"
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    # Other tests may leave settings of the duckdb config in the environment
+    for name in os.environ:
+        if name.startswith("DUCKDB_"):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv(_server.TOKEN_ENV, TOKEN)
+    server = _server.TcpServer("127.0.0.1", 0, token=TOKEN)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    server.engines.close()
+    thread.join()
+
+
+def test_engine_config():
+    config = _server._engine_config(
+        _core.SqlDialect.DATABRICKS,
+        dialect_args={"catalog": "main"},
+        environment={
+            "DATABRICKS_TOKEN": "token",
+            "DATABRICKS_SERVER_HOSTNAME": "host",
+            "DATABRICKS_HTTP_PATH": "path",
+            "DATABRICKS_CATALOG": "other",
+            "DATABRICKS_SCHEMA": "default",
+        },
+    )
+    assert config.catalog == "main"
+    assert config.schema_ == "default"
+
+
+def test_engine_config_ignores_server_environment(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("POSTGRES_PASSWORD", "server")
+    args = {"user": "user", "host": "localhost", "port": 5432, "database": "db"}
+    with pytest.raises(pydantic.ValidationError, match="password"):
+        _server._engine_config(_core.SqlDialect.POSTGRES, args, environment={})
+    config = _server._engine_config(
+        _core.SqlDialect.POSTGRES, args, environment={"POSTGRES_PASSWORD": "client"}
+    )
+    assert config.password.get_secret_value() == "client"
+
+
+@mock.patch("manuel._server._core.get_executor")
+def test_engines_keyed_by_secrets(mock_get_executor: mock.MagicMock):
+    executor = mock_get_executor.return_value.return_value
+    executor.connect.side_effect = lambda **kwargs: contextlib.nullcontext(object())
+    config = _core.get_config(_core.SqlDialect.POSTGRES)
+    args = {"user": "user", "host": "localhost", "port": 5432, "database": "db"}
+    engines = _server.Engines()
+    first = engines.get(_core.SqlDialect.POSTGRES, config(password="a", **args))
+    assert engines.get(_core.SqlDialect.POSTGRES, config(password="a", **args)) is first
+    assert (
+        engines.get(_core.SqlDialect.POSTGRES, config(password="b", **args))
+        is not first
+    )
+    engines.close()
+
+
+def test_server_validate(server: str, tmp_path: plb.Path):
+    (tmp_path / "valid.sql").write_text("SELECT 1;")
+    (tmp_path / "invalid.sql").write_text("SELEC 1;")
+    response = _server.request(
+        server,
+        "validate",
+        {"paths": [str(tmp_path)], "dialect": "duckdb", "use_cache": False},
+        token=TOKEN,
+    )
+    errors = {
+        plb.Path(result["path"]).name: result["error"] for result in response["results"]
+    }
+    assert errors["valid.sql"] is None
+    assert errors["invalid.sql"] is not None
+
+
+def test_server_run(server: str, tmp_path: plb.Path):
+    database = str(tmp_path / "test.db")
+    (tmp_path / "01.sql").write_text("CREATE TABLE test_table (id INTEGER);")
+    (tmp_path / "02.sql").write_text("INSERT INTO test_table VALUES (1), (2);")
+    args = [
+        "run",
+        str(tmp_path),
+        "duckdb",
+        "--dialect-args",
+        f'{{"database": "{database}"}}',
+        "--server",
+        server,
+    ]
+    result = runner.invoke(app, args + ["--ledger"])
+    assert result.exit_code == 0, result.output
+    with duckdb.connect(database) as con:
+        assert con.execute("SELECT count(*) FROM test_table").fetchone() == (2,)
+    # Errors of the server are reported by the client
+    (tmp_path / "03.sql").write_text("SELECT * FROM missing;")
+    result = runner.invoke(app, args + ["--ledger"])
+    assert result.exit_code == 1
+    result = runner.invoke(app, args + ["--workers", "2"])
+    assert result.exit_code != 0
+    assert "--server cannot be combined" in result.output
+
+
+def test_request_unreachable_server():
+    with pytest.raises(_server.ServerError, match="Could not reach"):
+        _server.request("http://127.0.0.1:1", "run", {})
+    with pytest.raises(_server.ServerError, match="must start with"):
+        _server.request("127.0.0.1:1", "run", {})
+
+
+def test_server_requires_token(server: str, tmp_path: plb.Path):
+    payload = {"paths": [str(tmp_path)], "dialect": "duckdb"}
+    with pytest.raises(_server.ServerError, match="token"):
+        _server.request(server, "validate", payload)
+    with pytest.raises(_server.ServerError, match="token"):
+        _server.request(server, "validate", payload, token="wrong")
+
+
+def test_tcp_server_requires_token():
+    with pytest.raises(ValueError, match=_server.TOKEN_ENV):
+        _server.TcpServer("127.0.0.1", 0, token="")
+    result = runner.invoke(app, ["serve", "--port", "0"], env={_server.TOKEN_ENV: ""})
+    assert result.exit_code != 0
+    assert _server.TOKEN_ENV in result.output
+
+
+@pytest.mark.skipif(
+    not hasattr(_server, "UnixServer"), reason="Unix sockets are not supported"
+)
+def test_unix_server(tmp_path: plb.Path):
+    socket_path = tmp_path / "manuel.sock"
+    server = _server.UnixServer(str(socket_path))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # Only the user that started the server may connect
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+        (tmp_path / "valid.sql").write_text("SELECT 1;")
+        response = _server.request(
+            f"unix://{socket_path}",
+            "validate",
+            {"paths": [str(tmp_path)], "dialect": "duckdb", "use_cache": False},
+        )
+        assert [result["error"] for result in response["results"]] == [None]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from manuel import _splitter
+
+POSTGRES_SCRIPT = """-- leading; comment
+SELECT 'a;b', "x;y" FROM t; /* block ; /* nested; */ still; */ SELECT 2;
+CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql;
+SELECT $$;$$; SELECT 'it''s;'; SELECT my$col$ FROM t;
+CREATE FUNCTION g(a int) RETURNS int LANGUAGE sql
+BEGIN ATOMIC SELECT CASE WHEN a > 0 THEN 1 END; SELECT 2; end;
+BEGIN; SELECT atomic FROM t;
+SELECT E'a\\';b', e'\\\\';
+-- only a comment;
+;;
+SELECT 3 -- trailing"""
+
+POSTGRES_STATEMENTS = [
+    "-- leading; comment\nSELECT 'a;b', \"x;y\" FROM t",
+    "/* block ; /* nested; */ still; */ SELECT 2",
+    "CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql",
+    "SELECT $$;$$",
+    "SELECT 'it''s;'",
+    "SELECT my$col$ FROM t",
+    "CREATE FUNCTION g(a int) RETURNS int LANGUAGE sql\n"
+    "BEGIN ATOMIC SELECT CASE WHEN a > 0 THEN 1 END; SELECT 2; end",
+    "BEGIN",
+    "SELECT atomic FROM t",
+    "SELECT E'a\\';b', e'\\\\'",
+    "SELECT 3 -- trailing",
+]
+
+BIGQUERY_SCRIPT = """SELECT 'it\\'s;', `a;b`, "q\\";" FROM t; SELECT 2 /* x; */;
+CREATE PROCEDURE d.p() BEGIN SELECT 1; SELECT 2; END;
+IF x > 0 THEN SELECT IF(x > 1, 1, 2); ELSE SELECT 2; END IF;
+outer: LOOP IF x > 5 THEN LEAVE; END IF; END LOOP outer;
+BEGIN SELECT CASE x WHEN 1 THEN 1 END, CASE WHEN x = 2 THEN 2 END;
+EXCEPTION WHEN ERROR THEN SELECT 2; END;
+BEGIN TRANSACTION; BEGIN; SELECT REPEAT('a', 2) FROM t FOR SYSTEM_TIME AS OF y;"""
+
+BIGQUERY_STATEMENTS = [
+    """SELECT 'it\\'s;', `a;b`, "q\\";" FROM t""",
+    "SELECT 2 /* x; */",
+    "CREATE PROCEDURE d.p() BEGIN SELECT 1; SELECT 2; END",
+    "IF x > 0 THEN SELECT IF(x > 1, 1, 2); ELSE SELECT 2; END IF",
+    "outer: LOOP IF x > 5 THEN LEAVE; END IF; END LOOP outer",
+    "BEGIN SELECT CASE x WHEN 1 THEN 1 END, CASE WHEN x = 2 THEN 2 END;\n"
+    "EXCEPTION WHEN ERROR THEN SELECT 2; END",
+    "BEGIN TRANSACTION",
+    "BEGIN",
+    "SELECT REPEAT('a', 2) FROM t FOR SYSTEM_TIME AS OF y",
+]
+
+
+def _random_chunks(script: str, seed: int) -> list:
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(script)), rng.randint(1, 40)))
+    return [script[i:j] for i, j in zip([0, *cuts], [*cuts, len(script)])]
+
+
+@pytest.mark.parametrize(
+    "dialect,script,statements",
+    [
+        ("postgres", POSTGRES_SCRIPT, POSTGRES_STATEMENTS),
+        ("bigquery", BIGQUERY_SCRIPT, BIGQUERY_STATEMENTS),
+    ],
+)
+def test_split_statements(dialect: str, script: str, statements: list):
+    assert list(_splitter.split_statements([script], dialect)) == statements
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize(
+    "dialect,script,statements",
+    [
+        ("postgres", POSTGRES_SCRIPT, POSTGRES_STATEMENTS),
+        ("bigquery", BIGQUERY_SCRIPT, BIGQUERY_STATEMENTS),
+    ],
+)
+def test_split_statements_independent_of_chunk_boundaries(
+    seed: int, dialect: str, script: str, statements: list
+):
+    chunks = _random_chunks(script, seed)
+    assert list(_splitter.split_statements(chunks, dialect)) == statements
+
+
+@pytest.mark.parametrize(
+    "dialect,script,statements",
+    [
+        ("postgres", POSTGRES_SCRIPT, POSTGRES_STATEMENTS),
+        ("bigquery", BIGQUERY_SCRIPT, BIGQUERY_STATEMENTS),
+    ],
+)
+def test_split_statements_one_character_chunks(
+    dialect: str, script: str, statements: list
+):
+    assert list(_splitter.split_statements(list(script), dialect)) == statements
+
+
+def test_split_statements_escape_string_only_in_postgres():
+    script = "SELECT E'a\\';b';"
+    assert list(_splitter.split_statements([script], "postgres")) == [
+        "SELECT E'a\\';b'"
+    ]
+    with pytest.raises(ValueError, match="Unterminated"):
+        list(_splitter.split_statements([script], "duckdb"))
+
+
+def test_split_statements_is_lazy():
+    def chunks():
+        yield "SELECT 1; SELECT"
+        raise AssertionError("Read past the first statement")
+
+    assert next(_splitter.split_statements(chunks(), "postgres")) == "SELECT 1"
+
+
+def test_split_statements_unterminated_string():
+    with pytest.raises(ValueError, match="SQL statement is not valid"):
+        list(_splitter.split_statements(["SELECT 'abc;"], "postgres"))
+
+
+def test_split_statements_atomic_block_only_in_postgres():
+    script = "BEGIN ATOMIC SELECT 1; END;"
+    assert list(_splitter.split_statements([script], "postgres")) == [
+        "BEGIN ATOMIC SELECT 1; END"
+    ]
+    assert list(_splitter.split_statements([script], "duckdb")) == [
+        "BEGIN ATOMIC SELECT 1",
+        "END",
+    ]
@@ -0,0 +1,91 @@
+import json
+import pathlib as plb
+import time
+from unittest import mock
+
+import pytest
+
+from manuel import _core, _timings
+from manuel._executors.runner import ScriptResult, StatementResult
+
+
+@pytest.fixture
+def collector():
+    collector = _timings.start()
+    yield collector
+    _timings.stop()
+
+
+def test_phase_without_collector():
+    assert _timings.stop() is None
+    with _timings.phase("execute"):
+        pass
+    _timings.record_script(ScriptResult(name="a.sql", statements=[], duration=0.0))
+    assert _timings.stop() is None
+
+
+def test_phases_are_accumulated(collector: _timings.Timings):
+    for _ in range(2):
+        with _timings.phase("validate"):
+            pass
+    report = collector.report()
+    assert report["phases"]["validate"]["count"] == 2
+    assert report["total"] >= report["phases"]["validate"]["duration"] >= 0
+
+
+def test_nested_phases_are_exclusive(collector: _timings.Timings):
+    with _timings.phase("engine"):
+        with _timings.phase("import"):
+            time.sleep(0.05)
+    phases = collector.report()["phases"]
+    assert phases["import"]["duration"] >= 0.05
+    assert phases["engine"]["duration"] < 0.05
+
+
+def test_phase_is_recorded_on_error(collector: _timings.Timings):
+    with pytest.raises(ValueError):
+        with _timings.phase("execute"):
+            raise ValueError("failed")
+    assert collector.report()["phases"]["execute"]["count"] == 1
+
+
+def test_write(collector: _timings.Timings, tmp_path: plb.Path):
+    statement = StatementResult(index=0, preview="SELECT 1", duration=0.5, rowcount=1)
+    _timings.record_script(
+        ScriptResult(name="a.sql", statements=[statement], duration=1.0)
+    )
+    path = tmp_path / "timings.json"
+    collector.write(str(path))
+    report = json.loads(path.read_text())
+    assert report["scripts"] == [
+        {
+            "name": "a.sql",
+            "duration": 1.0,
+            "skipped": False,
+            "statements": [
+                {"index": 0, "duration": 0.5, "rowcount": 1, "preview": "SELECT 1"}
+            ],
+        }
+    ]
+
+
+def test_startup_is_part_of_total():
+    collector = _timings.start(started_at=time.perf_counter() - 10)
+    _timings.stop()
+    report = collector.report()
+    assert report["phases"]["startup"]["duration"] >= 10
+    assert report["total"] >= 10
+
+
+def test_parse_file_phases(collector: _timings.Timings, tmp_path: plb.Path):
+    path = tmp_path / "script.sql"
+    path.write_text("SELECT 1;")
+    with mock.patch(
+        "manuel._parser._dialect_supported",
+        side_effect=lambda dialect: time.sleep(0.05) is None,
+    ):
+        _core.parse_sql(path=path, dialect=_core.SqlDialect.POSTGRES, use_cache=False)
+    phases = collector.report()["phases"]
+    # Loading the sqlfluff dialect is not part of reading the file
+    assert phases["read"]["duration"] < 0.05
+    assert {"read", "validate"} <= set(phases)
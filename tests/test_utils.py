@@ -1,3 +1,5 @@
+import pathlib as plb
+
 import pytest
 
 from manuel import _utils
@@ -20,3 +22,80 @@ class ClassNeedsExtra:
 def test_requires_extra():
     with pytest.raises(ImportError, match="psycopg2-binary is not installed."):
         ClassNeedsExtra().get_connection_string()
+
+
+@pytest.fixture
+def sql_files(tmp_path: plb.Path) -> plb.Path:
+    (tmp_path / "nested").mkdir()
+    for name in ["b.sql", "a.sql", "nested/c.sql", "notes.txt"]:
+        (tmp_path / name).write_text("SELECT 1;")
+    return tmp_path
+
+
+def test_collect_sql_files_from_directory(sql_files: plb.Path):
+    assert _utils.collect_sql_files([sql_files]) == [
+        sql_files / "a.sql",
+        sql_files / "b.sql",
+        sql_files / "nested" / "c.sql",
+    ]
+
+
+def test_collect_sql_files_from_glob_deduplicates(sql_files: plb.Path):
+    assert _utils.collect_sql_files(
+        [sql_files / "b.sql", str(sql_files / "**" / "*.sql")]
+    ) == [
+        sql_files / "b.sql",
+        sql_files / "a.sql",
+        sql_files / "nested" / "c.sql",
+    ]
+
+
+def test_collect_sql_files_missing(sql_files: plb.Path):
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        _utils.collect_sql_files([sql_files / "missing.sql"])
+    with pytest.raises(FileNotFoundError, match="No files match pattern"):
+        _utils.collect_sql_files([str(sql_files / "*.psql")])
+
+
+def test_iter_sql_file(tmp_path: plb.Path):
+    path = tmp_path / "script.sql"
+    path.write_text("SELECT 'é€';", encoding="utf-8")
+    # Chunks of 1 byte split the multi-byte characters
+    assert "".join(_utils.iter_sql_file(path, chunk_size=1)) == "SELECT 'é€';"
+
+
+def test_iter_sql_file_empty(tmp_path: plb.Path):
+    path = tmp_path / "script.sql"
+    path.touch()
+    assert list(_utils.iter_sql_file(path)) == []
+
+
+def test_iterate_in_thread():
+    assert list(_utils.iterate_in_thread(range(100), buffer_size=3)) == list(range(100))
+
+
+def test_iterate_in_thread_reraises_after_preceding_items():
+    def items():
+        yield 1
+        yield 2
+        raise ValueError("Item 3 is not valid")
+
+    iterator = _utils.iterate_in_thread(items())
+    assert next(iterator) == 1
+    assert next(iterator) == 2
+    with pytest.raises(ValueError, match="Item 3 is not valid"):
+        next(iterator)
+
+
+def test_iterate_in_thread_stops_producer_when_closed():
+    consumed = []
+
+    def items():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    iterator = _utils.iterate_in_thread(items(), buffer_size=2)
+    next(iterator)
+    iterator.close()
+    assert len(consumed) < 1000